@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ArchiveSystemConfig(AppConfig):
+    name = 'archive_system'
+
+    def ready(self):
+        # Налаштування з'єднань SQLite (PRAGMA) при кожному новому підключенні
+        from . import db  # noqa: F401
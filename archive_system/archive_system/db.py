@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# WAL дозволяє читати під час запису, а synchronous=NORMAL у режимі WAL не
+# втрачає цілісності бази (лише останні транзакції при збої живлення).
+# busy_timeout — скільки мс чекати на блокування замість помилки «database is locked».
+# Перевизначаються параметром SQLITE_PRAGMAS у settings
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+}
+
+
+def get_sqlite_pragmas():
+    return getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_SQLITE_PRAGMAS)
+
+
+@receiver(connection_created, dispatch_uid='archive_system.db.configure_sqlite')
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in get_sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {name}={value}')
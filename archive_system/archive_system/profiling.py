@@ -0,0 +1,301 @@
+import cProfile
+import logging
+import os
+import random
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Вимкнено за замовчуванням: без нього middleware не додає жодних витрат
+    'ENABLED': False,
+    # Запити, довші за цей поріг (мс), пишуться в лог і можуть бути профільовані
+    'SLOW_REQUEST_MS': 1000,
+    # SQL-запити, довші за цей поріг (мс), пишуться в лог разом з назвою view
+    'SLOW_QUERY_MS': 200,
+    # Частка запитів, які виконуються під cProfile; дамп зберігається лише для повільних
+    'PROFILE_SAMPLE_RATE': 0.05,
+    'PROFILE_DIR': os.path.join(settings.BASE_DIR, 'profiles'),
+    # Скільки останніх запитів кожного view враховується у p50/p95
+    'WINDOW': 1000,
+    # Якщо задано, /metrics/ доступний і за заголовком Authorization: Bearer <TOKEN>
+    # (для Prometheus), а не лише персоналу
+    'TOKEN': '',
+}
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+# Назва метрики Prometheus, опис, межі кошиків
+METRICS = {
+    'duration': ('archive_request_duration_seconds', 'Час обробки запиту', SECONDS_BUCKETS),
+    'queries': ('archive_request_db_queries', 'Кількість SQL-запитів на запит', QUERY_BUCKETS),
+    'sql': ('archive_request_db_duration_seconds', 'Сумарний час SQL на запит', SECONDS_BUCKETS),
+    'template': ('archive_request_template_duration_seconds', 'Час рендерингу шаблону', SECONDS_BUCKETS),
+    'size': ('archive_response_size_bytes', 'Розмір відповіді', SIZE_BUCKETS),
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'REQUEST_PROFILING', {}).get(name, DEFAULTS[name])
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def cumulative(self):
+        # Лічильники вже накопичувальні: observe збільшує всі кошики з межею >= value
+        return list(zip(self.buckets, self.counts))
+
+
+class ViewMetrics:
+    def __init__(self, window):
+        self.histograms = {key: Histogram(buckets) for key, (_, _, buckets) in METRICS.items()}
+        self.recent = deque(maxlen=window)
+        self.slow = 0
+
+    def observe(self, sample, slow):
+        for key, value in sample.items():
+            if value is not None:
+                self.histograms[key].observe(value)
+        self.recent.append((sample['duration'], sample['queries']))
+        self.slow += slow
+
+    def summary(self):
+        durations = sorted(duration * 1000 for duration, _ in self.recent)
+        queries = [count for _, count in self.recent]
+        duration = self.histograms['duration']
+        return {
+            'requests': duration.count,
+            'slow_requests': self.slow,
+            'p50_ms': round(statistics.median(durations), 3) if durations else None,
+            'p95_ms': round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 3) if durations else None,
+            'avg_queries': round(statistics.mean(queries), 2) if queries else None,
+            'avg_sql_ms': round(self.histograms['sql'].sum / duration.count * 1000, 3) if duration.count else None,
+            'avg_template_ms': (
+                round(self.histograms['template'].sum / self.histograms['template'].count * 1000, 3)
+                if self.histograms['template'].count else None
+            ),
+        }
+
+
+class MetricsRegistry:
+    # Метрики зберігаються в пам'яті процесу; при кількох воркерах gunicorn кожен
+    # віддає власні лічильники, а Prometheus підсумовує їх за instance
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.started_at = timezone.now()
+
+    def observe(self, view, sample, slow=False):
+        with self.lock:
+            metrics = self.views.get(view)
+            if metrics is None:
+                metrics = self.views[view] = ViewMetrics(get_setting('WINDOW'))
+            metrics.observe(sample, slow)
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+            self.started_at = timezone.now()
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'started_at': self.started_at.isoformat(),
+                'views': {view: metrics.summary() for view, metrics in sorted(self.views.items())},
+            }
+
+    def as_prometheus(self):
+        lines = []
+        with self.lock:
+            views = sorted(self.views.items())
+            for key, (name, description, _) in METRICS.items():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} histogram')
+                for view, metrics in views:
+                    histogram = metrics.histograms[key]
+                    label = f'view="{escape_label(view)}"'
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{{label}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{label}}} {histogram.count}')
+            lines.append('# HELP archive_slow_requests_total Кількість повільних запитів')
+            lines.append('# TYPE archive_slow_requests_total counter')
+            for view, metrics in views:
+                lines.append(f'archive_slow_requests_total{{view="{escape_label(view)}"}} {metrics.slow}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class QueryTimer:
+    # execute_wrapper: рахує SQL-запити та їхній час, повільні пише в лог
+    def __init__(self, request):
+        self.request = request
+        self.count = 0
+        self.duration = 0
+        self.slow_threshold = get_setting('SLOW_QUERY_MS') / 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if elapsed >= self.slow_threshold:
+                logger.warning('Повільний SQL-запит (%.1f мс) у %s: %s',
+                               elapsed * 1000, view_name(self.request), sql[:1000])
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match.route
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not get_setting('ENABLED'):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer(request)
+        profiler = None
+        if random.random() < get_setting('PROFILE_SAMPLE_RATE'):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Інший профайлер уже активний (паралельний запит у сусідньому потоці)
+                profiler = None
+
+        started = time.perf_counter()
+        try:
+            with track_queries(timer):
+                response = self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+        if response.streaming and not response.is_async:
+            # Вміст потокової відповіді (CSV-експорт) читається сервером уже після виходу
+            # з middleware, тож SQL-запити, час і розмір враховуються до кінця потоку
+            response.streaming_content = self.stream(response.streaming_content, request, timer, profiler, started)
+        else:
+            self.record(request, timer, profiler, time.perf_counter() - started, response_size(response))
+        return response
+
+    def stream(self, content, request, timer, profiler, started):
+        size = 0
+        try:
+            with track_queries(timer):
+                for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            self.record(request, timer, profiler, time.perf_counter() - started, size)
+
+    def record(self, request, timer, profiler, duration, size):
+        view = view_name(request)
+        slow = duration * 1000 >= get_setting('SLOW_REQUEST_MS')
+        registry.observe(view, {
+            'duration': duration,
+            'queries': timer.count,
+            'sql': timer.duration,
+            'template': getattr(request, '_profiling_template_time', None),
+            'size': size,
+        }, slow=slow)
+
+        if slow:
+            logger.warning('Повільний запит %s %s (%s): %.0f мс, SQL-запитів: %d (%.0f мс)',
+                           request.method, request.path, view, duration * 1000, timer.count, timer.duration * 1000)
+            if profiler is not None:
+                dump_profile(profiler, view, duration)
+
+    def process_template_response(self, request, response):
+        # Цей middleware стоїть першим, тож його хук викликається останнім — одразу
+        # перед response.render(); час до post-render callback і є часом рендерингу
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._profiling_template_time = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+@contextmanager
+def track_queries(timer):
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+        yield
+
+
+def response_size(response):
+    # Асинхронні потокові відповіді не обгортаються, для них відомий лише Content-Length
+    if response.streaming:
+        length = response.get('Content-Length')
+        return int(length) if length else None
+    return len(response.content)
+
+
+def dump_profile(profiler, view, duration):
+    directory = get_setting('PROFILE_DIR')
+    os.makedirs(directory, exist_ok=True)
+    name = re.sub(r'[^\w.-]+', '_', view)
+    path = os.path.join(directory, f"{name}-{timezone.now().strftime('%Y%m%d-%H%M%S-%f')}-{duration * 1000:.0f}ms.prof")
+    profiler.dump_stats(path)
+    logger.warning('Профіль повільного запиту збережено у %s', path)
+    return path
+
+
+def metrics_allowed(request):
+    token = get_setting('TOKEN')
+    if token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    return request.user.is_authenticated and request.user.is_staff
+
+
+def metrics(request):
+    # JSON з p50/p95 за вікном останніх запитів; ?format=prometheus — текстовий формат
+    if not metrics_allowed(request):
+        return JsonResponse({'error': 'Метрики доступні лише персоналу'}, status=403)
+    if request.GET.get('format') == 'prometheus':
+        return HttpResponse(registry.as_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    return JsonResponse(dict(registry.as_dict(), enabled=get_setting('ENABLED')))
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from documents.tests import create_documents
+from .profiling import registry
+
+PROFILING = {'ENABLED': True, 'SLOW_REQUEST_MS': 10000, 'SLOW_QUERY_MS': 10000, 'PROFILE_SAMPLE_RATE': 0}
+
+
+@override_settings(REQUEST_PROFILING=PROFILING)
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.staff = User.objects.create_user('registrar', password='secret-pass-123', is_staff=True)
+        create_documents(3, self.staff)
+        self.client.force_login(self.staff)
+
+    def test_collects_per_view_metrics(self):
+        self.client.get(reverse('document-list'))
+        self.client.get(reverse('document-list'))
+
+        views = self.client.get(reverse('metrics')).json()['views']
+        self.assertEqual(views['document-list']['requests'], 2)
+        self.assertGreater(views['document-list']['avg_queries'], 0)
+        self.assertIsNotNone(views['document-list']['avg_template_ms'])
+        self.assertLessEqual(views['document-list']['p50_ms'], views['document-list']['p95_ms'])
+
+        text = self.client.get(reverse('metrics'), {'format': 'prometheus'}).content.decode()
+        self.assertIn('# TYPE archive_request_duration_seconds histogram', text)
+        self.assertIn('archive_request_db_queries_count{view="document-list"} 2', text)
+        self.assertIn('archive_response_size_bytes_bucket{view="document-list",le="+Inf"} 2', text)
+
+    def test_streaming_response_is_measured_until_consumed(self):
+        with override_settings(REQUEST_PROFILING=dict(PROFILING, SLOW_QUERY_MS=0)), \
+                self.assertLogs('archive_system.profiling'):
+            response = self.client.get(reverse('export-csv'))
+        self.assertNotIn('export-csv', self.client.get(reverse('metrics')).json()['views'])
+
+        # Рядки документів читаються з бази лише під час віддачі CSV
+        with self.assertLogs('archive_system.profiling') as logs:
+            content = b''.join(response.streaming_content)
+        self.assertTrue(any('у export-csv' in line and 'documents_document' in line for line in logs.output))
+
+        views = self.client.get(reverse('metrics')).json()['views']
+        self.assertEqual(views['export-csv']['requests'], 1)
+
+        text = self.client.get(reverse('metrics'), {'format': 'prometheus'}).content.decode()
+        self.assertIn(f'archive_response_size_bytes_sum{{view="export-csv"}} {len(content)}', text)
+
+    def test_slow_queries_and_requests_are_logged_and_profiled(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings = dict(PROFILING, SLOW_REQUEST_MS=0, SLOW_QUERY_MS=0, PROFILE_SAMPLE_RATE=1, PROFILE_DIR=directory)
+        with override_settings(REQUEST_PROFILING=settings), self.assertLogs('archive_system.profiling') as logs:
+            self.client.get(reverse('document-list'))
+
+        output = '\n'.join(logs.output)
+        self.assertIn('Повільний SQL-запит', output)
+        self.assertIn('у document-list', output)
+        self.assertIn('Повільний запит GET', output)
+        self.assertTrue(any(name.startswith('document-list-') for name in os.listdir(directory)))
+
+    def test_metrics_require_staff_or_token(self):
+        self.client.force_login(User.objects.create_user('student', password='secret-pass-123'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+        with override_settings(REQUEST_PROFILING=dict(PROFILING, TOKEN='scrape-secret')):
+            self.client.logout()
+            response = self.client.get(reverse('metrics'), {'format': 'prometheus'},
+                                       HTTP_AUTHORIZATION='Bearer scrape-secret')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+
+class SQLitePragmaTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connection_gets_configured_pragmas(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Лише для SQLite')
+        # PRAGMA застосовані хуком connection_created під час підключення тестової бази;
+        # synchronous=NORMAL має код 1
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
@@ -1,16 +1,23 @@
+import os
+
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
 
+from .profiling import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', TemplateView.as_view(template_name='home.html'), name='home'),
     path('documents/', include('documents.urls')),
     path('users/', include('users.urls')),
     path('reports/', include('reports.urls')),
+    path('metrics/', metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    # Лише файли звітів: документи віддаються через document_download з перевіркою
+    # доступу, тож каталог documents/ не публікується навіть у режимі розробки
+    urlpatterns += static(settings.MEDIA_URL + 'reports/', document_root=os.path.join(settings.MEDIA_ROOT, 'reports'))
\ No newline at end of file
@@ -1,27 +1,82 @@
 from django.contrib import admin
-from .models import Document, DocumentCategory, StorageLocation, DocumentHistory
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.template.response import TemplateResponse
+from import_export.admin import ImportExportModelAdmin
+from .bulk import bulk_update_documents
+from .forms import DocumentBulkUpdateForm
+from .models import Document, DocumentCategory, StorageLocation, DocumentHistory, ExpiryNotification, FileBlob
+from .resources import DocumentResource
 
 @admin.register(Document)
-class DocumentAdmin(admin.ModelAdmin):
+class DocumentAdmin(ImportExportModelAdmin):
+    resource_classes = [DocumentResource]
     list_display = ('title', 'document_type', 'document_number', 'issue_date', 'category', 'storage_location', 'created_by', 'created_at')
     list_filter = ('document_type', 'category', 'storage_location', 'issue_date', 'created_at')
     search_fields = ('title', 'document_number', 'description')
     date_hierarchy = 'created_at'
     readonly_fields = ('created_by', 'created_at', 'updated_at')
+    actions = ['bulk_change', 'bulk_relocate']
     
     def save_model(self, request, obj, form, change):
         if not change:
             obj.created_by = request.user
         super().save_model(request, obj, form, change)
+    
+    def get_import_resource_kwargs(self, request, **kwargs):
+        # Імпортовані документи й записи історії отримують автора імпорту
+        resource_kwargs = super().get_import_resource_kwargs(request, **kwargs)
+        resource_kwargs['user'] = request.user
+        return resource_kwargs
+    
+    @admin.action(description='Змінити категорію / місце зберігання / тип вибраних документів')
+    def bulk_change(self, request, queryset):
+        return self.bulk_update_view(request, queryset, 'bulk_change')
+    
+    @admin.action(description='Перемістити вибрані документи')
+    def bulk_relocate(self, request, queryset):
+        return self.bulk_update_view(request, queryset, 'bulk_relocate', fields=['storage_location'])
+    
+    def bulk_update_view(self, request, queryset, action, fields=None):
+        # Проміжна сторінка: «Перевірити» рахує документи без запису (dry-run),
+        # «Застосувати» змінює їх одним UPDATE і записує історію через bulk_create
+        form = DocumentBulkUpdateForm(request.POST if 'bulk_submit' in request.POST else None)
+        if fields:
+            for name in list(form.fields):
+                if name not in fields:
+                    del form.fields[name]
+        preview = None
+        if form.is_bound and form.is_valid():
+            apply = request.POST['bulk_submit'] == 'apply'
+            result = bulk_update_documents(queryset, form.get_changes(), user=request.user, dry_run=not apply)
+            if apply:
+                self.message_user(
+                    request, f"Змінено документів: {result['changed']} із {result['matched']} вибраних",
+                )
+                return None
+            preview = result
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Масова зміна документів',
+            'opts': self.model._meta,
+            'form': form,
+            'selected_ids': queryset.order_by().values_list('pk', flat=True),
+            'selected_count': queryset.count(),
+            'preview': preview,
+            'action': action,
+            'action_checkbox_name': ACTION_CHECKBOX_NAME,
+            'select_across': request.POST.get('select_across', '0'),
+        }
+        return TemplateResponse(request, 'admin/documents/document/bulk_change.html', context)
 
 @admin.register(DocumentCategory)
 class DocumentCategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'description')
+    list_display = ('name', 'description', 'document_count')
     search_fields = ('name', 'description')
 
 @admin.register(StorageLocation)
 class StorageLocationAdmin(admin.ModelAdmin):
-    list_display = ('name', 'room', 'shelf', 'box')
+    list_display = ('name', 'room', 'shelf', 'box', 'document_count')
     search_fields = ('name', 'room', 'shelf', 'box')
 
 @admin.register(DocumentHistory)
@@ -30,4 +85,19 @@ class DocumentHistoryAdmin(admin.ModelAdmin):
     list_filter = ('action', 'timestamp', 'user')
     search_fields = ('document__title', 'user__username', 'details')
     date_hierarchy = 'timestamp'
-    readonly_fields = ('document', 'user', 'action', 'timestamp', 'details')
\ No newline at end of file
+    readonly_fields = ('document', 'user', 'action', 'timestamp', 'details')
+
+@admin.register(FileBlob)
+class FileBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'refcount', 'created_at', 'stored_at')
+    search_fields = ('name', 'sha256')
+    readonly_fields = ('sha256', 'name', 'size', 'refcount', 'created_at', 'stored_at')
+
+@admin.register(ExpiryNotification)
+class ExpiryNotificationAdmin(admin.ModelAdmin):
+    list_display = ('document', 'expiry_date', 'days_before', 'created_at')
+    list_filter = ('days_before', 'expiry_date')
+    list_select_related = ('document',)
+    search_fields = ('document__title', 'document__document_number')
+    date_hierarchy = 'expiry_date'
+    readonly_fields = ('document', 'expiry_date', 'days_before', 'created_at')
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class DocumentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'documents'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .history import get_setting, history_buffer
+        if get_setting('ENABLED'):
+            history_buffer.start()
@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import change_counts, count_bulk_changes
+from .models import Document, DocumentHistory
+from .signals import bulk_changed
+
+# Поля, які можна змінювати масово одним UPDATE
+BULK_FIELDS = ('category', 'storage_location', 'document_type')
+
+# Обмеження кількості параметрів у запиті (SQLite — 999)
+ID_CHUNK_SIZE = 500
+
+
+def describe_changes(changes):
+    labels = {
+        'category': 'категорія',
+        'storage_location': 'місце зберігання',
+        'document_type': 'тип',
+    }
+    document_types = dict(Document.DOCUMENT_TYPES)
+    parts = []
+    for field, value in changes.items():
+        if field == 'document_type':
+            value = document_types.get(value, value)
+        parts.append(f'{labels[field]}: {value if value is not None else "не вказано"}')
+    return ', '.join(parts)
+
+
+def bulk_update_documents(queryset, changes, user=None, dry_run=False):
+    # Змінює category / storage_location / document_type в усіх документах queryset
+    # кількома UPDATE ... WHERE id IN (...) і пише записи історії через bulk_create.
+    # Повертає {'matched': знайдено документів, 'changed': документів зі зміною}
+    unknown = set(changes) - set(BULK_FIELDS)
+    if unknown or not changes:
+        raise ValueError(f"Масово можна змінювати лише поля: {', '.join(BULK_FIELDS)}")
+
+    matched = queryset.count()
+    # Документи, у яких усі поля вже мають потрібні значення, не чіпаємо
+    to_change = queryset.exclude(**changes).order_by().values_list('pk', flat=True)
+    if dry_run:
+        return {'matched': matched, 'changed': to_change.count()}
+
+    ids = list(to_change)
+    details = f'Масова зміна ({describe_changes(changes)})'
+    if user is not None:
+        details += f' користувачем {user.username}'
+    now = timezone.now()
+    with transaction.atomic():
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[start:start + ID_CHUNK_SIZE]
+            deltas = count_bulk_changes(Document.objects.filter(pk__in=chunk), changes)
+            # updated_at оновлюється явно: від нього залежать ETag і кеш сторінки документа
+            Document.objects.filter(pk__in=chunk).update(**changes, updated_at=now)
+            change_counts(deltas)
+        DocumentHistory.objects.bulk_create([
+            DocumentHistory(document_id=pk, user=user, action='update', details=details, timestamp=now)
+            for pk in ids
+        ], batch_size=1000)
+
+    if ids:
+        bulk_changed.send(sender=Document)
+        bulk_changed.send(sender=DocumentHistory)
+    return {'matched': matched, 'changed': len(ids)}
@@ -0,0 +1,50 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+# Лічильник змін категорій і місць зберігання: їх назви показуються на сторінці
+# документа, але не змінюють його updated_at
+RELATED_VERSION_KEY = 'documents:related-version'
+
+# Лічильник змін документів з терміном дії для віджета «Термін дії спливає»
+EXPIRY_VERSION_KEY = 'documents:expiry-version'
+
+# Скільки секунд зберігати фрагменти сторінки документа
+DEFAULT_FRAGMENT_TIMEOUT = 600
+
+
+def get_fragment_timeout():
+    return getattr(settings, 'DOCUMENT_FRAGMENT_CACHE_TIMEOUT', DEFAULT_FRAGMENT_TIMEOUT)
+
+
+def get_version(key):
+    return cache.get_or_set(key, 1, timeout=None)
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def get_related_version():
+    return get_version(RELATED_VERSION_KEY)
+
+
+def bump_related_version():
+    bump_version(RELATED_VERSION_KEY)
+
+
+def document_detail_version(document):
+    # Версія блоку з даними документа; зміна документа дає новий ключ фрагмента,
+    # тож після збереження старий фрагмент більше не використовується
+    return f'{document.updated_at.timestamp()}:{get_related_version()}'
+
+
+def document_etag(document, user, detail_version):
+    # Сторінка містить ім'я користувача в меню, тож ETag різний для кожного користувача
+    payload = f'{document.pk}:{detail_version}:{document.last_change_id}:{user.pk}'
+    return quote_etag(hashlib.md5(payload.encode('utf-8')).hexdigest())
@@ -0,0 +1,203 @@
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+
+from .models import Document, DocumentCategory, DocumentSummary, DocumentTypeCount, StorageLocation
+
+# Скільки різних рядків лічильників оновлювати поштучно; більше — масово
+BULK_THRESHOLD = 20
+
+
+# Ключ документа для лічильників і зведення:
+# (category_id, storage_location_id, document_type, перше число місяця видачі)
+def make_key(category_id, storage_location_id, document_type, issue_date):
+    return (category_id, storage_location_id, document_type, issue_date.replace(day=1) if issue_date else None)
+
+
+def document_key(document):
+    return make_key(document.category_id, document.storage_location_id, document.document_type, document.issue_date)
+
+
+def count_keys(keys, delta=1):
+    deltas = Counter()
+    for key in keys:
+        deltas[key] += delta
+    return deltas
+
+
+def change_counts(deltas):
+    # deltas: {ключ документа: зміна}. Усі лічильники і рядки зведення змінюються
+    # F()-виразами в одній транзакції, тож паралельні зміни не губляться
+    categories, locations = Counter(), Counter()
+    category_types, location_types = Counter(), Counter()
+    summary = Counter()
+    for (category_id, location_id, document_type, month), delta in deltas.items():
+        if month is not None:
+            summary[document_type, category_id or 0, location_id or 0, month] += delta
+        if category_id is not None:
+            categories[category_id] += delta
+            category_types[category_id, document_type] += delta
+        if location_id is not None:
+            locations[location_id] += delta
+            location_types[location_id, document_type] += delta
+
+    with transaction.atomic():
+        for model, totals in ((DocumentCategory, categories), (StorageLocation, locations)):
+            # Однакова зміна для багатьох записів (масовий імпорт) — один UPDATE
+            by_delta = defaultdict(list)
+            for pk, delta in totals.items():
+                if delta:
+                    by_delta[delta].append(pk)
+            for delta, pks in by_delta.items():
+                model.objects.filter(pk__in=pks).update(document_count=F('document_count') + delta)
+        # Унікальні індекси DocumentTypeCount часткові, тож ON CONFLICT повторює їхню умову
+        change_rows(DocumentTypeCount, ('category_id', 'document_type'), category_types,
+                    conflict_where=' WHERE category_id IS NOT NULL')
+        change_rows(DocumentTypeCount, ('storage_location_id', 'document_type'), location_types,
+                    conflict_where=' WHERE storage_location_id IS NOT NULL')
+        change_rows(DocumentSummary, ('document_type', 'category_id', 'storage_location_id', 'month'), summary)
+
+
+def change_rows(model, fields, deltas, conflict_where=''):
+    # deltas: {значення fields: зміна count}. Кілька рядків — поштучні F()-оновлення;
+    # для масових операцій на SQLite і PostgreSQL — один INSERT ... ON CONFLICT
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if len(deltas) <= BULK_THRESHOLD or connection.vendor not in ('sqlite', 'postgresql'):
+        for key, delta in deltas.items():
+            change_row(model, dict(zip(fields, key)), delta)
+        return
+
+    opts, quote = model._meta, connection.ops.quote_name
+    table = quote(opts.db_table)
+    model_fields = [opts.get_field(field) for field in fields]
+    columns = ', '.join(quote(field.column) for field in model_fields)
+    sql = (
+        f'INSERT INTO {table} ({columns}, {quote("count")}) VALUES ({", ".join(["%s"] * (len(fields) + 1))}) '
+        f'ON CONFLICT ({columns}){conflict_where} DO UPDATE '
+        f'SET {quote("count")} = {table}.{quote("count")} + excluded.{quote("count")}'
+    )
+    rows = [
+        [field.get_db_prep_value(value, connection) for field, value in zip(model_fields, key)] + [delta]
+        for key, delta in deltas.items()
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def change_row(model, lookup, delta):
+    if model.objects.filter(**lookup).update(count=F('count') + delta):
+        return
+    try:
+        # Рядка ще немає; паралельний запит міг створити його раніше за нас
+        with transaction.atomic():
+            model.objects.create(**lookup, count=delta)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(count=F('count') + delta)
+
+
+def count_bulk_changes(queryset, changes):
+    # Зміни лічильників для queryset.update(**changes): документи групуються за
+    # поточним ключем одним запитом, кожна група переходить у новий ключ
+    fields = ('category', 'storage_location', 'document_type')
+    deltas = Counter()
+    groups = queryset.order_by().values(
+        'category_id', 'storage_location_id', 'document_type', month=TruncMonth('issue_date'),
+    ).annotate(total=Count('pk'))
+    for group in groups:
+        old = (group['category_id'], group['storage_location_id'], group['document_type'], group['month'])
+        new = list(old)
+        for i, field in enumerate(fields):
+            if field in changes:
+                value = changes[field]
+                new[i] = getattr(value, 'pk', value)
+        deltas[old] -= group['total']
+        deltas[tuple(new)] += group['total']
+    return deltas
+
+
+def recount(dry_run=False):
+    # Перерахунок усіх лічильників з таблиці документів; повертає кількість
+    # виправлених значень
+    fixed = 0
+    with transaction.atomic():
+        for model, field in ((DocumentCategory, 'category'), (StorageLocation, 'storage_location')):
+            actual = dict(
+                Document.objects.filter(**{f'{field}__isnull': False}).order_by().values_list(field)
+                .annotate(total=Count('pk'))
+            )
+            stale = []
+            for obj in model.objects.only('pk', 'document_count'):
+                if obj.document_count != actual.get(obj.pk, 0):
+                    obj.document_count = actual.get(obj.pk, 0)
+                    stale.append(obj)
+            fixed += len(stale)
+            if stale and not dry_run:
+                model.objects.bulk_update(stale, ['document_count'], batch_size=1000)
+
+            rows = (
+                Document.objects.filter(**{f'{field}__isnull': False}).order_by()
+                .values_list(field, 'document_type').annotate(total=Count('pk'))
+            )
+            actual_types = {(pk, document_type): total for pk, document_type, total in rows}
+            stored = {
+                (pk, document_type): count
+                for pk, document_type, count in DocumentTypeCount.objects.filter(
+                    **{f'{field}__isnull': False}
+                ).values_list(field, 'document_type', 'count')
+            }
+            if actual_types != stored:
+                fixed += sum(
+                    1 for key in actual_types.keys() | stored.keys()
+                    if actual_types.get(key, 0) != stored.get(key, 0)
+                )
+                if not dry_run:
+                    DocumentTypeCount.objects.filter(**{f'{field}__isnull': False}).delete()
+                    DocumentTypeCount.objects.bulk_create([
+                        DocumentTypeCount(**{f'{field}_id': pk}, document_type=document_type, count=total)
+                        for (pk, document_type), total in actual_types.items()
+                    ], batch_size=1000)
+    return fixed
+
+
+def rebuild_summary(batch_size=5000):
+    # Повна перебудова зведення одним GROUP BY по таблиці документів
+    rows = (
+        Document.objects.order_by()
+        .values('document_type', 'category_id', 'storage_location_id', month=TruncMonth('issue_date'))
+        .annotate(total=Count('pk'))
+    )
+    created = 0
+    with transaction.atomic():
+        DocumentSummary.objects.all().delete()
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(DocumentSummary(
+                document_type=row['document_type'], category_id=row['category_id'] or 0,
+                storage_location_id=row['storage_location_id'] or 0, month=row['month'], count=row['total'],
+            ))
+            if len(batch) >= batch_size:
+                created += len(DocumentSummary.objects.bulk_create(batch))
+                batch = []
+        created += len(DocumentSummary.objects.bulk_create(batch))
+    return created
+
+
+def release_summary_rows(field, pk):
+    # Після видалення категорії чи місця зберігання їхні документи лишаються
+    # «без категорії» (SET_NULL) — переносимо рядки зведення до ключа 0
+    deltas = Counter()
+    rows = DocumentSummary.objects.filter(**{field: pk})
+    for row in rows:
+        key = {'document_type': row.document_type, 'category_id': row.category_id,
+               'storage_location_id': row.storage_location_id, 'month': row.month}
+        key[field] = 0
+        deltas[tuple(key.values())] += row.count
+    with transaction.atomic():
+        rows.delete()
+        for (document_type, category_id, location_id, month), delta in deltas.items():
+            change_row(DocumentSummary, {
+                'document_type': document_type, 'category_id': category_id,
+                'storage_location_id': location_id, 'month': month,
+            }, delta)
@@ -0,0 +1,136 @@
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .storage import is_blob_name
+
+DEFAULTS = {
+    # 'python' — FileResponse з підтримкою Range (віддається через os.sendfile, якщо
+    # WSGI-сервер має wsgi.file_wrapper, як gunicorn); 'x-sendfile' — Apache
+    # (mod_xsendfile); 'x-accel' — nginx
+    'BACKEND': 'python',
+    # Для nginx: internal-location, що вказує на MEDIA_ROOT, наприклад
+    #   location /protected-media/ { internal; alias /srv/archive/media/; }
+    'INTERNAL_PREFIX': '/protected-media/',
+}
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def get_setting(name):
+    return getattr(settings, 'DOCUMENT_DOWNLOADS', {}).get(name, DEFAULTS[name])
+
+
+def parse_range(header, size):
+    # Підтримується один діапазон; кілька (multipart/byteranges) — віддаємо весь файл
+    match = RANGE_RE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    start, end = match.groups()
+    if start == '':
+        # bytes=-N — останні N байтів
+        length = int(end)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+class RangeFile:
+    # Обмежує читання файлу діапазоном. fileno() лишається доступним, тож
+    # gunicorn віддає діапазон через os.sendfile з поточної позиції до Content-Length
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(name, size, mtime):
+    # Ім'я блобу — це SHA-256 вмісту, тож ETag сильний і не залежить від часу зміни
+    if is_blob_name(name):
+        return quote_etag(os.path.basename(name))
+    return quote_etag(f'{int(mtime):x}-{size:x}')
+
+
+def serve_document_file(request, document):
+    storage = document.file.storage
+    name = document.file.name
+    filename = document.original_filename or os.path.basename(name)
+    disposition = f"attachment; filename*=UTF-8''{quote(filename)}"
+
+    backend = get_setting('BACKEND')
+    if backend == 'x-accel':
+        # nginx сам перевіряє Range, If-Modified-Since і віддає файл через sendfile
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = quote(get_setting('INTERNAL_PREFIX') + name)
+        response['Content-Disposition'] = disposition
+        # Порожній Content-Type — nginx визначить його за розширенням/типами сам
+        del response['Content-Type']
+        return response
+    if backend == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = storage.path(name)
+        response['Content-Disposition'] = disposition
+        del response['Content-Type']
+        return response
+
+    path = storage.path(name)
+    stat = os.stat(path)
+    etag = file_etag(name, stat.st_size, stat.st_mtime)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    # If-Range: діапазон лише для тієї ж версії файлу, інакше — файл повністю
+    if range_header and request.headers.get('If-Range', etag) in (etag, http_date(last_modified)):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+    source = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(source, as_attachment=True, filename=filename)
+    else:
+        start, end = byte_range
+        response = FileResponse(RangeFile(source, start, end - start + 1), as_attachment=True,
+                                filename=filename, status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import EXPIRY_VERSION_KEY, get_version
+from .models import Document, ExpiryNotification
+
+DEFAULTS = {
+    # Пороги повідомлень: за скільки днів до закінчення терміну дії
+    'NOTIFY_DAYS': [30, 7, 1],
+    'BATCH_SIZE': 500,
+    'WIDGET_DAYS': 30,
+    'WIDGET_LIMIT': 5,
+    # Ключ віджета містить дату і версію документів, тож таймаут лише прибирає старі ключі
+    'WIDGET_CACHE_TIMEOUT': 3600,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'DOCUMENT_EXPIRY', {}).get(name, DEFAULTS[name])
+
+
+def expiring_soon(days=None, limit=None):
+    # Дані віджета «Термін дії спливає»: кількість і найближчі документи
+    days = get_setting('WIDGET_DAYS') if days is None else days
+    limit = get_setting('WIDGET_LIMIT') if limit is None else limit
+    today = timezone.localdate()
+    key = f'documents:expiring:{today.isoformat()}:{days}:{limit}:{get_version(EXPIRY_VERSION_KEY)}'
+    widget = cache.get(key)
+    if widget is None:
+        queryset = Document.objects.expiring_within(days, today)
+        documents = list(
+            queryset.order_by('expiry_date', 'id').values('pk', 'title', 'document_number', 'expiry_date')[:limit]
+        )
+        for document in documents:
+            document['days_left'] = (document['expiry_date'] - today).days
+        widget = {'days': days, 'total': queryset.count(), 'documents': documents}
+        cache.set(key, widget, get_setting('WIDGET_CACHE_TIMEOUT'))
+    return widget
+
+
+def notification_windows(thresholds):
+    # Документ отримує повідомлення найменшого порогу, до якого вже потрапив:
+    # за 30 днів — коли лишилось 8..30, за 7 — 2..7, за 1 — 0..1
+    previous = -1
+    for days in sorted(set(thresholds)):
+        yield days, previous + 1, days
+        previous = days
+
+
+def iter_batches(queryset, batch_size):
+    # Пачки (pk, expiry_date) за курсором (expiry_date, id) по індексу
+    # document_expiry_date_idx, без OFFSET
+    queryset = queryset.order_by('expiry_date', 'pk').values_list('pk', 'expiry_date')
+    last = None
+    while True:
+        page = queryset
+        if last is not None:
+            page = page.filter(Q(expiry_date__gt=last[1]) | Q(expiry_date=last[1], pk__gt=last[0]))
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
+
+
+def scan_expiring(thresholds=None, batch_size=None, today=None, dry_run=False):
+    # Створює повідомлення для документів, термін дії яких спливає; повторний запуск
+    # не дублює їх. Кожна пачка записується окремою транзакцією
+    thresholds = get_setting('NOTIFY_DAYS') if thresholds is None else thresholds
+    batch_size = batch_size or get_setting('BATCH_SIZE')
+    today = today or timezone.localdate()
+    stats = {'matched': 0, 'created': 0}
+    for days_before, start, end in notification_windows(thresholds):
+        queryset = Document.objects.expiring_within(end, today).filter(
+            expiry_date__gte=today + timedelta(days=start)
+        )
+        for batch in iter_batches(queryset, batch_size):
+            stats['matched'] += len(batch)
+            existing = set(
+                ExpiryNotification.objects.filter(
+                    document_id__in=[pk for pk, _ in batch], days_before=days_before,
+                ).values_list('document_id', 'expiry_date')
+            )
+            notifications = [
+                ExpiryNotification(document_id=pk, expiry_date=expiry_date, days_before=days_before)
+                for pk, expiry_date in batch if (pk, expiry_date) not in existing
+            ]
+            stats['created'] += len(notifications)
+            if notifications and not dry_run:
+                with transaction.atomic():
+                    # Паралельний запуск міг уже створити частину повідомлень
+                    ExpiryNotification.objects.bulk_create(notifications, ignore_conflicts=True)
+    return stats
@@ -52,4 +52,38 @@ class DocumentSearchForm(forms.Form):
         label='Місце зберігання',
         queryset=StorageLocation.objects.all(),
         required=False
-    )
\ No newline at end of file
+    )
+    # Посилання «Усі» з віджета «Термін дії спливає»
+    expiring_within = forms.IntegerField(
+        label='Термін дії спливає протягом, днів',
+        min_value=0,
+        max_value=3650,
+        widget=forms.HiddenInput,
+        required=False
+    )
+class DocumentBulkUpdateForm(forms.Form):
+    # Порожнє поле означає «не змінювати»
+    category = forms.ModelChoiceField(
+        label='Нова категорія',
+        queryset=DocumentCategory.objects.all(),
+        required=False
+    )
+    storage_location = forms.ModelChoiceField(
+        label='Нове місце зберігання',
+        queryset=StorageLocation.objects.all(),
+        required=False
+    )
+    document_type = forms.ChoiceField(
+        label='Новий тип документа',
+        choices=[('', '---')] + list(Document.DOCUMENT_TYPES),
+        required=False
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.get_changes():
+            raise forms.ValidationError('Вкажіть хоча б одне поле для зміни')
+        return cleaned_data
+
+    def get_changes(self):
+        return {name: value for name, value in self.cleaned_data.items() if value}
@@ -0,0 +1,177 @@
+import atexit
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Вимкнений буфер пише кожну подію одразу, як і раніше
+    'ENABLED': True,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 5,
+    # Поза деревом проєкту; у продакшені краще вказати постійний каталог
+    'SPOOL_PATH': os.path.join(tempfile.gettempdir(), 'archive_system', 'history_spool.jsonl'),
+    # Частка переглядів, що потрапляють у журнал (1.0 — усі)
+    'VIEW_SAMPLE_RATE': 1.0,
+    # Повторний перегляд того ж документа тим самим користувачем у цьому вікні не записується
+    'VIEW_DEDUP_SECONDS': 0,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'DOCUMENT_HISTORY_BUFFER', {}).get(name, DEFAULTS[name])
+
+
+class HistoryBuffer:
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.flusher = None
+        self.exit_registered = False
+
+    def add(self, document_id, user_id, action, details=''):
+        event = {
+            'document_id': document_id,
+            'user_id': user_id,
+            'action': action,
+            'details': details,
+            'timestamp': timezone.now(),
+        }
+        if not get_setting('ENABLED'):
+            self.write([event])
+            return
+
+        with self.lock:
+            self.events.append(event)
+            due = (
+                len(self.events) >= get_setting('BATCH_SIZE')
+                or time.monotonic() - self.last_flush >= get_setting('FLUSH_INTERVAL')
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            events, self.events = self.events, []
+            self.last_flush = time.monotonic()
+        if not events:
+            return 0
+        try:
+            return self.write(events)
+        except Exception:
+            logger.exception('Не вдалося записати історію документів, події збережено у спул')
+            self.spool(events)
+            return 0
+
+    def write(self, events):
+        from .models import Document, DocumentHistory
+        from .signals import bulk_changed
+
+        # Документ міг бути видалений, поки подія чекала в буфері
+        document_ids = {event['document_id'] for event in events}
+        existing = set(Document.objects.filter(pk__in=document_ids).values_list('pk', flat=True))
+        entries = [
+            DocumentHistory(**event) for event in events if event['document_id'] in existing
+        ]
+        DocumentHistory.objects.bulk_create(entries, batch_size=get_setting('BATCH_SIZE'))
+        if entries:
+            bulk_changed.send(sender=DocumentHistory)
+        return len(entries)
+
+    def spool(self, events):
+        os.makedirs(os.path.dirname(get_setting('SPOOL_PATH')), exist_ok=True)
+        with open(get_setting('SPOOL_PATH'), 'a', encoding='utf-8') as spool_file:
+            for event in events:
+                spool_file.write(json.dumps(dict(event, timestamp=event['timestamp'].isoformat())) + '\n')
+
+    def replay_spool(self):
+        path = get_setting('SPOOL_PATH')
+        if not os.path.exists(path):
+            return 0
+        # Перейменування атомарне, тож кілька процесів не запишуть ті самі події двічі
+        replay_path = f'{path}.{os.getpid()}'
+        try:
+            os.replace(path, replay_path)
+        except FileNotFoundError:
+            return 0
+
+        with open(replay_path, encoding='utf-8') as spool_file:
+            events = [json.loads(line) for line in spool_file if line.strip()]
+        for event in events:
+            event['timestamp'] = parse_datetime(event['timestamp'])
+        try:
+            written = self.write(events)
+        except Exception:
+            logger.exception('Не вдалося відтворити спул історії документів')
+            os.replace(replay_path, path)
+            return 0
+        os.remove(replay_path)
+        return written
+
+    def start(self):
+        # Фоновий запис і збереження буфера при виході; викликається з
+        # DocumentsConfig.ready, лише якщо буфер увімкнено
+        with self.lock:
+            if self.flusher is None:
+                self.flusher = threading.Thread(target=self.run_flusher, name='history-flusher', daemon=True)
+                self.flusher.start()
+            if not self.exit_registered:
+                atexit.register(self.shutdown)
+                self.exit_registered = True
+
+    def run_flusher(self):
+        interval = get_setting('FLUSH_INTERVAL')
+        while True:
+            time.sleep(interval)
+            if time.monotonic() - self.last_flush < interval:
+                continue
+            close_old_connections()
+            self.flush()
+            connection.close()
+
+    def shutdown(self):
+        with self.lock:
+            events, self.events = self.events, []
+        if not events:
+            return
+        try:
+            self.write(events)
+        except Exception:
+            self.spool(events)
+
+
+history_buffer = HistoryBuffer()
+
+
+def should_log_view(document_id, user_id):
+    sample_rate = get_setting('VIEW_SAMPLE_RATE')
+    if sample_rate < 1 and random.random() >= sample_rate:
+        return False
+
+    window = get_setting('VIEW_DEDUP_SECONDS')
+    if window:
+        return cache.add(f'document-view:{document_id}:{user_id}', True, timeout=window)
+    return True
+
+
+def log_document_view(document, user):
+    if not should_log_view(document.pk, user.pk):
+        return
+    history_buffer.add(
+        document_id=document.pk,
+        user_id=user.pk,
+        action='view',
+        details=f'Перегляд документа користувачем {user.username}',
+    )
@@ -0,0 +1,117 @@
+import random
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection, connections
+from django.test import override_settings
+
+from documents.models import Document, DocumentHistory
+
+BENCHMARK_DETAILS = 'benchmark_database'
+
+# Налаштування SQLite до WAL: журнал відкату і повна синхронізація
+ROLLBACK_JOURNAL_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'busy_timeout': 0,
+}
+
+
+class Command(BaseCommand):
+    help = ('Вимірює пропускну здатність бази під конкурентним навантаженням: потоки читають '
+            'картку документа з історією і записують перегляди в DocumentHistory. Для SQLite '
+            'з --compare — також з журналом відкату замість WAL')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 8], help='Кількість потоків')
+        parser.add_argument('--seconds', type=float, default=5, help='Тривалість кожного заміру')
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='Частка операцій запису')
+        parser.add_argument('--compare', action='store_true',
+                            help='SQLite: порівняти з journal_mode=DELETE, synchronous=FULL')
+
+    def handle(self, *args, **options):
+        pks = list(Document.objects.values_list('pk', flat=True)[:10000])
+        if not pks:
+            raise CommandError('База порожня, спочатку запустіть seed_archive')
+
+        modes = [('поточні налаштування', None)]
+        if options['compare']:
+            if connection.vendor != 'sqlite':
+                raise CommandError('--compare доступне лише для SQLite')
+            modes.insert(0, ('журнал відкату', ROLLBACK_JOURNAL_PRAGMAS))
+
+        database = settings.DATABASES['default']
+        self.stdout.write(f"База: {connection.vendor} ({database.get('NAME')}), запис: {options['write_ratio']:.0%}")
+        self.stdout.write(f"{'Режим':<24}{'потоки':>8}{'операцій/с':>12}{'запис/с':>10}"
+                          f"{'p95, мс':>10}{'помилок':>10}")
+        try:
+            for label, pragmas in modes:
+                for threads in options['threads']:
+                    result = self.run_mode(pragmas, pks, threads, options)
+                    self.stdout.write(
+                        f"{label:<24}{threads:>8}{result['ops']:>12.0f}{result['writes']:>10.0f}"
+                        f"{result['p95_ms']:>10.2f}{result['errors']:>10}"
+                    )
+        finally:
+            DocumentHistory.objects.filter(details=BENCHMARK_DETAILS).delete()
+
+    def run_mode(self, pragmas, pks, threads, options):
+        # PRAGMA застосовуються при підключенні, тож з'єднання відкриваються заново
+        connections.close_all()
+        if pragmas is None:
+            return self.run_threads(pks, threads, options)
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            result = self.run_threads(pks, threads, options)
+            connections.close_all()
+        return result
+
+    def run_threads(self, pks, threads, options):
+        deadline = time.monotonic() + options['seconds']
+        results = []
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            timings, writes, errors = [], 0, 0
+            try:
+                while time.monotonic() < deadline:
+                    pk = rng.choice(pks)
+                    started = time.perf_counter()
+                    try:
+                        if rng.random() < options['write_ratio']:
+                            DocumentHistory.objects.create(document_id=pk, action='view', details=BENCHMARK_DETAILS)
+                            writes += 1
+                        else:
+                            # Запити сторінки документа: сам документ і останні записи історії
+                            document = Document.objects.select_related('category', 'storage_location').get(pk=pk)
+                            list(document.history.select_related('user').order_by('-timestamp', '-id')[:5])
+                    except OperationalError:
+                        # «database is locked» — запис не дочекався блокування
+                        errors += 1
+                        continue
+                    timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                close_old_connections()
+                connection.close()
+            with lock:
+                results.append((timings, writes, errors))
+
+        workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+        started = time.monotonic()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        timings = [timing for result in results for timing in result[0]]
+        writes = sum(result[1] for result in results)
+        return {
+            'ops': len(timings) / elapsed,
+            'writes': writes / elapsed,
+            'p95_ms': statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else 0,
+            'errors': sum(result[2] for result in results),
+        }
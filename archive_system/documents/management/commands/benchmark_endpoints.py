@@ -0,0 +1,181 @@
+import json
+import platform
+import statistics
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from documents.models import Document, DocumentHistory
+from reports.generators import generate_report
+from reports.models import Report
+
+
+def percentile(values, percent):
+    # Найближчий ранг: для малих вибірок не інтерполюємо між вимірами
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = ('Вимірює p50/p95 часу відповіді та кількість SQL-запитів гарячих сторінок '
+            '(список документів з фільтрами, картка, історія, CSV-експорт, PDF-звіт) і '
+            'записує результат у JSON для порівняння між релізами')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Кількість вимірів кожної сторінки')
+        parser.add_argument('--warmup', type=int, default=2, help='Кількість прогрівальних запитів без вимірювання')
+        parser.add_argument('--output', default='benchmark.json', help='Файл для результатів')
+        parser.add_argument('--baseline', help='JSON попереднього запуску для порівняння')
+        parser.add_argument('--user', help="Користувач, від якого виконуються запити (за замовчуванням — перший адміністратор)")
+        parser.add_argument('--only', nargs='*', help='Виміряти лише вказані сторінки')
+
+    def handle(self, *args, **options):
+        if options['repeat'] <= 0:
+            raise CommandError('--repeat має бути додатним')
+        user = self.get_user(options['user'])
+        document = Document.objects.order_by('-pk').first()
+        if document is None:
+            raise CommandError('База порожня, спочатку запустіть seed_archive')
+
+        # Клієнт тестів звертається до хоста testserver
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            client = Client()
+            client.force_login(user)
+            endpoints = self.get_endpoints(client, user, document)
+            if options['only']:
+                unknown = set(options['only']) - set(endpoints)
+                if unknown:
+                    raise CommandError(f"Невідомі сторінки: {', '.join(sorted(unknown))}")
+                endpoints = {name: endpoints[name] for name in options['only']}
+
+            results = {}
+            for name, request in endpoints.items():
+                results[name] = self.measure(request, options['repeat'], options['warmup'])
+                self.stdout.write(
+                    f"{name:<28}p50 {results[name]['p50_ms']:>9.2f} мс  p95 {results[name]['p95_ms']:>9.2f} мс  "
+                    f"запитів {results[name]['queries']:>4}"
+                )
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'data': {
+                'documents': Document.objects.count(),
+                'history': DocumentHistory.objects.count(),
+                'users': User.objects.count(),
+            },
+            'repeat': options['repeat'],
+            'endpoints': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"Результати записано у {options['output']}"))
+
+        if options['baseline']:
+            self.compare(options['baseline'], results)
+
+    def get_user(self, username):
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f'Користувача {username} не знайдено')
+            return user
+        user = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if user is None:
+            raise CommandError('Немає адміністратора; вкажіть користувача через --user')
+        return user
+
+    def get_endpoints(self, client, user, document):
+        list_url = reverse('document-list')
+        word = document.title.split()[0]
+        filters = {
+            'document_list': {},
+            'document_list_query': {'query': word},
+            'document_list_type': {'document_type': document.document_type},
+            'document_list_category': {'category': document.category_id or ''},
+            'document_list_location': {'storage_location': document.storage_location_id or ''},
+            'document_list_dates': {'start_date': '2000-01-01', 'end_date': '2010-12-31'},
+        }
+        endpoints = {
+            name: (lambda params=params: client.get(list_url, params))
+            for name, params in filters.items()
+        }
+        endpoints.update({
+            'document_detail': lambda: client.get(reverse('document-detail', kwargs={'pk': document.pk})),
+            'document_history': lambda: client.get(reverse('document-history', kwargs={'pk': document.pk})),
+            'export_csv': lambda: client.get(reverse('export-csv'), {'category': document.category_id or ''}),
+            'report_pdf': lambda: self.generate_pdf(user, document),
+        })
+        return endpoints
+
+    def generate_pdf(self, user, document):
+        # Звіт генерується напряму, без черги воркера і кешу готових файлів
+        report = Report.objects.create(
+            title='Benchmark', report_type='document_list', created_by=user,
+            parameters={'category_id': document.category_id},
+        )
+        try:
+            generate_report(report)
+            return 200 if report.file else 500
+        finally:
+            report.file.delete(save=False)
+            report.delete()
+
+    def measure(self, request, repeat, warmup):
+        for _ in range(warmup):
+            self.run(request)
+        timings, queries, status = [], [], None
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                status = self.run(request)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+        return {
+            'status': status,
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'max_ms': round(max(timings), 3),
+            'queries': max(queries),
+        }
+
+    def run(self, request):
+        response = request()
+        if isinstance(response, int):
+            return response
+        # Потокові відповіді (CSV) вимірюються разом із читанням усього тіла
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        else:
+            response.content
+        response.close()
+        return response.status_code
+
+    def compare(self, path, results):
+        with open(path, encoding='utf-8') as source:
+            baseline = json.load(source).get('endpoints', {})
+        self.stdout.write(f"{'Сторінка':<28}{'p50, %':>10}{'p95, %':>10}{'запити':>10}")
+        for name, result in results.items():
+            before = baseline.get(name)
+            if before is None:
+                self.stdout.write(f'{name:<28}{"нова":>10}')
+                continue
+            p50 = (result['p50_ms'] / before['p50_ms'] - 1) * 100 if before['p50_ms'] else 0
+            p95 = (result['p95_ms'] / before['p95_ms'] - 1) * 100 if before['p95_ms'] else 0
+            queries = result['queries'] - before['queries']
+            line = f'{name:<28}{p50:>+10.1f}{p95:>+10.1f}{queries:>+10d}'
+            self.stdout.write(self.style.WARNING(line) if p95 > 20 or queries > 0 else line)
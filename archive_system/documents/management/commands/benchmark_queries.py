@@ -0,0 +1,78 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from documents.models import Document, DocumentCategory, DocumentHistory
+
+
+class Command(BaseCommand):
+    help = ('Вимірює час і плани запитів пошуку, звітів та історії; з --compare — '
+            'також без індексів Document/DocumentHistory (у транзакції, що відкочується)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Кількість повторів кожного запиту')
+        parser.add_argument('--compare', action='store_true', help='Порівняти з часом без індексів')
+        parser.add_argument('--explain', action='store_true', help='Вивести плани запитів')
+
+    def handle(self, *args, **options):
+        queries = self.get_queries()
+        if not queries:
+            raise CommandError('База порожня, спочатку запустіть seed_archive')
+
+        with_indexes = self.measure(queries, options)
+        without_indexes = None
+        if options['compare']:
+            with transaction.atomic():
+                self.drop_indexes()
+                without_indexes = self.measure(queries, options)
+                transaction.set_rollback(True)
+
+        self.stdout.write(f"{'Запит':<32}{'з індексами, мс':>18}{'без індексів, мс':>20}")
+        for name in queries:
+            before = f'{without_indexes[name]:.2f}' if without_indexes else '-'
+            self.stdout.write(f'{name:<32}{with_indexes[name]:>18.2f}{before:>20}')
+
+    def get_queries(self):
+        category = DocumentCategory.objects.order_by('?').first()
+        document = Document.objects.order_by('?').first()
+        if document is None:
+            return {}
+        start = date.today() - timedelta(days=365 * 5)
+        end = start + timedelta(days=90)
+        return {
+            'список документів': Document.objects.order_by('-created_at', '-id')[:10],
+            'фільтр за типом': Document.objects.filter(document_type='order').order_by('-created_at', '-id')[:10],
+            'фільтр за датою видачі': Document.objects.filter(issue_date__range=(start, end))[:10],
+            'категорія + дата видачі': Document.objects.filter(
+                category=category, issue_date__gte=start
+            ).order_by('issue_date')[:10],
+            'кількість за типом': Document.objects.filter(document_type='order').values('pk'),
+            'термін дії спливає': Document.objects.expiring_within(30).order_by('expiry_date', 'id')[:10],
+            'кількість: термін спливає': Document.objects.expiring_within(30).values('pk'),
+            'історія документа': DocumentHistory.objects.filter(document=document).order_by('-timestamp', '-id')[:20],
+        }
+
+    def measure(self, queries, options):
+        results = {}
+        for name, queryset in queries.items():
+            if options['explain']:
+                self.stdout.write(f'--- {name}\n{queryset.explain()}')
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                if name.startswith('кількість'):
+                    queryset.count()
+                else:
+                    list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+        return results
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in (Document, DocumentHistory):
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from documents.uploads import cleanup_stale_uploads, get_setting
+
+
+class Command(BaseCommand):
+    help = 'Видаляє тимчасові файли незавершених поштучних завантажень'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=get_setting('EXPIRE_HOURS'),
+                            help='Вік (у годинах) останньої активності завантаження')
+
+    def handle(self, *args, **options):
+        removed = cleanup_stale_uploads(options['hours'])
+        self.stdout.write(self.style.SUCCESS(f'Видалено незавершених завантажень: {removed}'))
@@ -0,0 +1,65 @@
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from documents.models import Document
+from documents.signals import bulk_changed
+from documents.storage import document_storage, is_blob_name, recount_blobs
+from documents.uploads import file_checksum
+
+
+class Command(BaseCommand):
+    help = ('Переносить файли документів, збережені до появи адресованого вмістом сховища, '
+            'у сховище: однакові файли лишаються в одному примірнику')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Лише порахувати дублікати')
+
+    def handle(self, *args, **options):
+        upload_to = Document._meta.get_field('file').upload_to
+        documents = (
+            Document.objects.exclude(file='').exclude(file__isnull=True)
+            .only('pk', 'file', 'original_filename').iterator(chunk_size=500)
+        )
+        legacy = {}
+        digests = {}
+        moved = 0
+        for document in documents:
+            name = document.file.name
+            if is_blob_name(name):
+                continue
+            path = document_storage.path(name)
+            if not os.path.exists(path):
+                self.stderr.write(f'Файл не знайдено: {name}')
+                continue
+            legacy[name] = os.path.getsize(path)
+            if options['dry_run']:
+                digests[file_checksum(path)] = legacy[name]
+                continue
+
+            with open(path, 'rb') as source:
+                new_name = document_storage.save(os.path.join(upload_to, os.path.basename(name)), File(source))
+            digests[new_name] = legacy[name]
+            Document.objects.filter(pk=document.pk).update(
+                file=new_name,
+                original_filename=document.original_filename or os.path.basename(name),
+                updated_at=timezone.now(),
+            )
+            moved += 1
+
+        if not options['dry_run']:
+            recount_blobs()
+            for name in legacy:
+                if not Document.objects.filter(file=name).exists():
+                    os.remove(document_storage.path(name))
+            if moved:
+                bulk_changed.send(sender=Document)
+
+        saved = sum(legacy.values()) - sum(digests.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Файлів у старому форматі: {len(legacy)}, унікальних: {len(digests)}, '
+            f'економія {saved / 1024 / 1024:.2f} МБ'
+        ))
+
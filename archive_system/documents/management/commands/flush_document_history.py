@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from documents.history import history_buffer
+
+
+class Command(BaseCommand):
+    help = 'Записує до бази події історії, збережені у спул-файлі після аварійного завершення'
+
+    def handle(self, *args, **options):
+        written = history_buffer.replay_spool()
+        written += history_buffer.flush()
+        self.stdout.write(self.style.SUCCESS(f'Записано подій історії: {written}'))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from documents.storage import collect_garbage
+
+
+class Command(BaseCommand):
+    help = ('Перераховує посилання документів на файли сховища і видаляє файли, '
+            'на які не посилається жоден документ')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-minutes', type=int, default=60,
+                            help='Не чіпати файли, збережені менше ніж стільки хвилин тому')
+        parser.add_argument('--dry-run', action='store_true', help='Лише показати, що буде видалено')
+
+    def handle(self, *args, **options):
+        removed, freed = collect_garbage(
+            grace=timedelta(minutes=options['grace_minutes']), dry_run=options['dry_run'],
+        )
+        verb = 'Буде видалено' if options['dry_run'] else 'Видалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} файлів: {removed}, звільнено {freed / 1024 / 1024:.1f} МБ'
+        ))
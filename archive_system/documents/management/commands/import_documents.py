@@ -0,0 +1,108 @@
+import csv
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from documents.models import Document, DocumentHistory
+from documents.resources import DocumentResource, create_documents_in_bulk
+from documents.signals import bulk_changed
+
+# Скільки помилок рядків виводити; решта лише рахується
+MAX_REPORTED_ERRORS = 20
+
+
+def read_csv(path, encoding, delimiter):
+    with open(path, newline='', encoding=encoding) as source:
+        yield from csv.DictReader(source, delimiter=delimiter)
+
+
+def read_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise CommandError('Для імпорту XLSX потрібен пакет openpyxl (pip install openpyxl)')
+
+    # read_only читає аркуш потоком, не завантажуючи всю книгу в пам'ять
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        for values in rows:
+            if any(value is not None for value in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+class Command(BaseCommand):
+    help = ('Імпортує документи з CSV або XLSX партіями через bulk_create. Колонки: title, '
+            'document_type, document_number, category, storage_location, issue_date, '
+            'expiry_date, description')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Шлях до файлу CSV або XLSX')
+        parser.add_argument('--format', choices=('csv', 'xlsx'), help='Формат файлу (за замовчуванням — за розширенням)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Кількість документів в одній транзакції')
+        parser.add_argument('--encoding', default='utf-8-sig', help='Кодування CSV')
+        parser.add_argument('--delimiter', default=',', help='Роздільник CSV')
+        parser.add_argument('--user', help="Ім'я користувача, від якого створюються документи")
+        parser.add_argument('--create-missing', action='store_true',
+                            help='Створювати відсутні категорії та місця зберігання')
+        parser.add_argument('--dry-run', action='store_true', help='Лише перевірити рядки, нічого не записуючи')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Файл не знайдено: {path}')
+        file_format = options['format'] or ('xlsx' if path.lower().endswith('.xlsx') else 'csv')
+        rows = read_xlsx(path) if file_format == 'xlsx' else read_csv(path, options['encoding'], options['delimiter'])
+
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"Користувача {options['user']} не знайдено")
+
+        resource = DocumentResource(
+            create_missing=options['create_missing'], user=user, commit=not options['dry_run'],
+        )
+        batch_size = options['batch_size']
+        started = time.monotonic()
+        batch = []
+        imported = errors = 0
+
+        # Рядок 1 — заголовок
+        for line, row in enumerate(rows, 2):
+            try:
+                batch.append(resource.import_row_values(row))
+            except (ValueError, ValidationError, KeyError) as e:
+                errors += 1
+                if errors <= MAX_REPORTED_ERRORS:
+                    message = '; '.join(e.messages) if isinstance(e, ValidationError) else str(e)
+                    self.stderr.write(f'Рядок {line}: {message}')
+                continue
+
+            if len(batch) >= batch_size:
+                imported += self.save_batch(batch, user, options['dry_run'])
+                batch = []
+                self.stdout.write(f'Імпортовано: {imported} ({time.monotonic() - started:.0f} с)')
+
+        if batch:
+            imported += self.save_batch(batch, user, options['dry_run'])
+
+        if imported and not options['dry_run']:
+            bulk_changed.send(sender=Document)
+            bulk_changed.send(sender=DocumentHistory)
+
+        verb = 'Перевірено' if options['dry_run'] else 'Імпортовано'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} документів: {imported}, помилок: {errors}, час: {time.monotonic() - started:.1f} с'
+        ))
+
+    def save_batch(self, batch, user, dry_run):
+        if dry_run:
+            return len(batch)
+        return len(create_documents_in_bulk(batch, user=user))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from documents.counters import rebuild_summary
+
+
+class Command(BaseCommand):
+    help = ('Перебудовує зведену таблицю документів для дашборду (тип × категорія × '
+            'місце зберігання × місяць видачі); запускати щоночі, наприклад з cron')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Кількість рядків зведення в одному INSERT')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        rows = rebuild_summary(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Рядків зведення: {rows}, час: {time.monotonic() - started:.1f} с'
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from documents.models import Document
+from documents.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Перебудовує повнотекстовий індекс документів'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Кількість документів в одній партії')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        backend = get_search_backend()
+        documents = Document.objects.only('id', 'title', 'document_number', 'description').order_by('pk')
+
+        total = 0
+        with transaction.atomic():
+            backend.clear()
+            batch = []
+            for document in documents.iterator(chunk_size=batch_size):
+                batch.append(document)
+                if len(batch) >= batch_size:
+                    backend.index_documents(batch)
+                    total += len(batch)
+                    batch = []
+            backend.index_documents(batch)
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Проіндексовано документів: {total}'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from documents.counters import recount
+
+
+class Command(BaseCommand):
+    help = ('Перераховує лічильники документів у категоріях і місцях зберігання '
+            '(загальні та за типами документів) з таблиці документів')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Лише показати кількість розбіжностей')
+
+    def handle(self, *args, **options):
+        fixed = recount(dry_run=options['dry_run'])
+        verb = 'Знайдено розбіжностей' if options['dry_run'] else 'Виправлено лічильників'
+        self.stdout.write(self.style.SUCCESS(f'{verb}: {fixed}'))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from documents.expiry import get_setting, scan_expiring
+
+
+class Command(BaseCommand):
+    help = ('Створює повідомлення про документи, термін дії яких спливає (за порогами '
+            'днів до закінчення); повторний запуск не дублює повідомлень. Запускати щодня, '
+            'наприклад з cron')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, nargs='+', default=get_setting('NOTIFY_DAYS'),
+                            help='Пороги повідомлень, днів до закінчення терміну дії')
+        parser.add_argument('--batch-size', type=int, default=get_setting('BATCH_SIZE'),
+                            help='Кількість документів в одній пачці')
+        parser.add_argument('--dry-run', action='store_true', help='Лише порахувати нові повідомлення')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        stats = scan_expiring(options['days'], options['batch_size'], dry_run=options['dry_run'])
+        verb = 'буде створено повідомлень' if options['dry_run'] else 'створено повідомлень'
+        self.stdout.write(self.style.SUCCESS(
+            f"Документів, що спливають: {stats['matched']}, {verb}: {stats['created']}, "
+            f"час: {time.monotonic() - started:.1f} с"
+        ))
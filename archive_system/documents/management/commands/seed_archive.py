@@ -0,0 +1,174 @@
+import math
+import random
+import time
+from datetime import date, datetime, time as day_time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from documents.models import Document, DocumentCategory, DocumentHistory, StorageLocation
+from documents.resources import create_documents_in_bulk
+from documents.signals import bulk_changed
+from users.bulk import bulk_create_users
+
+CATEGORY_NAMES = (
+    'Дипломи бакалавра', 'Дипломи магістра', 'Накази про зарахування', 'Накази про відрахування',
+    'Академічні довідки', 'Протоколи вченої ради', 'Протоколи екзаменаційної комісії', 'Сертифікати',
+    'Особові справи студентів', 'Особові справи працівників', 'Навчальні плани', 'Договори',
+)
+TITLES = {
+    'diploma': ('Диплом бакалавра', 'Диплом магістра', 'Диплом молодшого спеціаліста'),
+    'certificate': ('Сертифікат про підвищення кваліфікації', 'Сертифікат мовного рівня'),
+    'transcript': ('Академічна довідка', 'Додаток до диплома'),
+    'order': ('Наказ про зарахування', 'Наказ про відрахування', 'Наказ про переведення'),
+    'protocol': ('Протокол засідання вченої ради', 'Протокол екзаменаційної комісії'),
+    'report': ('Звіт про роботу архіву', 'Звіт про успішність', 'Звіт про прийом документів'),
+    'other': ('Довідка', 'Договір про навчання', 'Заява'),
+}
+# Частка кожного типу серед згенерованих документів (у порядку TITLES)
+TYPE_WEIGHTS = (30, 10, 15, 25, 10, 5, 5)
+SURNAMES = ('Шевченко', 'Коваленко', 'Бондаренко', 'Ткаченко', 'Кравченко', 'Олійник', 'Мельник',
+            'Поліщук', 'Лисенко', 'Савченко', 'Руденко', 'Марченко')
+DEPARTMENTS = ('Архів', 'Деканат', 'Відділ кадрів', 'Навчальний відділ', 'Бухгалтерія')
+POSITIONS = ('Архіваріус', 'Методист', 'Інспектор', 'Секретар', 'Завідувач відділу')
+PREFIXES = {
+    'diploma': 'ДП', 'certificate': 'СРТ', 'transcript': 'АД', 'order': 'Н', 'protocol': 'П', 'report': 'ЗВ',
+    'other': 'Д',
+}
+
+
+class Command(BaseCommand):
+    help = ('Заповнює базу реалістичними тестовими даними (користувачі, категорії, місця '
+            'зберігання, документи, історія) партіями через bulk_create')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=10000, help='Кількість документів')
+        parser.add_argument('--users', type=int, default=50, help='Кількість користувачів')
+        parser.add_argument('--categories', type=int, default=30, help='Кількість категорій')
+        parser.add_argument('--locations', type=int, default=200, help='Кількість місць зберігання')
+        parser.add_argument('--history', type=float, default=3,
+                            help='Середня кількість записів історії на документ (крім створення)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Кількість документів в одній транзакції')
+        parser.add_argument('--seed', type=int, default=42, help='Зерно генератора випадкових чисел')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0 or options['documents'] < 0 or options['history'] < 0:
+            raise CommandError('Кількості мають бути невід\'ємними, а розмір партії — додатним')
+
+        self.rng = random.Random(options['seed'])
+        # Кожен запуск додає нові записи, тож імена й номери мають бути унікальними між запусками
+        self.run_id = timezone.now().strftime('%Y%m%d%H%M%S')
+        started = time.monotonic()
+
+        users = self.seed_users(options['users'])
+        categories = self.seed_categories(options['categories'])
+        locations = self.seed_locations(options['locations'])
+        self.stdout.write(f'Користувачів: {len(users)}, категорій: {len(categories)}, місць зберігання: {len(locations)}')
+
+        created = history = 0
+        total = options['documents']
+        while created < total:
+            size = min(options['batch_size'], total - created)
+            history += self.seed_documents(created, size, users, categories, locations, options['history'])
+            created += size
+            self.stdout.write(f'Документів: {created}/{total} ({time.monotonic() - started:.0f} с)')
+
+        if created:
+            bulk_changed.send(sender=Document)
+            bulk_changed.send(sender=DocumentHistory)
+        self.stdout.write(self.style.SUCCESS(
+            f'Додано документів: {created}, записів історії: {history}, час: {time.monotonic() - started:.1f} с'
+        ))
+
+    def seed_users(self, count):
+        users = bulk_create_users([
+            {
+                'username': f'seed_{self.run_id}_{i}',
+                'first_name': f'Користувач {i}',
+                'last_name': self.rng.choice(SURNAMES),
+                'email': f'seed_{self.run_id}_{i}@example.com',
+                'is_staff': i % 10 == 0,
+                'position': self.rng.choice(POSITIONS),
+                'department': self.rng.choice(DEPARTMENTS),
+            }
+            for i in range(count)
+        ], password='archive-seed-password')
+        return users or list(User.objects.all()[:100])
+
+    def seed_categories(self, count):
+        return DocumentCategory.objects.bulk_create([
+            DocumentCategory(name=f'{CATEGORY_NAMES[i % len(CATEGORY_NAMES)]} {self.run_id}-{i}')
+            for i in range(count)
+        ]) or list(DocumentCategory.objects.all())
+
+    def seed_locations(self, count):
+        return StorageLocation.objects.bulk_create([
+            StorageLocation(
+                name=f'Стелаж {self.run_id}-{i}',
+                room=str(100 + i // 20),
+                shelf=str(i % 20 + 1),
+                box=str(self.rng.randint(1, 50)) if self.rng.random() < 0.7 else None,
+            )
+            for i in range(count)
+        ]) or list(StorageLocation.objects.all())
+
+    def seed_documents(self, offset, size, users, categories, locations, history_per_document):
+        rng = self.rng
+        today = date.today()
+        types = list(TITLES)
+        documents = []
+        for i in range(offset, offset + size):
+            document_type = rng.choices(types, weights=TYPE_WEIGHTS)[0]
+            issue_date = today - timedelta(days=rng.randrange(365 * 30))
+            expiry_date = None
+            if document_type == 'certificate':
+                expiry_date = issue_date + timedelta(days=365 * rng.randint(1, 5))
+            documents.append(Document(
+                title=f'{rng.choice(TITLES[document_type])} {rng.choice(SURNAMES)}',
+                document_type=document_type,
+                document_number=f'{PREFIXES[document_type]}-{self.run_id}-{i}',
+                issue_date=issue_date,
+                expiry_date=expiry_date,
+                category=rng.choice(categories) if categories and rng.random() < 0.95 else None,
+                storage_location=rng.choice(locations) if locations and rng.random() < 0.9 else None,
+                description=f'Справа № {rng.randint(1, 9999)}' if rng.random() < 0.5 else None,
+                created_by=rng.choice(users) if users else None,
+            ))
+
+        now = timezone.now()
+        history_count = 0
+
+        def history_for(document):
+            nonlocal history_count
+            # Запис створення датується датою видачі, подальші дії — рівномірно до сьогодні
+            created_at = timezone.make_aware(datetime.combine(document.issue_date, day_time(9)))
+            history = [DocumentHistory(
+                document=document, user=document.created_by, action='create',
+                details='Створення документа', timestamp=created_at,
+            )]
+            span = (now - created_at).total_seconds()
+            for _ in range(self.poisson(history_per_document)):
+                action = rng.choices(('view', 'update'), weights=(85, 15))[0]
+                history.append(DocumentHistory(
+                    document=document,
+                    user=rng.choice(users) if users else None,
+                    action=action,
+                    details='Перегляд документа' if action == 'view' else 'Оновлення документа',
+                    timestamp=created_at + timedelta(seconds=rng.random() * span),
+                ))
+            history_count += len(history)
+            return history
+
+        create_documents_in_bulk(documents, batch_size=5000, history_for=history_for)
+        return history_count
+
+    def poisson(self, mean):
+        # Кількість подій з середнім mean (метод Кнута достатній для малих mean)
+        if mean <= 0:
+            return 0
+        limit, count, product = math.exp(-mean), 0, self.rng.random()
+        while product > limit:
+            count += 1
+            product *= self.rng.random()
+        return count
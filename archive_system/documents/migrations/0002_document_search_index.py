@@ -0,0 +1,38 @@
+from django.db import migrations
+
+from documents.search import BACKENDS
+
+
+def create_search_index(apps, schema_editor):
+    backend_class = BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class is None:
+        return
+    backend = backend_class(schema_editor.connection)
+    backend.create_index(schema_editor)
+
+    Document = apps.get_model('documents', 'Document')
+    documents = Document.objects.only('id', 'title', 'document_number', 'description')
+    batch = []
+    for document in documents.iterator(chunk_size=2000):
+        batch.append(document)
+        if len(batch) >= 2000:
+            backend.index_documents(batch)
+            batch = []
+    backend.index_documents(batch)
+
+
+def drop_search_index(apps, schema_editor):
+    backend_class = BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class is not None:
+        backend_class(schema_editor.connection).drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
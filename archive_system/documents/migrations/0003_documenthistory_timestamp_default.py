@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_document_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='documenthistory',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Час'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_documenthistory_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['document_type', '-created_at'], name='document_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['issue_date'], name='document_issue_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['created_at'], name='document_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['category', 'issue_date'], name='document_category_issue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documenthistory',
+            index=models.Index(fields=['document', '-timestamp'], name='history_document_time_idx'),
+        ),
+    ]
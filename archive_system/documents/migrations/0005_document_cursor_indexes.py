@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_document_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='document',
+            name='document_type_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='document',
+            name='document_created_at_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='documenthistory',
+            name='history_document_time_idx',
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['document_type', '-created_at', '-id'], name='document_type_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['-created_at', '-id'], name='document_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documenthistory',
+            index=models.Index(fields=['document', '-timestamp', '-id'], name='history_document_time_id_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:34
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0005_document_cursor_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name="Ім'я файлу")),
+                ('size', models.PositiveBigIntegerField(verbose_name='Розмір, байт')),
+                ('checksum', models.CharField(blank=True, max_length=64, verbose_name='SHA-256 від клієнта')),
+                ('received', models.PositiveBigIntegerField(default=0, verbose_name='Отримано, байт')),
+                ('status', models.CharField(choices=[('pending', 'Завантажується'), ('complete', 'Завершено'), ('failed', 'Помилка')], default='pending', max_length=10, verbose_name='Статус')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Створено')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Оновлено')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='documents.document', verbose_name='Документ')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Завантаження файлу',
+                'verbose_name_plural': 'Завантаження файлів',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
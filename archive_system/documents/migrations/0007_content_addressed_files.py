@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:37
+
+import os
+
+import django.utils.timezone
+import documents.storage
+from django.db import migrations, models
+
+
+def fill_original_filenames(apps, schema_editor):
+    Document = apps.get_model('documents', 'Document')
+    documents = list(Document.objects.exclude(file='').exclude(file__isnull=True).only('pk', 'file'))
+    for document in documents:
+        document.original_filename = os.path.basename(document.file.name)
+    Document.objects.bulk_update(documents, ['original_filename'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0006_documentupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Шлях у сховищі')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Розмір, байт')),
+                ('refcount', models.IntegerField(default=0, verbose_name='Кількість посилань')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Створено')),
+                ('stored_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Останнє збереження')),
+            ],
+            options={
+                'verbose_name': 'Файл сховища',
+                'verbose_name_plural': 'Файли сховища',
+            },
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='original_filename',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Назва файлу'),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='file',
+            field=documents.storage.DocumentFileField(blank=True, null=True, storage=documents.storage.ContentAddressedStorage(), upload_to='documents/', verbose_name='Файл'),
+        ),
+        migrations.RunPython(fill_original_filenames, migrations.RunPython.noop),
+    ]
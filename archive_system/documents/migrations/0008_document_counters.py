@@ -0,0 +1,63 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_document_counters(apps, schema_editor):
+    Document = apps.get_model('documents', 'Document')
+    DocumentTypeCount = apps.get_model('documents', 'DocumentTypeCount')
+    for model_name, field in (('DocumentCategory', 'category'), ('StorageLocation', 'storage_location')):
+        model = apps.get_model('documents', model_name)
+        rows = (
+            Document.objects.filter(**{f'{field}__isnull': False}).order_by()
+            .values_list(field, 'document_type').annotate(total=Count('pk'))
+        )
+        totals = {}
+        type_counts = []
+        for pk, document_type, total in rows:
+            totals[pk] = totals.get(pk, 0) + total
+            type_counts.append(DocumentTypeCount(**{f'{field}_id': pk}, document_type=document_type, count=total))
+        DocumentTypeCount.objects.bulk_create(type_counts, batch_size=1000)
+        objects = list(model.objects.filter(pk__in=totals).only('pk'))
+        for obj in objects:
+            obj.document_count = totals[obj.pk]
+        model.objects.bulk_update(objects, ['document_count'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0007_content_addressed_files'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentcategory',
+            name='document_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Кількість документів'),
+        ),
+        migrations.AddField(
+            model_name='storagelocation',
+            name='document_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Кількість документів'),
+        ),
+        migrations.CreateModel(
+            name='DocumentTypeCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_type', models.CharField(choices=[('diploma', 'Диплом'), ('certificate', 'Сертифікат'), ('transcript', 'Академічна довідка'), ('order', 'Наказ'), ('protocol', 'Протокол'), ('report', 'Звіт'), ('other', 'Інше')], max_length=20, verbose_name='Тип документа')),
+                ('count', models.IntegerField(default=0, verbose_name='Кількість')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='type_counts', to='documents.documentcategory', verbose_name='Категорія')),
+                ('storage_location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='type_counts', to='documents.storagelocation', verbose_name='Місце зберігання')),
+            ],
+            options={
+                'verbose_name': 'Кількість документів за типом',
+                'verbose_name_plural': 'Кількість документів за типами',
+                'ordering': ['document_type'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('category', 'document_type'), name='type_count_category_unique'), models.UniqueConstraint(condition=models.Q(('storage_location__isnull', False)), fields=('storage_location', 'document_type'), name='type_count_location_unique')],
+            },
+        ),
+        migrations.RunPython(fill_document_counters, migrations.RunPython.noop),
+    ]
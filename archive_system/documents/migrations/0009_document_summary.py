@@ -0,0 +1,50 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:59
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def fill_document_summary(apps, schema_editor):
+    Document = apps.get_model('documents', 'Document')
+    DocumentSummary = apps.get_model('documents', 'DocumentSummary')
+    rows = (
+        Document.objects.order_by()
+        .values('document_type', 'category_id', 'storage_location_id', month=TruncMonth('issue_date'))
+        .annotate(total=Count('pk'))
+    )
+    DocumentSummary.objects.bulk_create([
+        DocumentSummary(
+            document_type=row['document_type'], category_id=row['category_id'] or 0,
+            storage_location_id=row['storage_location_id'] or 0, month=row['month'], count=row['total'],
+        )
+        for row in rows
+    ], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0008_document_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_type', models.CharField(choices=[('diploma', 'Диплом'), ('certificate', 'Сертифікат'), ('transcript', 'Академічна довідка'), ('order', 'Наказ'), ('protocol', 'Протокол'), ('report', 'Звіт'), ('other', 'Інше')], max_length=20, verbose_name='Тип документа')),
+                ('category_id', models.BigIntegerField(default=0, verbose_name='Категорія')),
+                ('storage_location_id', models.BigIntegerField(default=0, verbose_name='Місце зберігання')),
+                ('month', models.DateField(verbose_name='Місяць видачі')),
+                ('count', models.IntegerField(default=0, verbose_name='Кількість')),
+            ],
+            options={
+                'verbose_name': 'Зведення документів',
+                'verbose_name_plural': 'Зведення документів',
+                'indexes': [models.Index(fields=['month'], name='document_summary_month_idx'), models.Index(fields=['category_id', 'month'], name='document_summary_category_idx')],
+                'constraints': [models.UniqueConstraint(fields=('document_type', 'category_id', 'storage_location_id', 'month'), name='document_summary_key_unique')],
+            },
+        ),
+        migrations.RunPython(fill_document_summary, migrations.RunPython.noop),
+    ]
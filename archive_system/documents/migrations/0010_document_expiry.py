@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0009_document_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiryNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expiry_date', models.DateField(verbose_name='Дата закінчення терміну дії')),
+                ('days_before', models.PositiveSmallIntegerField(verbose_name='Днів до закінчення')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Створено')),
+            ],
+            options={
+                'verbose_name': 'Повідомлення про закінчення терміну дії',
+                'verbose_name_plural': 'Повідомлення про закінчення терміну дії',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(condition=models.Q(('expiry_date__isnull', False)), fields=['expiry_date', 'id'], name='document_expiry_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='expirynotification',
+            name='document',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expiry_notifications', to='documents.document', verbose_name='Документ'),
+        ),
+        migrations.AddConstraint(
+            model_name='expirynotification',
+            constraint=models.UniqueConstraint(fields=('document', 'expiry_date', 'days_before'), name='expiry_notification_unique'),
+        ),
+    ]
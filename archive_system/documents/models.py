@@ -1,8 +1,33 @@
+import uuid
+from datetime import timedelta
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils import timezone
+
+from .search import get_search_backend
+from .storage import DocumentFileField, document_storage
 
-class DocumentCategory(models.Model):
+class DocumentCounterModel(models.Model):
+    # Лічильник ведеться сигналами та масовими операціями F()-виразами
+    # (documents/counters.py) і перераховується manage.py recount_archive
+    document_count = models.IntegerField(default=0, editable=False, verbose_name="Кількість документів")
+    
+    class Meta:
+        abstract = True
+    
+    def save(self, *args, **kwargs):
+        # Форма редагування тримає завантажене раніше значення лічильника; не
+        # перезаписуємо ним те, що встигли змінити паралельні запити
+        if not self._state.adding and self.pk and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'document_count'
+            ]
+        super().save(*args, **kwargs)
+
+class DocumentCategory(DocumentCounterModel):
     name = models.CharField(max_length=100, verbose_name="Назва категорії")
     description = models.TextField(blank=True, null=True, verbose_name="Опис")
     
@@ -13,7 +38,7 @@ class DocumentCategory(models.Model):
     def __str__(self):
         return self.name
 
-class StorageLocation(models.Model):
+class StorageLocation(DocumentCounterModel):
     name = models.CharField(max_length=100, verbose_name="Назва місця зберігання")
     room = models.CharField(max_length=50, verbose_name="Кімната")
     shelf = models.CharField(max_length=50, verbose_name="Полиця")
@@ -26,6 +51,61 @@ class StorageLocation(models.Model):
     def __str__(self):
         return f"{self.name} (Кімната: {self.room}, Полиця: {self.shelf})"
 
+class DocumentQuerySet(models.QuerySet):
+    # Колонки, які показують список документів, CSV-експорт та PDF-звіт
+    LISTING_FIELDS = (
+        'title', 'document_type', 'document_number', 'issue_date', 'created_at',
+        'category__name', 'storage_location__name',
+    )
+
+    def for_listing(self, *extra_fields):
+        return self.select_related('category', 'storage_location').only(*self.LISTING_FIELDS, *extra_fields)
+
+    def apply_search_filters(self, cleaned_data):
+        # Фільтри форми DocumentSearchForm, спільні для списку документів та CSV-експорту
+        queryset = self
+        query = cleaned_data.get('query')
+        document_type = cleaned_data.get('document_type')
+        category = cleaned_data.get('category')
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        storage_location = cleaned_data.get('storage_location')
+        expiring_within = cleaned_data.get('expiring_within')
+
+        if query:
+            queryset = get_search_backend().search(queryset, query)
+
+        if document_type:
+            queryset = queryset.filter(document_type=document_type)
+
+        if category:
+            queryset = queryset.filter(category=category)
+
+        if start_date:
+            queryset = queryset.filter(issue_date__gte=start_date)
+
+        if end_date:
+            queryset = queryset.filter(issue_date__lte=end_date)
+
+        if storage_location:
+            queryset = queryset.filter(storage_location=storage_location)
+
+        if expiring_within is not None:
+            queryset = queryset.expiring_within(expiring_within)
+
+        return queryset
+
+    def expiring_within(self, days, today=None):
+        # Документи, термін дії яких спливає протягом days днів (включно з сьогодні);
+        # умова збігається з частковим індексом document_expiry_date_idx
+        today = today or timezone.localdate()
+        return self.filter(
+            expiry_date__isnull=False,
+            expiry_date__gte=today,
+            expiry_date__lte=today + timedelta(days=days),
+        )
+
+
 class Document(models.Model):
     DOCUMENT_TYPES = (
         ('diploma', 'Диплом'),
@@ -45,19 +125,43 @@ class Document(models.Model):
     expiry_date = models.DateField(blank=True, null=True, verbose_name="Дата закінчення терміну дії")
     storage_location = models.ForeignKey(StorageLocation, on_delete=models.SET_NULL, null=True, verbose_name="Місце зберігання")
     description = models.TextField(blank=True, null=True, verbose_name="Опис")
-    file = models.FileField(upload_to='documents/', blank=True, null=True, verbose_name="Файл")
+    file = DocumentFileField(upload_to='documents/', storage=document_storage, blank=True, null=True, verbose_name="Файл")
+    # Сховище називає файли за SHA-256 вмісту, тож назву для завантаження зберігаємо окремо
+    original_filename = models.CharField(max_length=255, blank=True, editable=False, verbose_name="Назва файлу")
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_documents', verbose_name="Створено")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата оновлення")
     
+    objects = DocumentQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Документ"
         verbose_name_plural = "Документи"
         ordering = ['-created_at']
+        # Колонки фільтрів пошуку, звітів і адмінки (category_id та storage_location_id
+        # вже проіндексовані як зовнішні ключі)
+        indexes = [
+            # Фільтр за типом разом зі стандартним сортуванням списку; id — другий ключ курсора
+            models.Index(fields=['document_type', '-created_at', '-id'], name='document_type_created_id_idx'),
+            models.Index(fields=['issue_date'], name='document_issue_date_idx'),
+            models.Index(fields=['-created_at', '-id'], name='document_created_id_idx'),
+            models.Index(fields=['category', 'issue_date'], name='document_category_issue_idx'),
+            # Більшість документів безстрокові, тож індексуються лише ті, що мають термін дії
+            models.Index(
+                fields=['expiry_date', 'id'], name='document_expiry_date_idx',
+                condition=models.Q(expiry_date__isnull=False),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.document_number})"
     
+    def save(self, *args, **kwargs):
+        # Файл прибрали через форму — назва теж більше не актуальна
+        if not self.file:
+            self.original_filename = ''
+        super().save(*args, **kwargs)
+    
     def get_absolute_url(self):
         return reverse('document-detail', kwargs={'pk': self.pk})
 
@@ -72,13 +176,142 @@ class DocumentHistory(models.Model):
     document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='history', verbose_name="Документ")
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, verbose_name="Користувач")
     action = models.CharField(max_length=10, choices=ACTION_TYPES, verbose_name="Дія")
-    timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Час")
+    # Не auto_now_add: буферизовані події зберігають фактичний час перегляду
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Час")
     details = models.TextField(blank=True, null=True, verbose_name="Деталі")
     
     class Meta:
         verbose_name = "Історія документа"
         verbose_name_plural = "Історія документів"
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['document', '-timestamp', '-id'], name='history_document_time_id_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.get_action_display()} документа {self.document.title} користувачем {self.user.username}"
\ No newline at end of file
+        return f"{self.get_action_display()} документа {self.document.title} користувачем {self.user.username}"
+
+
+class DocumentUpload(models.Model):
+    # Сеанс поштучного (chunked) завантаження файлу документа; частини дописуються
+    # у тимчасовий файл, а після перевірки він прикріплюється до Document.file
+    STATUS_CHOICES = (
+        ('pending', 'Завантажується'),
+        ('complete', 'Завершено'),
+        ('failed', 'Помилка'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='uploads', verbose_name="Документ")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Користувач")
+    filename = models.CharField(max_length=255, verbose_name="Ім'я файлу")
+    size = models.PositiveBigIntegerField(verbose_name="Розмір, байт")
+    checksum = models.CharField(max_length=64, blank=True, verbose_name="SHA-256 від клієнта")
+    received = models.PositiveBigIntegerField(default=0, verbose_name="Отримано, байт")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Статус")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Створено")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
+
+    class Meta:
+        verbose_name = "Завантаження файлу"
+        verbose_name_plural = "Завантаження файлів"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+
+class FileBlob(models.Model):
+    # Один файл у сховищі документів; refcount — кількість документів, що на нього
+    # посилаються (ведеться сигналами, перераховується manage.py gc_document_blobs)
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name="SHA-256")
+    name = models.CharField(max_length=255, unique=True, verbose_name="Шлях у сховищі")
+    size = models.PositiveBigIntegerField(verbose_name="Розмір, байт")
+    refcount = models.IntegerField(default=0, verbose_name="Кількість посилань")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Створено")
+    # Оновлюється при кожному збереженні того самого вмісту, щоб збирач сміття
+    # не видалив блоб, на який ось-ось пошлеться новий документ
+    stored_at = models.DateTimeField(default=timezone.now, verbose_name="Останнє збереження")
+
+    class Meta:
+        verbose_name = "Файл сховища"
+        verbose_name_plural = "Файли сховища"
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
+class DocumentTypeCount(models.Model):
+    # Кількість документів кожного типу в категорії або в місці зберігання (заповнене
+    # рівно одне з полів); ведеться разом з document_count у documents/counters.py
+    category = models.ForeignKey(DocumentCategory, on_delete=models.CASCADE, null=True, blank=True,
+                                 related_name='type_counts', verbose_name="Категорія")
+    storage_location = models.ForeignKey(StorageLocation, on_delete=models.CASCADE, null=True, blank=True,
+                                         related_name='type_counts', verbose_name="Місце зберігання")
+    document_type = models.CharField(max_length=20, choices=Document.DOCUMENT_TYPES, verbose_name="Тип документа")
+    count = models.IntegerField(default=0, verbose_name="Кількість")
+
+    class Meta:
+        verbose_name = "Кількість документів за типом"
+        verbose_name_plural = "Кількість документів за типами"
+        ordering = ['document_type']
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'document_type'], condition=models.Q(category__isnull=False),
+                                    name='type_count_category_unique'),
+            models.UniqueConstraint(fields=['storage_location', 'document_type'],
+                                    condition=models.Q(storage_location__isnull=False),
+                                    name='type_count_location_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.category or self.storage_location}: {self.get_document_type_display()} — {self.count}"
+
+
+class DocumentSummary(models.Model):
+    # Матеріалізована зведена таблиця для дашборду: кількість документів за типом,
+    # категорією, місцем зберігання і місяцем видачі. Ведеться разом з лічильниками
+    # (documents/counters.py), щоночі перебудовується manage.py rebuild_archive_summary.
+    # Замість NULL — 0 («не вказано»), щоб унікальний ключ працював на всіх СУБД
+    document_type = models.CharField(max_length=20, choices=Document.DOCUMENT_TYPES, verbose_name="Тип документа")
+    category_id = models.BigIntegerField(default=0, verbose_name="Категорія")
+    storage_location_id = models.BigIntegerField(default=0, verbose_name="Місце зберігання")
+    month = models.DateField(verbose_name="Місяць видачі")
+    count = models.IntegerField(default=0, verbose_name="Кількість")
+
+    class Meta:
+        verbose_name = "Зведення документів"
+        verbose_name_plural = "Зведення документів"
+        constraints = [
+            models.UniqueConstraint(fields=['document_type', 'category_id', 'storage_location_id', 'month'],
+                                    name='document_summary_key_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['month'], name='document_summary_month_idx'),
+            models.Index(fields=['category_id', 'month'], name='document_summary_category_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_document_type_display()} {self.month:%Y-%m}: {self.count}"
+
+
+class ExpiryNotification(models.Model):
+    # Повідомлення про те, що термін дії документа спливає; створюється
+    # manage.py scan_expiring_documents не більше одного разу на кожен поріг
+    # (days_before) і дату закінчення — після продовження терміну буде нове
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='expiry_notifications',
+                                 verbose_name="Документ")
+    expiry_date = models.DateField(verbose_name="Дата закінчення терміну дії")
+    days_before = models.PositiveSmallIntegerField(verbose_name="Днів до закінчення")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Створено")
+
+    class Meta:
+        verbose_name = "Повідомлення про закінчення терміну дії"
+        verbose_name_plural = "Повідомлення про закінчення терміну дії"
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['document', 'expiry_date', 'days_before'],
+                                    name='expiry_notification_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.document}: спливає {self.expiry_date:%d.%m.%Y} (за {self.days_before} дн.)"
@@ -0,0 +1,188 @@
+import base64
+import json
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+# Скільки рядків рахувати точно; більше — показуємо «понад N», не скануючи всю таблицю
+COUNT_LIMIT = 1000
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    # Пагінація за курсором: сторінка — це WHERE (created_at, id) < (останні значення)
+    # з LIMIT по індексу, тож глибока сторінка коштує стільки ж, скільки перша,
+    # і жодного COUNT(*) на кожен запит. ordering — унікальний набір полів
+    # з однаковим напрямком сортування, наприклад ('-created_at', '-id')
+    def __init__(self, queryset, per_page, ordering, count_limit=COUNT_LIMIT):
+        descending = {field.startswith('-') for field in ordering}
+        if len(descending) != 1:
+            raise ValueError('Усі поля курсора мають бути відсортовані в одному напрямку')
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in ordering]
+        self.descending = descending.pop()
+        self.count_limit = count_limit
+
+    @cached_property
+    def count(self):
+        # Обмежений підрахунок: SELECT COUNT(*) FROM (... LIMIT N + 1)
+        if self.count_limit is None:
+            return None
+        return self.queryset.order_by()[:self.count_limit + 1].count()
+
+    @property
+    def count_is_exact(self):
+        return self.count is not None and self.count <= self.count_limit
+
+    def page(self, cursor=None):
+        direction, values = self.decode_cursor(cursor) if cursor else ('next', None)
+        forward = direction == 'next'
+        queryset = self.queryset.order_by(*(self.ordering if forward else self.reversed_ordering()))
+        if values is not None:
+            queryset = queryset.filter(self.seek_filter(values, forward))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows, self)
+
+        # Прийшли курсором вперед — позаду точно є сторінка, і навпаки
+        has_next = has_more if forward else values is not None
+        has_previous = (values is not None) if forward else has_more
+        return KeysetPage(
+            rows, self,
+            next_cursor=self.encode_cursor('next', rows[-1]) if has_next else None,
+            previous_cursor=self.encode_cursor('prev', rows[0]) if has_previous else None,
+        )
+
+    def last_cursor(self):
+        return self.encode_values('prev', None)
+
+    def reversed_ordering(self):
+        return [field if self.descending else f'-{field}' for field in self.fields]
+
+    def seek_filter(self, values, forward):
+        # (a, b) < (x, y)  ⇔  a < x OR (a = x AND b < y)
+        lookup = 'lt' if forward == self.descending else 'gt'
+        condition = Q()
+        for i, field in enumerate(self.fields):
+            equal = dict(zip(self.fields[:i], values[:i]))
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[i]})
+        return condition
+
+    def encode_cursor(self, direction, obj):
+        return self.encode_values(direction, [getattr(obj, field) for field in self.fields])
+
+    def encode_values(self, direction, values):
+        # default=str зберігає мікросекунди дат, на відміну від DjangoJSONEncoder
+        payload = json.dumps([direction, values], default=str)
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            if direction not in ('next', 'prev'):
+                raise ValueError(direction)
+            if values is None:
+                return direction, None
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            model = self.queryset.model
+            return direction, [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except Exception:
+            raise InvalidCursor('Некоректний курсор сторінки')
+
+
+class KeysetPaginationMixin:
+    # Для ListView: замість ?page=N використовує ?cursor=..., якщо get_cursor_ordering()
+    # повертає поля курсора; інакше — звичайна пагінація Django
+    cursor_ordering = ('-id',)
+    cursor_kwarg = 'cursor'
+    count_limit = COUNT_LIMIT
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_cursor_ordering()
+        if not ordering:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, ordering, count_limit=self.count_limit)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Параметри фільтрів без пагінації, наприклад для посилання на CSV-експорт
+        context['filter_query'] = self.get_filter_query().urlencode()
+        page = context.get('page_obj')
+        if page is not None:
+            context.update(self.get_page_links(page))
+        return context
+
+    def get_filter_query(self):
+        query = self.request.GET.copy()
+        for key in (self.page_kwarg, self.cursor_kwarg):
+            query.pop(key, None)
+        return query
+
+    def get_page_links(self, page):
+        def url(**params):
+            query = self.get_filter_query()
+            query.update(params)
+            return f'?{query.urlencode()}'
+
+        if isinstance(page, KeysetPage):
+            return {
+                'first_page_url': url() if page.has_previous() else None,
+                'previous_page_url': url(**{self.cursor_kwarg: page.previous_cursor}) if page.has_previous() else None,
+                'next_page_url': url(**{self.cursor_kwarg: page.next_cursor}) if page.has_next() else None,
+                'last_page_url': url(**{self.cursor_kwarg: page.paginator.last_cursor()}) if page.has_next() else None,
+            }
+        return {
+            'first_page_url': url(**{self.page_kwarg: 1}) if page.has_previous() else None,
+            'previous_page_url': url(**{self.page_kwarg: page.previous_page_number()}) if page.has_previous() else None,
+            'next_page_url': url(**{self.page_kwarg: page.next_page_number()}) if page.has_next() else None,
+            'last_page_url': url(**{self.page_kwarg: 'last'}) if page.has_next() else None,
+        }
@@ -0,0 +1,146 @@
+from django.db import transaction
+from import_export import fields, resources, widgets
+
+from .counters import change_counts, count_keys, document_key
+from .models import Document, DocumentCategory, DocumentHistory, StorageLocation
+from .search import get_search_backend
+from .signals import bulk_changed
+
+# Дати у старих реєстрах бувають і в ISO, і в українському форматі
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y')
+
+
+def create_documents_in_bulk(documents, user=None, batch_size=None, details='Імпорт документа', history_for=None):
+    # Одна транзакція на партію: документи, записи історії, лічильники і повнотекстовий індекс.
+    # Сигнал bulk_changed надсилає викликач — один раз після всіх партій.
+    # history_for(document) повертає записи історії документа (seed_archive додає до
+    # створення перегляди й оновлення); за замовчуванням — лише запис створення
+    if history_for is None:
+        def history_for(document):
+            return [DocumentHistory(document=document, user=user, action='create', details=details)]
+
+    with transaction.atomic():
+        created = Document.objects.bulk_create(documents, batch_size=batch_size)
+        DocumentHistory.objects.bulk_create(
+            [entry for document in created for entry in history_for(document)], batch_size=batch_size
+        )
+        change_counts(count_keys(document_key(document) for document in created))
+        get_search_backend().index_documents(created)
+    return created
+
+
+class CachedNameWidget(widgets.ForeignKeyWidget):
+    # Шукає пов'язаний об'єкт за назвою у словнику, завантаженому одним запитом,
+    # замість окремого SELECT на кожен рядок імпорту
+    def __init__(self, model, field='name', create_missing=False, defaults=None, **kwargs):
+        super().__init__(model, field, **kwargs)
+        self.create_missing = create_missing
+        self.defaults = defaults or {}
+        # False — відсутні об'єкти лише імітуються (перевірка без запису)
+        self.commit = True
+        self.cache = None
+
+    def clean(self, value, row=None, **kwargs):
+        name = str(value).strip() if value is not None else ''
+        if not name:
+            return None
+        if self.cache is None:
+            # Для однакових назв береться найстаріший запис
+            self.cache = {}
+            for obj in self.model.objects.order_by('pk'):
+                self.cache.setdefault(getattr(obj, self.field), obj)
+        obj = self.cache.get(name)
+        if obj is None:
+            if not self.create_missing:
+                raise ValueError(f'{self.model._meta.verbose_name} «{name}» не знайдено')
+            obj = self.model(**{self.field: name}, **self.defaults)
+            if self.commit:
+                obj.save()
+            self.cache[name] = obj
+        return obj
+
+
+class DocumentTypeWidget(widgets.Widget):
+    # Приймає як код типу ('diploma'), так і його назву ('Диплом')
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.codes = {code: code for code, _ in Document.DOCUMENT_TYPES}
+        self.codes.update({label.lower(): code for code, label in Document.DOCUMENT_TYPES})
+
+    def clean(self, value, row=None, **kwargs):
+        key = str(value or '').strip()
+        code = self.codes.get(key) or self.codes.get(key.lower())
+        if code is None:
+            raise ValueError(f'Невідомий тип документа «{key}»')
+        return code
+
+    def render(self, value, obj=None, **kwargs):
+        return dict(Document.DOCUMENT_TYPES).get(value, value)
+
+
+class DateWidget(widgets.DateWidget):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.formats = DATE_FORMATS
+
+    def clean(self, value, row=None, **kwargs):
+        if isinstance(value, str):
+            value = value.strip()
+        return super().clean(value, row=row, **kwargs)
+
+
+class DocumentResource(resources.ModelResource):
+    document_type = fields.Field(attribute='document_type', column_name='document_type',
+                                 widget=DocumentTypeWidget())
+    category = fields.Field(attribute='category', column_name='category',
+                            widget=CachedNameWidget(DocumentCategory))
+    storage_location = fields.Field(attribute='storage_location', column_name='storage_location',
+                                    widget=CachedNameWidget(StorageLocation, defaults={'room': '', 'shelf': ''}))
+    issue_date = fields.Field(attribute='issue_date', column_name='issue_date', widget=DateWidget())
+    expiry_date = fields.Field(attribute='expiry_date', column_name='expiry_date', widget=DateWidget())
+
+    class Meta:
+        model = Document
+        fields = ('id', 'title', 'document_type', 'document_number', 'category', 'storage_location',
+                  'issue_date', 'expiry_date', 'description')
+        use_bulk = True
+        batch_size = 1000
+        skip_diff = True
+
+    def __init__(self, create_missing=False, user=None, commit=True, **kwargs):
+        super().__init__(**kwargs)
+        self.user = user
+        self.imported = 0
+        for name in ('category', 'storage_location'):
+            self.fields[name].widget.create_missing = create_missing
+            self.fields[name].widget.commit = commit
+
+    def init_instance(self, row=None):
+        return Document(created_by=self.user)
+
+    def import_row_values(self, row):
+        # Швидкий шлях для import_documents: лише розбір значень віджетами ресурсу,
+        # без порівнянь і пошуку наявних документів
+        document = self.init_instance(row)
+        for field in self.get_import_fields():
+            if field.attribute and field.column_name in row and field.attribute != 'id':
+                field.save(document, row)
+        document.clean_fields(exclude=['category', 'storage_location', 'created_by', 'file'])
+        return document
+
+    def bulk_create(self, using_transactions, dry_run, raise_errors, batch_size=None, result=None):
+        # Імпорт через адмінку: ті самі партії, що й у import_documents
+        try:
+            if self.create_instances and not (dry_run and not using_transactions):
+                created = create_documents_in_bulk(self.create_instances, user=self.user, batch_size=batch_size)
+                self.imported += len(created)
+        except Exception as e:
+            self.handle_import_error(result, e, raise_errors)
+        finally:
+            self.create_instances.clear()
+
+    def after_import(self, dataset, result, **kwargs):
+        super().after_import(dataset, result, **kwargs)
+        if self.imported and not kwargs.get('dry_run'):
+            bulk_changed.send(sender=Document)
+            bulk_changed.send(sender=DocumentHistory)
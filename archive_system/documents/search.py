@@ -0,0 +1,256 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'documents_document_fts'
+
+# Варіанти апострофа в українських словах (м'ясо, м’ясо, мʼясо) зводимо до одного,
+# інакше токенізатор розбиває їх по-різному в індексі та в запиті
+APOSTROPHES = re.compile(r"[’ʼ`´]")
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+CYRILLIC_RE = re.compile(r"^[а-щьюяґєії']+$")
+
+# Найуживаніші закінчення іменників та прикметників; у запиті їх відкидаємо
+# і шукаємо за префіксом, тож "дипломи" знаходить "диплом", "диплома", "дипломів"
+UKRAINIAN_ENDINGS = sorted((
+    'ами', 'ями', 'ові', 'еві', 'ого', 'ому', 'ими', 'іми', 'ій', 'ий', 'ої', 'ою', 'ею',
+    'их', 'іх', 'им', 'ім', 'ах', 'ях', 'ям', 'ів', 'їв', 'ом', 'ем', 'єм', 'а', 'я', 'у', 'ю',
+    'і', 'ї', 'и', 'е', 'є', 'о', 'ь',
+), key=len, reverse=True)
+MIN_STEM_LENGTH = 4
+
+
+def normalize_text(value):
+    if not value:
+        return ''
+    return APOSTROPHES.sub("'", value).lower()
+
+
+def stem_token(token):
+    if not CYRILLIC_RE.match(token):
+        return token
+    for ending in UKRAINIAN_ENDINGS:
+        if token.endswith(ending) and len(token) - len(ending) >= MIN_STEM_LENGTH:
+            return token[:-len(ending)]
+    return token
+
+
+def tokenize_query(query):
+    return [stem_token(token) for token in TOKEN_RE.findall(normalize_text(query))]
+
+
+def icontains_search(queryset, query):
+    return queryset.filter(
+        Q(title__icontains=query) |
+        Q(document_number__icontains=query) |
+        Q(description__icontains=query)
+    )
+
+
+class BaseSearchBackend:
+    vendor = None
+
+    def __init__(self, db_connection=None):
+        self.connection = db_connection or connection
+
+    def create_index(self, schema_editor):
+        raise NotImplementedError
+
+    def drop_index(self, schema_editor):
+        raise NotImplementedError
+
+    def index_document(self, document):
+        raise NotImplementedError
+
+    def remove_document(self, document_id):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def index_documents(self, documents):
+        for document in documents:
+            self.index_document(document)
+
+    def document_values(self, document):
+        return (
+            normalize_text(document.title),
+            normalize_text(document.document_number),
+            normalize_text(document.description),
+        )
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    vendor = 'sqlite'
+
+    # remove_diacritics 0 — щоб не зливати "й" з "и" та "ї" з "і"
+    def create_index(self, schema_editor):
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, document_number, description, "
+            "tokenize = 'unicode61 remove_diacritics 0')"
+        )
+
+    def drop_index(self, schema_editor):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+    def index_document(self, document):
+        self.index_documents([document])
+
+    def index_documents(self, documents):
+        rows = [(document.pk, *self.document_values(document)) for document in documents]
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, document_number, description) "
+                "VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove_document(self, document_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [document_id])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    def build_match(self, tokens):
+        # Кожен токен береться в лапки (без синтаксису FTS5 від користувача)
+        # і шукається як префікс, що покриває відмінкові закінчення
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def search(self, queryset, query):
+        tokens = tokenize_query(query)
+        if not tokens:
+            # Запит без слів ("--", "*") шукаємо як підрядок, а не повертаємо всі документи
+            return icontains_search(queryset, query)
+        match = self.build_match(tokens)
+        table = queryset.model._meta.db_table
+        queryset = queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        )
+        # bm25() повертає менше значення для кращого збігу
+        rank = RawSQL(
+            f"SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id",
+            [match],
+            output_field=FloatField(),
+        )
+        return queryset.annotate(search_rank=rank).order_by('-search_rank', '-created_at')
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    vendor = 'postgresql'
+
+    @property
+    def config(self):
+        # У PostgreSQL немає вбудованої української конфігурації, тому за замовчуванням 'simple'
+        return getattr(settings, 'DOCUMENT_SEARCH_CONFIG', 'simple')
+
+    # Таблиця поза моделями Django, тож без зовнішнього ключа на documents_document:
+    # flush і TRUNCATE у тестах не знають про нього. Рядки видаляє сигнал unindex_document
+    def create_index(self, schema_editor):
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {FTS_TABLE} ("
+            "document_id bigint PRIMARY KEY, "
+            "search_vector tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {FTS_TABLE}_vector_idx "
+            f"ON {FTS_TABLE} USING GIN (search_vector)"
+        )
+
+    def drop_index(self, schema_editor):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+    def index_documents(self, documents):
+        rows = [(document.pk, *self.document_values(document)) for document in documents]
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (document_id, search_vector) VALUES (%s, "
+                f"setweight(to_tsvector('{self.config}', %s), 'A') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'A') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'B')) "
+                "ON CONFLICT (document_id) DO UPDATE SET search_vector = EXCLUDED.search_vector",
+                rows,
+            )
+
+    def index_document(self, document):
+        self.index_documents([document])
+
+    def remove_document(self, document_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE document_id = %s", [document_id])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {FTS_TABLE}")
+
+    def search(self, queryset, query):
+        tokens = tokenize_query(query)
+        if not tokens:
+            # Запит без слів ("--", "*") шукаємо як підрядок, а не повертаємо всі документи
+            return icontains_search(queryset, query)
+        tsquery = ' & '.join(f"{token}:*" for token in tokens)
+        table = queryset.model._meta.db_table
+        queryset = queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT document_id FROM {FTS_TABLE} "
+                f"WHERE search_vector @@ to_tsquery('{self.config}', %s)",
+                [tsquery],
+            )
+        )
+        rank = RawSQL(
+            f"SELECT ts_rank(search_vector, to_tsquery('{self.config}', %s)) FROM {FTS_TABLE} "
+            f"WHERE document_id = {table}.id",
+            [tsquery],
+            output_field=FloatField(),
+        )
+        return queryset.annotate(search_rank=rank).order_by('-search_rank', '-created_at')
+
+
+class IContainsSearchBackend(BaseSearchBackend):
+    # Запасний варіант для СУБД без повнотекстового пошуку
+
+    def create_index(self, schema_editor):
+        pass
+
+    def drop_index(self, schema_editor):
+        pass
+
+    def index_document(self, document):
+        pass
+
+    def index_documents(self, documents):
+        pass
+
+    def remove_document(self, document_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, queryset, query):
+        return icontains_search(queryset, query)
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend(db_connection=None):
+    db_connection = db_connection or connection
+    return BACKENDS.get(db_connection.vendor, IContainsSearchBackend)(db_connection)
@@ -0,0 +1,109 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .cache import EXPIRY_VERSION_KEY, bump_related_version, bump_version
+from .counters import change_counts, document_key, make_key, release_summary_rows
+from .models import Document, DocumentCategory, StorageLocation
+from .search import get_search_backend
+from .storage import change_refcount
+
+# Надсилається після масових операцій (bulk_create, queryset.update), для яких
+# Django не викликає post_save; sender — клас моделі
+bulk_changed = Signal()
+
+
+# Синхронізація повнотекстового індексу з таблицею документів
+@receiver(post_save, sender=Document)
+def index_document(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_backend().index_document(instance)
+
+
+@receiver(post_delete, sender=Document)
+def unindex_document(sender, instance, **kwargs):
+    get_search_backend().remove_document(instance.pk)
+
+
+# Попередні значення полів для обліку файлів і лічильників — одним запитом
+@receiver(pre_save, sender=Document)
+def remember_document_state(sender, instance, **kwargs):
+    previous = None
+    if instance.pk:
+        previous = Document.objects.filter(pk=instance.pk).values_list(
+            'file', 'category_id', 'storage_location_id', 'document_type', 'issue_date', 'expiry_date'
+        ).first()
+    instance._previous_file = (previous[0] or '') if previous else ''
+    instance._previous_key = make_key(*previous[1:5]) if previous else None
+    instance._previous_expiry_date = previous[5] if previous else None
+
+
+# Облік посилань документів на файли сховища (documents/storage.py)
+
+
+@receiver(post_save, sender=Document)
+def count_document_file(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_file', '')
+    current = instance.file.name or ''
+    if current != previous:
+        change_refcount(current, 1)
+        change_refcount(previous, -1)
+
+
+@receiver(post_delete, sender=Document)
+def release_document_file(sender, instance, **kwargs):
+    change_refcount(instance.file.name or '', -1)
+
+
+# Лічильники документів у категоріях і місцях зберігання (documents/counters.py)
+@receiver(post_save, sender=Document)
+def count_document(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_key', None)
+    current = document_key(instance)
+    if previous is None:
+        change_counts({current: 1})
+    elif previous != current:
+        change_counts({previous: -1, current: 1})
+
+
+@receiver(post_delete, sender=Document)
+def uncount_document(sender, instance, **kwargs):
+    change_counts({document_key(instance): -1})
+
+
+@receiver(post_delete, sender=DocumentCategory)
+def release_category_summary(sender, instance, **kwargs):
+    release_summary_rows('category_id', instance.pk)
+
+
+@receiver(post_delete, sender=StorageLocation)
+def release_location_summary(sender, instance, **kwargs):
+    release_summary_rows('storage_location_id', instance.pk)
+
+
+# Віджет «Термін дії спливає» (documents/expiry.py) залежить лише від документів
+# з терміном дії
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def invalidate_expiring_documents(sender, instance, **kwargs):
+    if instance.expiry_date or getattr(instance, '_previous_expiry_date', None):
+        bump_version(EXPIRY_VERSION_KEY)
+
+
+# Назви категорій і місць зберігання є в закешованих фрагментах сторінки документа
+@receiver(post_save, sender=DocumentCategory)
+@receiver(post_delete, sender=DocumentCategory)
+@receiver(post_save, sender=StorageLocation)
+@receiver(post_delete, sender=StorageLocation)
+def invalidate_document_fragments(sender, **kwargs):
+    bump_related_version()
+
+
+@receiver(bulk_changed)
+def invalidate_document_fragments_in_bulk(sender, **kwargs):
+    if sender in (DocumentCategory, StorageLocation):
+        bump_related_version()
+    elif sender is Document:
+        bump_version(EXPIRY_VERSION_KEY)
@@ -0,0 +1,190 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from datetime import timedelta
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.db.models import Count, F
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+logger = logging.getLogger(__name__)
+
+# documents/ab/cd/<sha256>: два рівні каталогів, щоб у жодному не було мільйонів файлів
+BLOB_NAME_RE = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}$')
+
+
+def is_blob_name(name):
+    return bool(name and BLOB_NAME_RE.search(name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    # Зберігає кожен вміст один раз під його SHA-256 у каталозі з upload_to.
+    # Хеш рахується під час запису у тимчасовий файл, тож вміст читається один раз;
+    # однакові файли отримують однакове ім'я, а облік посилань веде FileBlob.
+    # Оригінальна назва файлу зберігається в Document.original_filename
+    TEMP_DIR = '.incoming'
+
+    def get_available_name(self, name, max_length=None):
+        # Остаточне ім'я визначає вміст, а не назва, тож перейменування не потрібне
+        return name
+
+    def blob_name(self, name, digest):
+        return '/'.join(filter(None, [os.path.dirname(name), digest[:2], digest[2:4], digest]))
+
+    def _save(self, name, content):
+        from .models import FileBlob
+
+        temp_dir = self.path(self.TEMP_DIR)
+        os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+
+        if hasattr(content, 'temporary_file_path'):
+            # Файл уже на диску (поштучне або велике завантаження): лише рахуємо хеш
+            # і переносимо його, не копіюючи
+            temp_path = content.temporary_file_path()
+            with open(temp_path, 'rb') as source:
+                for block in iter(lambda: source.read(1024 * 1024), b''):
+                    digest.update(block)
+            size = os.path.getsize(temp_path)
+            owned = False
+        else:
+            fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+            size = 0
+            with os.fdopen(fd, 'wb') as target:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode('utf-8')
+                    digest.update(chunk)
+                    target.write(chunk)
+                    size += len(chunk)
+            owned = True
+
+        name = self.blob_name(name, digest.hexdigest())
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            if owned:
+                os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            file_move_safe(temp_path, full_path, allow_overwrite=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(full_path, self.file_permissions_mode)
+
+        blob, created = FileBlob.objects.get_or_create(
+            sha256=digest.hexdigest(), defaults={'name': name, 'size': size},
+        )
+        if not created:
+            FileBlob.objects.filter(pk=blob.pk).update(stored_at=timezone.now())
+        return name
+
+    def delete(self, name):
+        # Блоб може належати кільком документам, тож FieldFile.delete() його не видаляє;
+        # файли без посилань прибирає manage.py gc_document_blobs
+        pass
+
+    def purge(self, name):
+        super().delete(name)
+
+
+document_storage = ContentAddressedStorage()
+
+
+def change_refcount(name, delta):
+    from .models import FileBlob
+
+    if is_blob_name(name):
+        FileBlob.objects.filter(name=name).update(refcount=F('refcount') + delta)
+
+
+def recount_blobs():
+    # Масові операції (queryset.update) оминають сигнали; тут лічильники
+    # відновлюються з таблиці документів одним GROUP BY
+    from .models import Document, FileBlob
+
+    counts = dict(
+        Document.objects.exclude(file='').exclude(file__isnull=True)
+        .order_by().values_list('file').annotate(count=Count('id'))
+    )
+    changed = []
+    for blob in FileBlob.objects.only('pk', 'name', 'refcount').iterator(chunk_size=2000):
+        refcount = counts.get(blob.name, 0)
+        if blob.refcount != refcount:
+            blob.refcount = refcount
+            changed.append(blob)
+    FileBlob.objects.bulk_update(changed, ['refcount'], batch_size=1000)
+    return len(changed)
+
+
+def collect_garbage(grace=timedelta(hours=1), dry_run=False):
+    # Видаляє блоби без посилань, старші за grace: щойно збережений файл ще може
+    # чекати на Document.save(). Повертає (кількість, звільнені байти)
+    from .models import FileBlob
+
+    recount_blobs()
+    threshold = timezone.now() - grace
+    removed = freed = 0
+    for blob in FileBlob.objects.filter(refcount__lte=0, stored_at__lt=threshold):
+        removed += 1
+        freed += blob.size
+        if not dry_run:
+            document_storage.purge(blob.name)
+            blob.delete()
+            logger.info('Видалено файл без посилань: %s', blob.name)
+
+    # Файли, для яких не встигли створити FileBlob (збій між записом і БД),
+    # і покинуті тимчасові файли
+    known = set(FileBlob.objects.values_list('name', flat=True))
+    for path in iter_storage_files():
+        name = os.path.relpath(path, document_storage.location).replace(os.sep, '/')
+        orphan = name.startswith(f'{ContentAddressedStorage.TEMP_DIR}/') or (
+            is_blob_name(name) and name not in known
+        )
+        if not orphan or document_storage.get_modified_time(name) >= threshold:
+            continue
+        removed += 1
+        freed += os.path.getsize(path)
+        if not dry_run:
+            os.remove(path)
+            logger.info('Видалено файл без запису у БД: %s', name)
+    return removed, freed
+
+
+def iter_storage_files():
+    from .models import Document
+
+    upload_to = Document._meta.get_field('file').upload_to
+    for directory in (upload_to, ContentAddressedStorage.TEMP_DIR):
+        root = document_storage.path(directory)
+        for dirpath, dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                yield os.path.join(dirpath, filename)
+
+
+class DocumentFieldFile(FieldFile):
+    def save(self, name, content, save=True):
+        # Ім'я від користувача втрачається після збереження у сховищі, тож
+        # запам'ятовуємо його в окремому полі моделі
+        setattr(self.instance, self.field.name_field, os.path.basename(name))
+        super().save(name, content, save)
+
+
+class DocumentFileField(models.FileField):
+    # FileField, що записує оригінальну назву файлу в поле name_field
+    attr_class = DocumentFieldFile
+
+    def __init__(self, *args, name_field='original_filename', **kwargs):
+        self.name_field = name_field
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.name_field != 'original_filename':
+            kwargs['name_field'] = self.name_field
+        return name, path, args, kwargs
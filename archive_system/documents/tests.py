@@ -1,3 +1,841 @@
-from django.test import TestCase
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .expiry import expiring_soon, scan_expiring
+from .history import HistoryBuffer, should_log_view
+from .models import (
+    Document, DocumentCategory, DocumentHistory, DocumentUpload, ExpiryNotification, FileBlob, StorageLocation,
+)
+from .search import FTS_TABLE, IContainsSearchBackend, get_search_backend, stem_token, tokenize_query
+from .storage import collect_garbage, document_storage
+
+
+def create_documents(count, user=None):
+    documents = []
+    for i in range(count):
+        category = DocumentCategory.objects.create(name=f'Категорія {i}')
+        location = StorageLocation.objects.create(name=f'Архів {i}', room='101', shelf=str(i))
+        documents.append(Document.objects.create(
+            title=f'Диплом {i}',
+            document_type='diploma',
+            document_number=f'ДП-{i}',
+            issue_date=date(2024, 1, 1),
+            category=category,
+            storage_location=location,
+            created_by=user,
+        ))
+    return documents
+
+
+def call_command_output(*args):
+    stdout = StringIO()
+    call_command(*args, stdout=stdout)
+    return stdout.getvalue().strip()
+
+
+class DocumentListQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.client.force_login(self.user)
+        # Віджет «Термін дії спливає» кешується; прогріваємо його, щоб порівнювати
+        # лише запити самого списку
+        cache.clear()
+        expiring_soon()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        create_documents(1, self.user)
+        baseline = self.count_queries(reverse('document-list'))
+
+        create_documents(9, self.user)
+        self.assertEqual(self.count_queries(reverse('document-list')), baseline)
+
+    def test_search_query_count_does_not_grow_with_rows(self):
+        url = reverse('document-list') + '?query=диплом'
+        create_documents(1, self.user)
+        baseline = self.count_queries(url)
+
+        create_documents(9, self.user)
+        self.assertEqual(self.count_queries(url), baseline)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.client.force_login(self.user)
+        self.documents = create_documents(25, self.user)
+        cache.clear()
+        expiring_soon()
+
+    def collect_pages(self, url):
+        titles = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            titles.append([document.title for document in response.context['documents']])
+            next_url = response.context['next_page_url']
+            url = reverse('document-list') + next_url if next_url else None
+        return titles, response
+
+    def test_pages_cover_all_documents_in_order(self):
+        pages, last_response = self.collect_pages(reverse('document-list'))
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        expected = [document.title for document in reversed(self.documents)]
+        self.assertEqual(sum(pages, []), expected)
+
+        previous = self.client.get(reverse('document-list') + last_response.context['previous_page_url'])
+        self.assertEqual([document.title for document in previous.context['documents']], expected[10:20])
+
+    def test_last_page_link(self):
+        response = self.client.get(reverse('document-list'))
+        last = self.client.get(reverse('document-list') + response.context['last_page_url'])
+        self.assertEqual([document.title for document in last.context['documents']],
+                         [document.title for document in reversed(self.documents[:10])])
+        self.assertIsNone(last.context['next_page_url'])
+        self.assertIsNotNone(last.context['previous_page_url'])
+
+    def test_same_timestamp_is_not_skipped(self):
+        Document.objects.update(created_at=self.documents[0].created_at)
+        pages, _ = self.collect_pages(reverse('document-list'))
+        self.assertEqual(sorted(sum(pages, [])), sorted(document.title for document in self.documents))
+
+    def test_deep_page_query_count_matches_first_page(self):
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(reverse('document-list'))
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(reverse('document-list') + response.context['next_page_url'])
+        self.assertEqual(len(first), len(second))
+
+    def test_export_link_keeps_filters_without_cursor(self):
+        first = self.client.get(reverse('document-list'), {'document_type': 'diploma'})
+        response = self.client.get(reverse('document-list') + first.context['next_page_url'])
+        self.assertIn('cursor=', first.context['next_page_url'])
+        self.assertEqual(response.context['filter_query'], 'document_type=diploma')
+        self.assertContains(response, f'href="{reverse("export-csv")}?document_type=diploma"')
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('document-list') + '?cursor=broken')
+        self.assertEqual(response.status_code, 404)
+
+    def test_history_pages(self):
+        document = self.documents[0]
+        DocumentHistory.objects.bulk_create([
+            DocumentHistory(document=document, user=self.user, action='view') for _ in range(30)
+        ])
+        url = reverse('document-history', kwargs={'pk': document.pk})
+        first = self.client.get(url)
+        second = self.client.get(url + first.context['next_page_url'])
+        ids = [entry.pk for entry in first.context['history']] + [entry.pk for entry in second.context['history']]
+        self.assertEqual(ids, list(document.history.order_by('-timestamp', '-id').values_list('pk', flat=True)))
+        self.assertIsNone(second.context['next_page_url'])
+
+
+# Кожен перегляд записується в історію (VIEW_DEDUP_SECONDS за замовчуванням — 0)
+@override_settings(DOCUMENT_HISTORY_BUFFER={'ENABLED': False})
+class DocumentDetailCachingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.client.force_login(self.user)
+        self.document = create_documents(1, self.user)[0]
+        self.url = reverse('document-detail', kwargs={'pk': self.document.pk})
+
+    def test_repeat_view_returns_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Перегляди інших користувачів не змінюють ні ETag, ні фрагмент історії
+        other = Client()
+        other.force_login(User.objects.create_user('registrar', password='secret-pass-123'))
+        other.get(self.url)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(DocumentHistory.objects.filter(document=self.document, action='view').count(), 4)
+
+    def test_history_change_updates_etag_and_fragment(self):
+        etag = self.client.get(self.url)['ETag']
+        DocumentHistory.objects.create(document=self.document, user=self.user, action='update',
+                                       details='Змінено номер')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Змінено номер')
+
+    def test_save_changes_etag_and_fragment(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.document.title = 'Оновлений диплом'
+        self.document.document_number = 'ДП-НОВИЙ'
+        self.document.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'ДП-НОВИЙ')
+
+    def test_location_rename_invalidates_fragment(self):
+        self.client.get(self.url)
+        location = self.document.storage_location
+        location.name = 'Нове сховище'
+        location.save()
+        self.assertContains(self.client.get(self.url), 'Нове сховище')
+
+    def test_cached_fragments_skip_queries(self):
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as warm:
+            self.client.get(self.url)
+        self.assertLess(len(warm), len(cold))
+        self.assertFalse(any('documents_documenthistory' in query['sql'] and 'LIMIT 5' in query['sql']
+                             for query in warm.captured_queries))
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            DOCUMENT_UPLOADS={'TEMP_DIR': f'{self.media_root}/tmp', 'MAX_CHUNK_SIZE': 1024},
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.client.force_login(self.user)
+        self.document = create_documents(1, self.user)[0]
+        self.content = bytes(range(256)) * 10
+
+    def init_upload(self, **data):
+        payload = {'filename': 'скан.pdf', 'size': len(self.content), **data}
+        response = self.client.post(
+            reverse('document-upload-init', kwargs={'pk': self.document.pk}),
+            data=json.dumps(payload), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def put_chunk(self, upload, offset, chunk, **headers):
+        return self.client.put(
+            f"{upload['chunk_url']}?offset={offset}", data=chunk,
+            content_type='application/octet-stream', headers=headers,
+        )
+
+    def test_upload_in_chunks_with_retry(self):
+        upload = self.init_upload(sha256=hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(self.put_chunk(upload, 0, self.content[:1024]).json()['offset'], 1024)
+        # Повторна відправка тієї ж частини після обриву не дублює дані
+        self.assertEqual(self.put_chunk(upload, 0, self.content[:1024]).json()['offset'], 1024)
+        self.assertEqual(self.client.get(upload['status_url']).json()['offset'], 1024)
+        self.put_chunk(upload, 1024, self.content[1024:2048])
+        self.put_chunk(upload, 2048, self.content[2048:])
+
+        response = self.client.post(upload['finalize_url'])
+        self.assertEqual(response.status_code, 200)
+        self.document.refresh_from_db()
+        with self.document.file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.content)
+        self.assertTrue(self.document.history.filter(action='update').exists())
+        self.assertEqual(DocumentUpload.objects.get().status, 'complete')
+
+    def test_rejects_gap_oversized_and_corrupt_chunks(self):
+        upload = self.init_upload()
+        self.assertEqual(self.put_chunk(upload, 1024, self.content[:1024]).status_code, 409)
+        self.assertEqual(self.put_chunk(upload, 0, self.content[:2048]).status_code, 413)
+        response = self.put_chunk(upload, 0, self.content[:1024], **{'X-Chunk-SHA256': '0' * 64})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(upload['status_url']).json()['offset'], 0)
+
+    def test_finalize_checks_size_and_checksum(self):
+        upload = self.init_upload(sha256='0' * 64)
+        self.put_chunk(upload, 0, self.content[:1024])
+        self.assertEqual(self.client.post(upload['finalize_url']).status_code, 409)
+
+        self.put_chunk(upload, 1024, self.content[1024:2048])
+        self.put_chunk(upload, 2048, self.content[2048:])
+        self.assertEqual(self.client.post(upload['finalize_url']).status_code, 400)
+        self.document.refresh_from_db()
+        self.assertFalse(self.document.file)
+        self.assertEqual(DocumentUpload.objects.get().status, 'failed')
+
+    def test_only_owner_or_staff_can_upload(self):
+        other = User.objects.create_user('student', password='secret-pass-123')
+        self.client.force_login(other)
+        response = self.client.post(
+            reverse('document-upload-init', kwargs={'pk': self.document.pk}),
+            data=json.dumps({'filename': 'a.pdf', 'size': 10}), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.first, self.second = create_documents(2)
+
+    def attach(self, document, filename, content):
+        document.file.save(filename, ContentFile(content), save=True)
+        return document.file.name
+
+    def test_identical_files_are_stored_once(self):
+        name = self.attach(self.first, 'наказ.pdf', b'%PDF scan')
+        self.assertEqual(self.attach(self.second, 'наказ_копія.pdf', b'%PDF scan'), name)
+        self.assertTrue(name.endswith(hashlib.sha256(b'%PDF scan').hexdigest()))
+        self.assertEqual(self.second.original_filename, 'наказ_копія.pdf')
+        self.assertEqual(FileBlob.objects.get().refcount, 2)
+
+        self.first.delete()
+        self.assertEqual(FileBlob.objects.get().refcount, 1)
+        self.assertTrue(document_storage.exists(name))
+
+    def test_replacing_file_releases_previous_blob(self):
+        old = self.attach(self.first, 'v1.pdf', b'first version')
+        self.attach(self.first, 'v2.pdf', b'second version')
+        self.assertEqual(FileBlob.objects.get(name=old).refcount, 0)
+
+    def test_garbage_collection_removes_orphans_only(self):
+        kept = self.attach(self.first, 'a.pdf', b'kept')
+        orphan = self.attach(self.second, 'b.pdf', b'orphan')
+        # Масове оновлення оминає сигнали; збирач сміття все одно бачить реальні посилання
+        Document.objects.filter(pk=self.second.pk).update(file='')
+
+        self.assertEqual(collect_garbage(grace=timedelta(hours=1)), (0, 0))
+        removed, freed = collect_garbage(grace=timedelta(0))
+        self.assertEqual((removed, freed), (1, len(b'orphan')))
+        self.assertTrue(document_storage.exists(kept))
+        self.assertFalse(document_storage.exists(orphan))
+        self.assertEqual(FileBlob.objects.get().name, kept)
+
+    def test_dedupe_existing_files(self):
+        legacy_a = f'{self.media_root}/documents/звіт.docx'
+        legacy_b = f'{self.media_root}/documents/звіт_HJ7CU8j.docx'
+        os.makedirs(os.path.dirname(legacy_a))
+        for path in (legacy_a, legacy_b):
+            with open(path, 'wb') as legacy_file:
+                legacy_file.write(b'docx content')
+        Document.objects.filter(pk=self.first.pk).update(file='documents/звіт.docx')
+        Document.objects.filter(pk=self.second.pk).update(file='documents/звіт_HJ7CU8j.docx')
+
+        call_command('dedupe_document_files', stdout=StringIO())
+
+        names = set(Document.objects.values_list('file', flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertEqual(FileBlob.objects.get().refcount, 2)
+        self.assertFalse(os.path.exists(legacy_a) or os.path.exists(legacy_b))
+        self.assertEqual(Document.objects.get(pk=self.second.pk).original_filename, 'звіт_HJ7CU8j.docx')
+
+
+class DocumentDownloadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.client.force_login(self.user)
+        self.document = create_documents(1, self.user)[0]
+        self.content = b'0123456789' * 100
+        self.document.file.save('скан наказу.pdf', ContentFile(self.content), save=True)
+        self.url = reverse('document-download', kwargs={'pk': self.document.pk})
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn("filename*=utf-8''%D1%81%D0%BA%D0%B0%D0%BD", response['Content-Disposition'])
+        self.assertEqual(response['ETag'], f'"{hashlib.sha256(self.content).hexdigest()}"')
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-5:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+
+        # Застарілий If-Range — віддаємо файл повністю
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_web_server_handoff(self):
+        with override_settings(DOCUMENT_DOWNLOADS={'BACKEND': 'x-accel'}):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.document.file.name}')
+        self.assertEqual(response.content, b'')
+
+        with override_settings(DOCUMENT_DOWNLOADS={'BACKEND': 'x-sendfile'}):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.document.file.path)
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+
+class ImportDocumentsTests(TestCase):
+    CSV = (
+        'title,document_type,document_number,category,storage_location,issue_date,expiry_date,description\n'
+        'Диплом бакалавра,Диплом,Б-1,Дипломи,Архів 1,2020-06-30,,Випуск 2020\n'
+        'Наказ про зарахування,order,Н-15,Накази,Архів 1,01.09.2021,,\n'
+        'Протокол засідання,protocol,П-7,Протоколи,Архів 2,15/03/2022,15.03.2032,\n'
+        'Без дати,order,Н-16,Накази,Архів 1,,,\n'
+        'Невідомий тип,довідка,Д-1,Накази,Архів 1,2022-01-01,,\n'
+    )
+
+    def setUp(self):
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        DocumentCategory.objects.create(name='Дипломи')
+        StorageLocation.objects.create(name='Архів 1', room='101', shelf='1')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, 'legacy.csv')
+        with open(self.path, 'w', encoding='utf-8') as csv_file:
+            csv_file.write(self.CSV)
+
+    def run_import(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_documents', self.path, '--user', 'archivist', *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_unknown_names_are_rejected_without_create_missing(self):
+        _, errors = self.run_import()
+        self.assertEqual(Document.objects.count(), 1)
+        self.assertIn('Рядок 3', errors)
+        self.assertIn('Рядок 5', errors)
+        self.assertIn('Рядок 6', errors)
+
+    def test_import_in_batches_with_history_and_search(self):
+        output, _ = self.run_import('--create-missing', '--batch-size', '2')
+        self.assertIn('Імпортовано документів: 3, помилок: 2', output)
+
+        protocol = Document.objects.get(document_number='П-7')
+        self.assertEqual(protocol.issue_date, date(2022, 3, 15))
+        self.assertEqual(protocol.expiry_date, date(2032, 3, 15))
+        self.assertEqual(protocol.storage_location.name, 'Архів 2')
+        self.assertEqual(protocol.created_by, self.user)
+        self.assertEqual(DocumentCategory.objects.filter(name='Накази').count(), 1)
+        self.assertEqual(DocumentHistory.objects.filter(action='create', user=self.user).count(), 3)
+        self.assertEqual(
+            list(Document.objects.apply_search_filters({'query': 'зарахування'}).values_list('document_number', flat=True)),
+            ['Н-15'],
+        )
+
+    def test_dry_run_writes_nothing(self):
+        output, _ = self.run_import('--create-missing', '--dry-run')
+        self.assertIn('Перевірено документів: 3, помилок: 2', output)
+        self.assertFalse(Document.objects.exists())
+        self.assertFalse(DocumentCategory.objects.filter(name='Накази').exists())
+
+    def test_resource_import_through_admin_path(self):
+        from tablib import Dataset
+
+        from .resources import DocumentResource
+
+        dataset = Dataset().load(self.CSV.split('\n', 2)[0] + '\n' + self.CSV.split('\n', 2)[1], format='csv')
+        result = DocumentResource(user=self.user).import_data(dataset, dry_run=False, use_transactions=True)
+        self.assertFalse(result.has_errors())
+        self.assertEqual(DocumentHistory.objects.filter(document__document_number='Б-1').count(), 1)
+
+
+class BulkUpdateTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('registrar', password='secret-pass-123', is_staff=True, is_superuser=True)
+        self.documents = create_documents(4)
+        self.box = StorageLocation.objects.create(name='Коробка 7', room='204', shelf='3')
+        self.client.force_login(self.staff)
+
+    def post(self, data):
+        return self.client.post(reverse('document-bulk-update'), json.dumps(data), content_type='application/json')
+
+    def test_dry_run_reports_counts_without_writing(self):
+        Document.objects.filter(pk=self.documents[0].pk).update(storage_location=self.box)
+        response = self.post({
+            'ids': [document.pk for document in self.documents],
+            'changes': {'storage_location': self.box.pk},
+            'dry_run': True,
+        })
+        self.assertEqual(response.json(), {'matched': 4, 'changed': 3, 'dry_run': True})
+        self.assertEqual(Document.objects.filter(storage_location=self.box).count(), 1)
+        self.assertFalse(DocumentHistory.objects.exists())
+
+    def test_update_is_one_statement_per_chunk_with_history(self):
+        ids = [document.pk for document in self.documents[:3]]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post({'ids': ids, 'changes': {'storage_location': self.box.pk, 'document_type': 'order'}})
+        self.assertEqual(response.json()['changed'], 3)
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "documents_document"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            Document.objects.filter(storage_location=self.box, document_type='order').count(), 3,
+        )
+        history = DocumentHistory.objects.filter(action='update', user=self.staff)
+        self.assertEqual(sorted(history.values_list('document_id', flat=True)), ids)
+        self.assertIn('Коробка 7', history.first().details)
+
+    def test_filters_select_documents(self):
+        category = self.documents[1].category
+        response = self.post({'filters': {'category': category.pk}, 'changes': {'storage_location': self.box.pk}})
+        self.assertEqual(response.json()['changed'], 1)
+        self.assertEqual(Document.objects.get(storage_location=self.box), self.documents[1])
+
+    def test_requires_staff_and_changes(self):
+        self.assertEqual(self.post({'ids': [self.documents[0].pk], 'changes': {}}).status_code, 400)
+        self.assertEqual(self.post({'ids': [self.documents[0].pk], 'changes': {'title': 'x'}}).status_code, 400)
+        self.client.force_login(User.objects.create_user('student', password='secret-pass-123'))
+        response = self.post({'ids': [self.documents[0].pk], 'changes': {'storage_location': self.box.pk}})
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_relocate_action(self):
+        url = reverse('admin:documents_document_changelist')
+        selected = [self.documents[0].pk, self.documents[1].pk]
+        data = {'action': 'bulk_relocate', '_selected_action': selected}
+        response = self.client.post(url, data)
+        self.assertContains(response, 'Вибрано документів: <strong>2</strong>', html=False)
+        self.assertNotContains(response, 'name="category"')
+
+        response = self.client.post(url, dict(data, storage_location=self.box.pk, bulk_submit='preview'))
+        self.assertContains(response, 'Буде змінено документів: <strong>2</strong>')
+        self.assertFalse(Document.objects.filter(storage_location=self.box).exists())
+
+        response = self.client.post(url, dict(data, storage_location=self.box.pk, bulk_submit='apply'))
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        self.assertEqual(Document.objects.filter(storage_location=self.box).count(), 2)
+
+
+# Перегляди документів під час заміру пишуться одразу, а не лишаються в буфері
+@override_settings(DOCUMENT_HISTORY_BUFFER={'ENABLED': False})
+class SeedAndBenchmarkTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.settings_override = override_settings(MEDIA_ROOT=self.directory)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_seed_archive_creates_related_rows(self):
+        call_command('seed_archive', '--documents', '30', '--users', '3', '--categories', '2',
+                     '--locations', '2', '--batch-size', '10', stdout=StringIO())
+        self.assertEqual(Document.objects.count(), 30)
+        self.assertEqual(User.objects.filter(profile__isnull=False).count(), 3)
+        self.assertEqual(DocumentHistory.objects.filter(action='create').count(), 30)
+        self.assertGreater(DocumentHistory.objects.count(), 30)
+        self.assertTrue(Document.objects.apply_search_filters({'query': Document.objects.first().title}).exists())
+
+        # Назва кожного документа відповідає його типу
+        from .management.commands.seed_archive import TITLES
+        self.assertEqual(set(TITLES), {code for code, _ in Document.DOCUMENT_TYPES})
+        for title, document_type in Document.objects.values_list('title', 'document_type'):
+            self.assertTrue(title.startswith(TITLES[document_type]), title)
+
+    def test_benchmark_writes_percentiles_and_query_counts(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'secret-pass-123')
+        call_command('seed_archive', '--documents', '5', '--users', '1', stdout=StringIO())
+        output = os.path.join(self.directory, 'benchmark.json')
+        call_command('benchmark_endpoints', '--repeat', '2', '--warmup', '0', '--output', output, stdout=StringIO())
+
+        with open(output, encoding='utf-8') as source:
+            result = json.load(source)
+        self.assertEqual(result['data']['documents'], 5)
+        for name in ('document_list_query', 'document_detail', 'document_history', 'export_csv', 'report_pdf'):
+            self.assertEqual(result['endpoints'][name]['status'], 200, name)
+            self.assertGreater(result['endpoints'][name]['queries'], 0)
+            self.assertLessEqual(result['endpoints'][name]['p50_ms'], result['endpoints'][name]['p95_ms'])
+        self.assertFalse(os.listdir(os.path.join(self.directory, 'reports')))
+
+
+class DocumentCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('archivist', password='secret-pass-123', is_staff=True)
+        self.documents = create_documents(3, self.user)
+        self.client.force_login(self.user)
+
+    def assertCountersConsistent(self):
+        self.assertEqual(call_command_output('recount_archive', '--dry-run'), 'Знайдено розбіжностей: 0')
+
+    def test_counters_follow_save_update_and_delete(self):
+        first, second = self.documents[0], self.documents[1]
+        self.assertEqual(DocumentCategory.objects.get(pk=first.category_id).document_count, 1)
+
+        first.category = second.category
+        first.document_type = 'order'
+        first.save()
+        self.assertEqual(DocumentCategory.objects.get(pk=second.category_id).document_count, 2)
+        self.assertEqual(
+            dict(second.category.type_counts.values_list('document_type', 'count')), {'diploma': 1, 'order': 1},
+        )
+        self.assertEqual(StorageLocation.objects.get(pk=first.storage_location_id).document_count, 1)
+
+        second.delete()
+        self.assertEqual(DocumentCategory.objects.get(pk=first.category_id).document_count, 1)
+        self.assertCountersConsistent()
+
+    def test_bulk_update_and_bulk_create_keep_counters(self):
+        from .bulk import bulk_update_documents
+        from .resources import create_documents_in_bulk
+
+        box = StorageLocation.objects.create(name='Коробка 7', room='204', shelf='3')
+        bulk_update_documents(Document.objects.all(), {'storage_location': box, 'document_type': 'order'})
+        box.refresh_from_db()
+        self.assertEqual(box.document_count, 3)
+        self.assertEqual(box.type_counts.get().count, 3)
+
+        category = self.documents[0].category
+        create_documents_in_bulk([
+            Document(title='Наказ', document_type='order', document_number=f'Н-{i}', issue_date=date(2024, 1, 1),
+                     category=category, storage_location=box)
+            for i in range(2)
+        ])
+        category.refresh_from_db()
+        self.assertEqual(category.document_count, 3)
+        self.assertCountersConsistent()
+
+    def test_editing_category_does_not_overwrite_counter(self):
+        category = DocumentCategory.objects.get(pk=self.documents[0].category_id)
+        Document.objects.create(title='Ще диплом', document_type='diploma', document_number='ДП-9',
+                                issue_date=date(2024, 1, 1), category=category)
+        category.description = 'Оновлений опис'
+        category.save()
+        category.refresh_from_db()
+        self.assertEqual(category.document_count, 2)
+
+    def test_recount_repairs_drift(self):
+        DocumentCategory.objects.update(document_count=99)
+        self.assertEqual(call_command_output('recount_archive'), 'Виправлено лічильників: 3')
+        self.assertCountersConsistent()
+
+    def test_list_pages_query_count_does_not_grow(self):
+        def count_queries(name):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        baseline = {name: count_queries(name) for name in ('category-list', 'storage-location-list')}
+        create_documents(5, self.user)
+        for name, queries in baseline.items():
+            self.assertEqual(count_queries(name), queries, name)
+        self.assertContains(self.client.get(reverse('category-list')), 'Диплом: 1')
+
+
+class DocumentExpiryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.client.force_login(self.user)
+        self.today = timezone.localdate()
+        self.documents = create_documents(5, self.user)
+        for document, days in zip(self.documents, (-1, 0, 5, 20, 60)):
+            document.expiry_date = self.today + timedelta(days=days)
+            document.save()
+
+    def test_expiring_within_uses_date_range(self):
+        expiring = Document.objects.expiring_within(30)
+        self.assertEqual(set(expiring), set(self.documents[1:4]))
+        self.assertEqual(list(Document.objects.expiring_within(0)), [self.documents[1]])
+
+    def test_scan_creates_notifications_once_per_threshold(self):
+        output = call_command_output('scan_expiring_documents', '--batch-size', '1')
+        self.assertIn('Документів, що спливають: 3, створено повідомлень: 3', output)
+        notifications = dict(ExpiryNotification.objects.values_list('document_id', 'days_before'))
+        self.assertEqual(notifications, {
+            self.documents[1].pk: 1, self.documents[2].pk: 7, self.documents[3].pk: 30,
+        })
+
+        self.assertIn('створено повідомлень: 0', call_command_output('scan_expiring_documents'))
+
+        # Через 16 днів четвертий документ переходить до порогу «за 7 днів»
+        stats = scan_expiring(today=self.today + timedelta(days=16))
+        self.assertEqual(stats, {'matched': 1, 'created': 1})
+
+        # Продовжений термін дії — нове повідомлення
+        self.documents[2].expiry_date += timedelta(days=1)
+        self.documents[2].save()
+        self.assertEqual(scan_expiring()['created'], 1)
+        self.assertEqual(self.documents[2].expiry_notifications.count(), 2)
+
+    def test_expiring_widget_is_cached_until_documents_change(self):
+        response = self.client.get(reverse('document-list'))
+        self.assertEqual(response.context['expiring']['total'], 3)
+        self.assertEqual(response.context['expiring']['documents'][0]['days_left'], 0)
+        self.assertContains(response, 'Термін дії спливає протягом 30 днів: 3')
+
+        with CaptureQueriesContext(connection) as queries:
+            expiring_soon()
+        self.assertEqual(len(queries), 0)
+
+        Document.objects.filter(pk=self.documents[3].pk).delete()
+        self.assertEqual(expiring_soon()['total'], 2)
+        self.documents[4].expiry_date = self.today + timedelta(days=10)
+        self.documents[4].save()
+        self.assertEqual(expiring_soon()['total'], 3)
+
+        response = self.client.get(reverse('document-list'), {'expiring_within': 7})
+        self.assertEqual(set(response.context['documents']), {self.documents[1], self.documents[2]})
+
+
+class DocumentHistoryBufferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.spool_path = os.path.join(self.directory, 'spool', 'history.jsonl')
+        self.settings_override = override_settings(DOCUMENT_HISTORY_BUFFER={
+            'ENABLED': True, 'BATCH_SIZE': 3, 'FLUSH_INTERVAL': 3600, 'SPOOL_PATH': self.spool_path,
+            'VIEW_DEDUP_SECONDS': 300,
+        })
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.documents = create_documents(2, self.user)
+        # Окремий буфер без фонового потоку: записи відбуваються лише за викликами тесту
+        self.buffer = HistoryBuffer()
+
+    def views(self):
+        return DocumentHistory.objects.filter(action='view')
+
+    def test_events_are_written_in_batches(self):
+        self.buffer.add(self.documents[0].pk, self.user.pk, 'view')
+        self.buffer.add(self.documents[1].pk, self.user.pk, 'view')
+        self.assertEqual(self.views().count(), 0)
+
+        self.buffer.add(self.documents[0].pk, self.user.pk, 'view')
+        self.assertEqual(self.views().count(), 3)
+
+        self.buffer.add(self.documents[1].pk, self.user.pk, 'view')
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.views().count(), 4)
+
+    def test_repeated_views_are_deduplicated(self):
+        self.assertTrue(should_log_view(self.documents[0].pk, self.user.pk))
+        self.assertFalse(should_log_view(self.documents[0].pk, self.user.pk))
+        self.assertTrue(should_log_view(self.documents[1].pk, self.user.pk))
+
+    def test_failed_write_is_spooled_and_replayed_without_deleted_documents(self):
+        self.buffer.add(self.documents[0].pk, self.user.pk, 'view', 'перший')
+        self.buffer.add(self.documents[1].pk, self.user.pk, 'view', 'другий')
+        with mock.patch.object(HistoryBuffer, 'write', side_effect=DatabaseError('database is locked')), \
+                self.assertLogs('documents.history', 'ERROR'):
+            self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.views().count(), 0)
+        with open(self.spool_path, encoding='utf-8') as spool_file:
+            self.assertEqual(len(spool_file.readlines()), 2)
+
+        Document.objects.filter(pk=self.documents[1].pk).delete()
+        self.assertEqual(self.buffer.replay_spool(), 1)
+        self.assertFalse(os.path.exists(self.spool_path))
+        self.assertEqual(list(self.views().values_list('details', flat=True)), ['перший'])
+        self.assertEqual(self.buffer.replay_spool(), 0)
+
+    def test_flush_command_replays_spool(self):
+        self.buffer.spool([{
+            'document_id': self.documents[0].pk, 'user_id': self.user.pk, 'action': 'view',
+            'details': '', 'timestamp': timezone.now(),
+        }])
+        self.assertIn('Записано подій історії: 1', call_command_output('flush_document_history'))
+        self.assertEqual(self.views().count(), 1)
+
+
+class DocumentSearchTests(TestCase):
+    def setUp(self):
+        self.diploma = self.create('Диплом магістра', 'ДМ-17')
+        self.order = self.create('Наказ про зарахування', 'Н-2', 'Копія диплома додана до особової справи студента '
+                                 'разом із заявою, фотокартками та довідкою з попереднього місця навчання')
+        self.statement = self.create("Заява щодо м’ясокомбінату", 'З-5')
+
+    def create(self, title, number, description=''):
+        return Document.objects.create(title=title, document_type='other', document_number=number,
+                                       description=description, issue_date=date(2024, 1, 1))
+
+    def search(self, query):
+        return list(Document.objects.apply_search_filters({'query': query}))
+
+    def test_ukrainian_endings_are_stripped(self):
+        self.assertEqual(stem_token('дипломів'), 'диплом')
+        self.assertEqual(stem_token('накази'), 'наказ')
+        self.assertEqual(stem_token('акти'), 'акти')
+        self.assertEqual(tokenize_query('Дипломи, ДМ-17!'), ['диплом', 'дм', '17'])
+
+    def test_search_matches_word_forms_and_prefixes_by_rank(self):
+        # Збіг у короткій назві важить більше, ніж в одному слові довгого опису
+        self.assertEqual(self.search('дипломів'), [self.diploma, self.order])
+        self.assertEqual(self.search('дипл'), [self.diploma, self.order])
+        self.assertEqual(self.search('зарахуванням'), [self.order])
+        self.assertEqual(self.search('ДМ-17'), [self.diploma])
+        self.assertEqual(self.search("м'ясокомбінат"), [self.statement])
+        self.assertEqual(self.search('диплом наказ'), [self.order])
+        # Синтаксис FTS5 з запиту не інтерпретується і не ламає пошук
+        self.assertEqual(self.search('диплом* "(^'), [self.diploma, self.order])
+
+    def test_query_without_words_is_not_ignored(self):
+        self.assertEqual(self.search('--'), [])
+        self.assertEqual(self.search('*'), [])
+        # Такий запит шукається як підрядок: дефіс є в усіх номерах
+        self.assertEqual(set(self.search('-')), {self.diploma, self.order, self.statement})
+
+    def test_index_follows_document_changes(self):
+        self.diploma.title = 'Диплом бакалавра'
+        self.diploma.save()
+        self.assertEqual(self.search('магістра'), [])
+        self.assertEqual(self.search('бакалавр'), [self.diploma])
+
+        self.order.delete()
+        self.assertEqual(self.search('диплом'), [self.diploma])
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_rebuild_search_index(self):
+        get_search_backend().clear()
+        self.assertEqual(self.search('диплом'), [])
+
+        self.assertIn('Проіндексовано документів: 3', call_command_output('rebuild_search_index', '--batch-size', '2'))
+        self.assertEqual(self.search('диплом'), [self.diploma, self.order])
+
+    def test_icontains_fallback_for_other_databases(self):
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            backend = get_search_backend()
+        self.assertIsInstance(backend, IContainsSearchBackend)
+        found = backend.search(Document.objects.order_by('pk'), 'магістр')
+        self.assertEqual(list(found), [self.diploma])
+        self.assertEqual(list(backend.search(Document.objects.order_by('pk'), 'особової')), [self.order])
@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Каталог для незавершених завантажень; краще на тій самій файловій системі,
+    # що й MEDIA_ROOT, тоді готовий файл переміщується без копіювання
+    'TEMP_DIR': os.path.join(settings.BASE_DIR, 'upload_tmp'),
+    'MAX_SIZE': 2 * 1024 * 1024 * 1024,
+    'MAX_CHUNK_SIZE': 8 * 1024 * 1024,
+    # Незавершені завантаження, яких не торкались стільки годин, видаляються
+    'EXPIRE_HOURS': 24,
+}
+
+# Блок читання тіла запиту і файлу на диску
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def get_setting(name):
+    return getattr(settings, 'DOCUMENT_UPLOADS', {}).get(name, DEFAULTS[name])
+
+
+def temp_path(upload):
+    return os.path.join(get_setting('TEMP_DIR'), f'{upload.pk}.part')
+
+
+class ChunkedUploadFile(File):
+    # FileSystemStorage переміщує файли з temporary_file_path() замість копіювання
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def write_chunk(upload, stream, offset, checksum=''):
+    # Дописує частину з потоку запиту блоками по READ_BLOCK_SIZE. Частину можна
+    # надіслати повторно з тим самим offset — файл обрізається до нього
+    if upload.status != 'pending':
+        raise UploadError('Завантаження вже завершено', status=409)
+    if offset > upload.received:
+        raise UploadError('Пропущено частину файлу', status=409)
+
+    path = temp_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    digest = hashlib.sha256()
+    written = 0
+    with open(path, 'ab') as part:
+        part.truncate(offset)
+        part.seek(offset)
+        while True:
+            block = stream.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            written += len(block)
+            if written > get_setting('MAX_CHUNK_SIZE') or offset + written > upload.size:
+                part.truncate(offset)
+                raise UploadError('Частина виходить за межі дозволеного розміру', status=413)
+            digest.update(block)
+            part.write(block)
+
+        if checksum and digest.hexdigest() != checksum.lower():
+            part.truncate(offset)
+            raise UploadError('Контрольна сума частини не збігається')
+
+    upload.received = offset + written
+    upload.save(update_fields=['received', 'updated_at'])
+    return upload.received
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finalize_upload(upload):
+    if upload.status != 'pending':
+        raise UploadError('Завантаження вже завершено', status=409)
+    path = temp_path(upload)
+    if upload.received != upload.size or not os.path.exists(path) or os.path.getsize(path) != upload.size:
+        raise UploadError('Файл завантажено не повністю', status=409)
+
+    checksum = file_checksum(path)
+    if upload.checksum and checksum != upload.checksum.lower():
+        discard_upload(upload)
+        raise UploadError('Контрольна сума файлу не збігається')
+
+    document = upload.document
+    with open(path, 'rb') as source:
+        document.file.save(upload.filename, ChunkedUploadFile(source), save=True)
+    # Після переміщення у сховище тимчасового файлу вже немає
+    if os.path.exists(path):
+        os.remove(path)
+
+    upload.checksum = checksum
+    upload.status = 'complete'
+    upload.save(update_fields=['checksum', 'status', 'updated_at'])
+    return document
+
+
+def discard_upload(upload, status='failed'):
+    path = temp_path(upload)
+    if os.path.exists(path):
+        os.remove(path)
+    upload.status = status
+    upload.save(update_fields=['status', 'updated_at'])
+
+
+def cleanup_stale_uploads(hours=None):
+    from .models import DocumentUpload
+
+    if hours is None:
+        hours = get_setting('EXPIRE_HOURS')
+    threshold = timezone.now() - timedelta(hours=hours)
+    removed = 0
+    for upload in DocumentUpload.objects.filter(status='pending', updated_at__lt=threshold):
+        discard_upload(upload)
+        removed += 1
+        logger.info('Видалено незавершене завантаження %s', upload.pk)
+    return removed
@@ -9,6 +9,14 @@ urlpatterns = [
     path('<int:pk>/update/', views.DocumentUpdateView.as_view(), name='document-update'),
     path('<int:pk>/delete/', views.DocumentDeleteView.as_view(), name='document-delete'),
     path('<int:pk>/history/', views.DocumentHistoryListView.as_view(), name='document-history'),
+    path('<int:pk>/download/', views.document_download, name='document-download'),
+    path('bulk/', views.document_bulk_update, name='document-bulk-update'),
+    
+    # Поштучне завантаження файлів
+    path('<int:pk>/uploads/', views.upload_init, name='document-upload-init'),
+    path('uploads/<uuid:upload_id>/', views.upload_status, name='document-upload-status'),
+    path('uploads/<uuid:upload_id>/chunk/', views.upload_chunk, name='document-upload-chunk'),
+    path('uploads/<uuid:upload_id>/finalize/', views.upload_finalize, name='document-upload-finalize'),
     
     # Категорії
     path('categories/', views.CategoryListView.as_view(), name='category-list'),
@@ -1,74 +1,106 @@
+import json
+import os
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.decorators import login_required
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib import messages
-from django.db.models import Q
-from .models import Document, DocumentCategory, StorageLocation, DocumentHistory
-from .forms import DocumentForm, DocumentCategoryForm, StorageLocationForm, DocumentSearchForm
+from django.db.models import Max, Q
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from .models import Document, DocumentCategory, StorageLocation, DocumentHistory, DocumentUpload
+from .forms import DocumentForm, DocumentCategoryForm, StorageLocationForm, DocumentSearchForm, DocumentBulkUpdateForm
+from .bulk import bulk_update_documents
+from .cache import document_detail_version, document_etag, get_fragment_timeout
+from .downloads import serve_document_file
+from .expiry import expiring_soon
+from .history import log_document_view
+from .pagination import KeysetPaginationMixin
+from .uploads import UploadError, finalize_upload, get_setting as get_upload_setting, write_chunk
 
-class DocumentListView(LoginRequiredMixin, ListView):
+class DocumentListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Document
     template_name = 'documents/document_list.html'
     context_object_name = 'documents'
     paginate_by = 10
+    cursor_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = Document.objects.for_listing()
         form = DocumentSearchForm(self.request.GET)
+        self.search_query = ''
         
         if form.is_valid():
-            query = form.cleaned_data.get('query')
-            document_type = form.cleaned_data.get('document_type')
-            category = form.cleaned_data.get('category')
-            start_date = form.cleaned_data.get('start_date')
-            end_date = form.cleaned_data.get('end_date')
-            storage_location = form.cleaned_data.get('storage_location')
-            
-            if query:
-                queryset = queryset.filter(
-                    Q(title__icontains=query) | 
-                    Q(document_number__icontains=query) |
-                    Q(description__icontains=query)
-                )
-            
-            if document_type:
-                queryset = queryset.filter(document_type=document_type)
-            
-            if category:
-                queryset = queryset.filter(category=category)
-            
-            if start_date:
-                queryset = queryset.filter(issue_date__gte=start_date)
-            
-            if end_date:
-                queryset = queryset.filter(issue_date__lte=end_date)
-            
-            if storage_location:
-                queryset = queryset.filter(storage_location=storage_location)
+            self.search_query = form.cleaned_data.get('query')
+            queryset = queryset.apply_search_filters(form.cleaned_data)
         
         return queryset
     
+    def get_cursor_ordering(self):
+        # Результати повнотекстового пошуку впорядковані за релевантністю, тож для них
+        # лишається звичайна посторінкова навігація
+        if self.search_query:
+            return None
+        return super().get_cursor_ordering()
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search_form'] = DocumentSearchForm(self.request.GET)
+        context['expiring'] = expiring_soon()
         return context
 
 class DocumentDetailView(LoginRequiredMixin, DetailView):
     model = Document
     template_name = 'documents/document_detail.html'
     
+    def get_queryset(self):
+        # id останньої зміни в історії входить в ETag і ключ фрагмента «Остання активність».
+        # Перегляди не враховуються: інакше кожне відкриття сторінки будь-ким скидало б
+        # і ETag, і фрагмент
+        return Document.objects.annotate(
+            last_change_id=Max('history__id', filter=~Q(history__action='view'))
+        )
+    
     def get_object(self, queryset=None):
         obj = super().get_object(queryset)
-        # Записуємо історію перегляду
-        DocumentHistory.objects.create(
-            document=obj,
-            user=self.request.user,
-            action='view',
-            details=f'Перегляд документа користувачем {self.request.user.username}'
-        )
+        # Записуємо історію перегляду через буфер, щоб читання не блокувало запис
+        log_document_view(obj, self.request.user)
         return obj
+    
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        self.detail_version = document_detail_version(self.object)
+        etag = document_etag(self.object, request.user, self.detail_version)
+        last_modified = int(self.object.updated_at.timestamp())
+        
+        # Повідомлення (наприклад, після редагування) показуються лише у свіжій відповіді
+        response = None
+        if not len(messages.get_messages(request)):
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            context = self.get_context_data(object=self.object)
+            response = self.render_to_response(context)
+        
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+        # Браузер зберігає сторінку, але перевіряє її актуальність при кожному відкритті
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['detail_version'] = self.detail_version
+        context['fragment_timeout'] = get_fragment_timeout()
+        context['can_edit'] = can_edit_document(self.request.user, self.object)
+        # Запит виконується, лише якщо фрагмент історії відсутній у кеші
+        context['recent_history'] = (
+            self.object.history.exclude(action='view').select_related('user').order_by('-timestamp', '-id')[:5]
+        )
+        return context
 
 class DocumentCreateView(LoginRequiredMixin, CreateView):
     model = Document
@@ -141,6 +173,10 @@ class CategoryListView(LoginRequiredMixin, ListView):
     model = DocumentCategory
     template_name = 'documents/category_list.html'
     context_object_name = 'categories'
+    
+    def get_queryset(self):
+        # Кількості документів зберігаються в самих записах (document_count, type_counts)
+        return DocumentCategory.objects.prefetch_related('type_counts')
 
 class CategoryCreateView(LoginRequiredMixin, CreateView):
     model = DocumentCategory
@@ -175,6 +211,9 @@ class StorageLocationListView(LoginRequiredMixin, ListView):
     model = StorageLocation
     template_name = 'documents/storage_location_list.html'
     context_object_name = 'locations'
+    
+    def get_queryset(self):
+        return StorageLocation.objects.prefetch_related('type_counts')
 
 class StorageLocationCreateView(LoginRequiredMixin, CreateView):
     model = StorageLocation
@@ -205,18 +244,155 @@ class StorageLocationDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteV
         return self.request.user.is_staff
 
 # Представлення для історії документів
-class DocumentHistoryListView(LoginRequiredMixin, ListView):
+class DocumentHistoryListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = DocumentHistory
     template_name = 'documents/document_history_list.html'
     context_object_name = 'history'
     paginate_by = 20
+    cursor_ordering = ('-timestamp', '-id')
     
     def get_queryset(self):
         document_id = self.kwargs.get('pk')
-        return DocumentHistory.objects.filter(document_id=document_id).order_by('-timestamp')
+        return DocumentHistory.objects.filter(document_id=document_id).select_related('user')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         document_id = self.kwargs.get('pk')
         context['document'] = get_object_or_404(Document, pk=document_id)
-        return context
\ No newline at end of file
+        return context
+
+@login_required
+@require_GET
+def document_download(request, pk):
+    # Файли документів не лежать у публічному /media/: доступ лише через цей view,
+    # а саму передачу виконує веб-сервер (X-Sendfile / X-Accel-Redirect) або FileResponse
+    document = get_object_or_404(Document.objects.only('pk', 'file', 'original_filename'), pk=pk)
+    if not document.file or not document.file.storage.exists(document.file.name):
+        raise Http404('Файл документа не знайдено')
+    return serve_document_file(request, document)
+
+
+# Поштучне завантаження великих файлів: init -> chunk (PUT, багато разів) -> finalize
+def can_edit_document(user, document):
+    return user == document.created_by or user.is_staff
+
+
+def upload_state(upload):
+    return {
+        'upload_id': str(upload.pk),
+        'filename': upload.filename,
+        'size': upload.size,
+        'offset': upload.received,
+        'status': upload.status,
+        'chunk_size': get_upload_setting('MAX_CHUNK_SIZE'),
+        'status_url': reverse('document-upload-status', kwargs={'upload_id': upload.pk}),
+        'chunk_url': reverse('document-upload-chunk', kwargs={'upload_id': upload.pk}),
+        'finalize_url': reverse('document-upload-finalize', kwargs={'upload_id': upload.pk}),
+    }
+
+
+@login_required
+@require_POST
+def upload_init(request, pk):
+    document = get_object_or_404(Document, pk=pk)
+    if not can_edit_document(request.user, document):
+        return JsonResponse({'error': 'Недостатньо прав для зміни документа'}, status=403)
+
+    try:
+        data = json.loads(request.body)
+        filename = os.path.basename(str(data['filename'])).strip()
+        size = int(data['size'])
+        checksum = str(data.get('sha256') or '').lower()
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': "Потрібні поля filename і size"}, status=400)
+    if not filename or size <= 0 or size > get_upload_setting('MAX_SIZE'):
+        return JsonResponse({'error': 'Неприпустимий файл або розмір'}, status=400)
+    if checksum and len(checksum) != 64:
+        return JsonResponse({'error': 'sha256 має містити 64 шістнадцяткові символи'}, status=400)
+
+    upload = DocumentUpload.objects.create(
+        document=document, user=request.user, filename=filename, size=size, checksum=checksum,
+    )
+    return JsonResponse(upload_state(upload), status=201)
+
+
+@login_required
+@require_GET
+def upload_status(request, upload_id):
+    # Клієнт після обриву з'єднання дізнається, з якого байта продовжувати
+    upload = get_object_or_404(DocumentUpload, pk=upload_id, user=request.user)
+    return JsonResponse(upload_state(upload))
+
+
+@login_required
+@require_http_methods(['PUT'])
+def upload_chunk(request, upload_id):
+    # Тіло запиту — сирі байти частини; читається потоком, а не через request.body
+    upload = get_object_or_404(DocumentUpload, pk=upload_id, user=request.user)
+    try:
+        offset = int(request.GET.get('offset', upload.received))
+        if offset < 0:
+            raise ValueError(offset)
+    except ValueError:
+        return JsonResponse({'error': 'Неприпустимий offset'}, status=400)
+
+    try:
+        write_chunk(upload, request, offset, checksum=request.headers.get('X-Chunk-SHA256', ''))
+    except UploadError as e:
+        return JsonResponse({'error': str(e), 'offset': upload.received}, status=e.status)
+    return JsonResponse(upload_state(upload))
+
+
+@login_required
+@require_POST
+def upload_finalize(request, upload_id):
+    upload = get_object_or_404(DocumentUpload.objects.select_related('document'), pk=upload_id, user=request.user)
+    try:
+        document = finalize_upload(upload)
+    except UploadError as e:
+        return JsonResponse({'error': str(e), 'offset': upload.received}, status=e.status)
+
+    DocumentHistory.objects.create(
+        document=document,
+        user=request.user,
+        action='update',
+        details=f'Завантаження файлу {upload.filename} користувачем {request.user.username}'
+    )
+    return JsonResponse(dict(upload_state(upload), file_url=reverse('document-download', kwargs={'pk': document.pk})))
+
+
+# Масові операції: переміщення, зміна категорії або типу для багатьох документів
+@login_required
+@require_POST
+def document_bulk_update(request):
+    # Тіло: {"ids": [...]} або {"filters": {...як у DocumentSearchForm}},
+    # "changes": {"category": id, "storage_location": id, "document_type": код}, "dry_run": bool
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Масові зміни доступні лише персоналу'}, status=403)
+    try:
+        data = json.loads(request.body)
+        ids = data.get('ids')
+        filters = data.get('filters')
+        changes = data['changes']
+        if not isinstance(changes, dict) or (ids is None) == (filters is None):
+            raise ValueError(data)
+        if ids is not None:
+            ids = [int(pk) for pk in ids]
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse({'error': 'Потрібні поля changes і ids або filters'}, status=400)
+
+    form = DocumentBulkUpdateForm(changes)
+    if not form.is_valid():
+        return JsonResponse({'error': 'Неприпустимі зміни', 'errors': form.errors}, status=400)
+
+    if ids is not None:
+        queryset = Document.objects.filter(pk__in=ids)
+    else:
+        search_form = DocumentSearchForm(filters)
+        if not search_form.is_valid():
+            return JsonResponse({'error': 'Неприпустимі фільтри', 'errors': search_form.errors}, status=400)
+        queryset = Document.objects.apply_search_filters(search_form.cleaned_data)
+
+    dry_run = bool(data.get('dry_run'))
+    result = bulk_update_documents(queryset, form.get_changes(), user=request.user, dry_run=dry_run)
+    return JsonResponse(dict(result, dry_run=dry_run))
@@ -3,7 +3,7 @@ from .models import Report
 
 @admin.register(Report)
 class ReportAdmin(admin.ModelAdmin):
-    list_display = ('title', 'report_type', 'created_by', 'created_at')
-    list_filter = ('report_type', 'created_at')
+    list_display = ('title', 'report_type', 'status', 'progress', 'created_by', 'created_at')
+    list_filter = ('report_type', 'status', 'created_at')
     search_fields = ('title',)
-    readonly_fields = ('created_by', 'created_at', 'parameters', 'file')
\ No newline at end of file
+    readonly_fields = ('created_by', 'created_at', 'parameters', 'file', 'status', 'progress', 'error', 'started_at', 'finished_at')
\ No newline at end of file
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import DataVersion, Report
+
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = 'reports'
+
+# Від яких даних залежить кожен тип звіту
+REPORT_SCOPES = {
+    'activity_log': ('documents', 'history'),
+}
+DEFAULT_SCOPES = ('documents',)
+
+
+def bump_data_version(scope):
+    if not DataVersion.objects.filter(scope=scope).update(version=F('version') + 1):
+        DataVersion.objects.get_or_create(scope=scope, defaults={'version': 1})
+
+
+def get_data_versions(scopes):
+    versions = dict(DataVersion.objects.filter(scope__in=scopes).values_list('scope', 'version'))
+    versions = {scope: versions.get(scope, 0) for scope in scopes}
+    if 'history' in versions:
+        # Історія лише доповнюється, тож її версія — найбільший id (пошук по первинному
+        # ключу) замість UPDATE одного рядка DataVersion на кожен запис історії;
+        # лічильник змінюють тільки видалення записів
+        from documents.models import DocumentHistory
+        last_id = DocumentHistory.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        versions['history'] = [versions['history'], last_id]
+    return versions
+
+
+def report_cache_key(report_type, parameters):
+    scopes = REPORT_SCOPES.get(report_type, DEFAULT_SCOPES)
+    payload = json.dumps({
+        'report_type': report_type,
+        'parameters': parameters or {},
+        'versions': get_data_versions(scopes),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def apply_cached_report(report):
+    # Якщо звіт з тими ж параметрами вже згенеровано на поточній версії даних,
+    # новий звіт просто посилається на той самий файл
+    report.cache_key = report_cache_key(report.report_type, report.parameters)
+    cached = (
+        Report.objects.filter(cache_key=report.cache_key, status='done')
+        .exclude(file='').exclude(pk=report.pk)
+        .order_by('-finished_at').first()
+    )
+    if cached is None or not cached.file.storage.exists(cached.file.name):
+        Report.objects.filter(pk=report.pk).update(cache_key=report.cache_key)
+        return False
+
+    now = timezone.now()
+    report.file.name = cached.file.name
+    report.status = 'done'
+    report.progress = 100
+    report.started_at = report.finished_at = report.last_used_at = now
+    report.save(update_fields=[
+        'cache_key', 'file', 'status', 'progress', 'started_at', 'finished_at', 'last_used_at',
+    ])
+    Report.objects.filter(pk=cached.pk).update(last_used_at=now)
+    return True
+
+
+def evict_report_files(max_bytes=None):
+    # Видаляє файли звітів, поки їх сумарний розмір перевищує ліміт: спершу файли,
+    # на які не посилається жоден звіт, потім ті, що найдовше не використовувались
+    if max_bytes is None:
+        max_bytes = getattr(settings, 'REPORT_CACHE_MAX_BYTES', None)
+    if not max_bytes:
+        return 0
+
+    storage = Report._meta.get_field('file').storage
+    if not storage.exists(REPORTS_DIR):
+        return 0
+    sizes = {
+        f'{REPORTS_DIR}/{name}': storage.size(f'{REPORTS_DIR}/{name}')
+        for name in storage.listdir(REPORTS_DIR)[1]
+    }
+    total = sum(sizes.values())
+    if total <= max_bytes:
+        return 0
+
+    used = list(
+        Report.objects.exclude(file='').values('file')
+        .annotate(last_used=Max('last_used_at'), finished=Max('finished_at'))
+    )
+    used_names = {row['file'] for row in used}
+    # Щойно записаний файл може ще не мати посилання з БД, тож свіжі файли без звіту не чіпаємо
+    grace = timezone.now() - timedelta(minutes=10)
+    candidates = [
+        name for name in sizes
+        if name not in used_names and storage.get_modified_time(name) < grace
+    ]
+    ordered = sorted(used, key=lambda row: row['last_used'] or row['finished'] or timezone.now())
+    candidates += [row['file'] for row in ordered]
+
+    evicted = 0
+    for name in candidates:
+        if total <= max_bytes:
+            break
+        if name not in sizes:
+            continue
+        storage.delete(name)
+        # ReportDetailView створить такі звіти заново при наступному відкритті
+        Report.objects.filter(file=name).update(file='', cache_key='', status='evicted', progress=0)
+        total -= sizes.pop(name)
+        evicted += 1
+        logger.info('Видалено файл звіту з кешу: %s', os.path.basename(name))
+    return evicted
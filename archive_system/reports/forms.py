@@ -1,6 +1,6 @@
 from django import forms
 from django.contrib.auth.models import User
-from documents.models import DocumentCategory, StorageLocation
+from documents.models import Document, DocumentCategory, StorageLocation
 from .models import Report
 
 class ReportForm(forms.ModelForm):
@@ -32,4 +32,22 @@ class ReportForm(forms.ModelForm):
         label='Користувач',
         queryset=User.objects.all(),
         required=False
-    )
\ No newline at end of file
+    )
+class ArchiveStatsForm(forms.Form):
+    # Параметри /reports/stats/: group_by — через кому, наприклад "year,category"
+    GROUPS = ('type', 'category', 'location', 'year', 'month')
+    
+    group_by = forms.CharField(required=False)
+    document_type = forms.ChoiceField(choices=[('', '---')] + list(Document.DOCUMENT_TYPES), required=False)
+    # 0 — документи без категорії / місця зберігання
+    category = forms.IntegerField(min_value=0, required=False)
+    storage_location = forms.IntegerField(min_value=0, required=False)
+    year_from = forms.IntegerField(min_value=1900, max_value=2100, required=False)
+    year_to = forms.IntegerField(min_value=1900, max_value=2100, required=False)
+    
+    def clean_group_by(self):
+        groups = [group.strip() for group in self.cleaned_data['group_by'].split(',') if group.strip()]
+        unknown = [group for group in groups if group not in self.GROUPS]
+        if unknown:
+            raise forms.ValidationError(f"Невідомі групування: {', '.join(unknown)}")
+        return tuple(dict.fromkeys(groups))
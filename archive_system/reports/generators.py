@@ -0,0 +1,233 @@
+from datetime import datetime
+from itertools import groupby
+
+from django.core.files import File
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from documents.models import Document, DocumentHistory
+from .pdf import Section, render_table_pdf
+
+# Як часто (у рядках) генератор повідомляє про прогрес
+PROGRESS_STEP = 500
+
+MONTHS = (
+    'Січень', 'Лютий', 'Березень', 'Квітень', 'Травень', 'Червень',
+    'Липень', 'Серпень', 'Вересень', 'Жовтень', 'Листопад', 'Грудень',
+)
+
+
+def generate_report(report, progress=None):
+    report_type = report.report_type
+
+    if report_type == 'document_list':
+        generate_document_list_report(report, progress)
+    elif report_type == 'document_by_category':
+        generate_document_by_category_report(report, progress)
+    elif report_type == 'document_by_location':
+        generate_document_by_location_report(report, progress)
+    elif report_type == 'document_by_date':
+        generate_document_by_date_report(report, progress)
+    elif report_type == 'activity_log':
+        generate_activity_log_report(report, progress)
+
+    if progress:
+        progress(100)
+
+
+def filter_documents(parameters):
+    # Фільтрація документів за параметрами
+    queryset = Document.objects.all()
+
+    if parameters.get('start_date'):
+        queryset = queryset.filter(issue_date__gte=parameters.get('start_date'))
+
+    if parameters.get('end_date'):
+        queryset = queryset.filter(issue_date__lte=parameters.get('end_date'))
+
+    if parameters.get('category_id'):
+        queryset = queryset.filter(category_id=parameters.get('category_id'))
+
+    if parameters.get('storage_location_id'):
+        queryset = queryset.filter(storage_location_id=parameters.get('storage_location_id'))
+
+    return queryset
+
+
+def save_report_pdf(report, pdf_file, prefix):
+    # Збереження файлу звіту
+    filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    with pdf_file:
+        report.file.save(filename, File(pdf_file))
+
+
+class ProgressCounter:
+    # Рахує оброблені рядки. PDF верстається по ходу читання рядків (reports/pdf.py),
+    # тож частка прочитаних рядків і є прогресом звіту; 100 % generate_report
+    # повідомляє лише після збереження файлу
+    def __init__(self, progress, total):
+        self.progress = progress
+        self.total = total
+        self.done = 0
+
+    def track(self, rows):
+        for row in rows:
+            if not isinstance(row, Section):
+                self.done += 1
+                if self.progress and self.total and self.done % PROGRESS_STEP == 0:
+                    self.progress(min(self.done * 100 // self.total, 99))
+            yield row
+        if self.progress:
+            self.progress(99)
+
+
+def generate_document_list_report(report, progress=None):
+    queryset = filter_documents(report.parameters).for_listing()
+    columns = ['№', 'Назва', 'Тип', 'Номер', 'Дата видачі', 'Категорія', 'Місце зберігання']
+
+    def rows():
+        for i, document in enumerate(queryset.iterator(chunk_size=2000), 1):
+            yield [
+                i,
+                document.title,
+                document.get_document_type_display(),
+                document.document_number,
+                document.issue_date.strftime('%d.%m.%Y'),
+                document.category.name if document.category else '',
+                document.storage_location.name if document.storage_location else ''
+            ]
+
+    counter = ProgressCounter(progress, queryset.count() if progress else 0)
+    pdf_file = render_table_pdf(counter.track(rows()), columns, 'Список документів')
+    save_report_pdf(report, pdf_file, 'document_list')
+
+
+def build_grouped_report(report, progress, title, prefix, group_by, order_by, columns, row_fields,
+                         heading_fields, group_title):
+    # Кількості по групах рахуються в БД одним GROUP BY, а рядки документів читаються
+    # одним упорядкованим проходом і розбиваються на групи по ходу читання
+    queryset = filter_documents(report.parameters).annotate(group_key=group_by)
+    counts = dict(queryset.order_by().values_list('group_key').annotate(count=Count('id')))
+    document_types = dict(Document.DOCUMENT_TYPES)
+    row_end = 1 + len(row_fields)
+
+    def rows():
+        values = queryset.order_by(*order_by).values_list(
+            'group_key', *row_fields, *heading_fields
+        ).iterator(chunk_size=2000)
+        for key, group in groupby(values, key=lambda row: row[0]):
+            for i, row in enumerate(group, 1):
+                if i == 1:
+                    yield Section(
+                        group_title(key, *row[row_end:]),
+                        f'Кількість документів: {counts.get(key, 0)}',
+                    )
+                yield [i, *format_document_row(row[1:row_end], document_types)]
+
+    counter = ProgressCounter(progress, sum(counts.values()))
+    pdf_file = render_table_pdf(counter.track(rows()), columns, title)
+    save_report_pdf(report, pdf_file, prefix)
+
+
+def format_document_row(row, document_types):
+    title, document_type, document_number, issue_date, *rest = row
+    return [
+        title,
+        document_types.get(document_type, document_type),
+        document_number,
+        issue_date.strftime('%d.%m.%Y'),
+        *(value or '-' for value in rest),
+    ]
+
+
+def generate_document_by_category_report(report, progress=None):
+    build_grouped_report(
+        report, progress,
+        title='Документи за категоріями',
+        prefix='document_by_category',
+        group_by=F('category_id'),
+        order_by=('category__name', 'category_id', 'issue_date', 'id'),
+        columns=['№', 'Назва', 'Тип', 'Номер', 'Дата видачі', 'Місце зберігання'],
+        row_fields=('title', 'document_type', 'document_number', 'issue_date', 'storage_location__name'),
+        heading_fields=('category__name',),
+        group_title=lambda key, name: f'Категорія: {name or "Без категорії"}',
+    )
+
+
+def generate_document_by_location_report(report, progress=None):
+    def group_title(key, name, room, shelf, box):
+        if key is None:
+            return 'Місце зберігання не вказано'
+        details = f'Кімната: {room}, Полиця: {shelf}' + (f', Коробка: {box}' if box else '')
+        return f'Місце зберігання: {name} ({details})'
+
+    build_grouped_report(
+        report, progress,
+        title='Документи за місцем зберігання',
+        prefix='document_by_location',
+        group_by=F('storage_location_id'),
+        order_by=('storage_location__name', 'storage_location_id', 'issue_date', 'id'),
+        columns=['№', 'Назва', 'Тип', 'Номер', 'Дата видачі', 'Категорія'],
+        row_fields=('title', 'document_type', 'document_number', 'issue_date', 'category__name'),
+        heading_fields=('storage_location__name', 'storage_location__room', 'storage_location__shelf',
+                        'storage_location__box'),
+        group_title=group_title,
+    )
+
+
+def generate_document_by_date_report(report, progress=None):
+    def group_title(month):
+        return f'{MONTHS[month.month - 1]} {month.year}'
+
+    build_grouped_report(
+        report, progress,
+        title='Документи за датою',
+        prefix='document_by_date',
+        group_by=TruncMonth('issue_date'),
+        order_by=('issue_date', 'id'),
+        columns=['№', 'Назва', 'Тип', 'Номер', 'Дата видачі', 'Категорія', 'Місце зберігання'],
+        row_fields=('title', 'document_type', 'document_number', 'issue_date',
+                    'category__name', 'storage_location__name'),
+        heading_fields=(),
+        group_title=group_title,
+    )
+
+
+def generate_activity_log_report(report, progress=None):
+    # Звіт з історії активності
+    parameters = report.parameters
+    queryset = DocumentHistory.objects.all()
+
+    if parameters.get('start_date'):
+        queryset = queryset.filter(timestamp__date__gte=parameters.get('start_date'))
+
+    if parameters.get('end_date'):
+        queryset = queryset.filter(timestamp__date__lte=parameters.get('end_date'))
+
+    if parameters.get('user_id'):
+        queryset = queryset.filter(user_id=parameters.get('user_id'))
+
+    actions = dict(DocumentHistory.ACTION_TYPES)
+    counts = dict(queryset.order_by().values_list('action').annotate(count=Count('id')))
+    notes = [f'{actions.get(action, action)}: {count}' for action, count in sorted(counts.items())]
+    notes.append(f'Усього: {sum(counts.values())}')
+
+    def rows():
+        values = queryset.order_by('-timestamp', '-id').values_list(
+            'timestamp', 'user__username', 'document__title', 'action', 'details'
+        ).iterator(chunk_size=2000)
+        for i, (timestamp, username, document_title, action, details) in enumerate(values, 1):
+            yield [
+                i,
+                timezone.localtime(timestamp).strftime('%d.%m.%Y %H:%M'),
+                username or '-',
+                document_title,
+                actions.get(action, action),
+                details or '-',
+            ]
+
+    columns = ['№', 'Дата і час', 'Користувач', 'Документ', 'Дія', 'Деталі']
+    counter = ProgressCounter(progress, sum(counts.values()))
+    pdf_file = render_table_pdf(counter.track(rows()), columns, 'Журнал активності', notes=notes)
+    save_report_pdf(report, pdf_file, 'activity_log')
@@ -0,0 +1,86 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import apply_cached_report, evict_report_files
+from .generators import generate_report
+from .models import Report
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_report(report):
+    if apply_cached_report(report):
+        return
+    # Без окремого воркера (REPORTS_BACKGROUND = False) звіт створюється одразу в запиті
+    if getattr(settings, 'REPORTS_BACKGROUND', True):
+        return
+    now = timezone.now()
+    claimed = Report.objects.filter(pk=report.pk, status='queued').update(
+        status='running', started_at=now, heartbeat_at=now
+    )
+    if claimed:
+        run_report_job(report.pk, close_connections=False)
+    report.refresh_from_db()
+
+
+def requeue_evicted_report(report):
+    # Файл звіту видалено з кешу (evict_report_files) — ставимо звіт у чергу
+    # знову; умовний UPDATE не дасть поставити його двічі
+    if report.status != 'evicted':
+        return False
+    requeued = Report.objects.filter(pk=report.pk, status='evicted').update(
+        status='queued', progress=0, error=None, started_at=None, heartbeat_at=None, finished_at=None,
+    )
+    if not requeued:
+        return False
+    report.refresh_from_db()
+    enqueue_report(report)
+    return True
+
+
+def claim_reports(limit):
+    # Позначаємо звіт як "running" умовним UPDATE, тож один звіт не візьмуть два воркери
+    claimed = []
+    if limit <= 0:
+        return claimed
+    queued = Report.objects.filter(status='queued').order_by('created_at').values_list('pk', flat=True)
+    for report_id in queued[:limit]:
+        now = timezone.now()
+        if Report.objects.filter(pk=report_id, status='queued').update(
+            status='running', started_at=now, heartbeat_at=now
+        ):
+            claimed.append(report_id)
+    return claimed
+
+
+def requeue_stale_reports(stale_after):
+    # Звіти, що "зависли" у статусі running після аварійної зупинки воркера. Рахуємо від
+    # останнього оновлення прогресу, а не від started_at: довгий звіт, що ще створюється,
+    # регулярно оновлює heartbeat_at і не буде взятий вдруге
+    threshold = timezone.now() - timedelta(seconds=stale_after)
+    stale = Q(heartbeat_at__lt=threshold) | Q(heartbeat_at__isnull=True, started_at__lt=threshold)
+    return Report.objects.filter(stale, status='running').update(status='queued', progress=0)
+
+
+def run_report_job(report_id, close_connections=True):
+    close_old_connections()
+    try:
+        report = Report.objects.get(pk=report_id)
+        generate_report(report, progress=report.set_progress)
+    except Exception as exc:
+        logger.exception('Не вдалося створити звіт %s', report_id)
+        Report.objects.filter(pk=report_id).update(status='failed', error=str(exc), finished_at=timezone.now())
+    else:
+        now = timezone.now()
+        Report.objects.filter(pk=report_id).update(
+            status='done', progress=100, error=None, finished_at=now, last_used_at=now
+        )
+        evict_report_files()
+    finally:
+        if close_connections:
+            connections.close_all()
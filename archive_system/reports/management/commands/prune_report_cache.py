@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reports.cache import evict_report_files
+
+
+class Command(BaseCommand):
+    help = 'Видаляє найдовше невикористані файли звітів, поки кеш перевищує ліміт розміру'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-mb', type=int, help='Ліміт розміру кешу в МБ (за замовчуванням REPORT_CACHE_MAX_BYTES)')
+
+    def handle(self, *args, **options):
+        max_bytes = options['max_mb'] * 1024 * 1024 if options['max_mb'] is not None else None
+        if max_bytes is None and not getattr(settings, 'REPORT_CACHE_MAX_BYTES', None):
+            self.stdout.write('Ліміт розміру кешу звітів не задано')
+            return
+        evicted = evict_report_files(max_bytes)
+        self.stdout.write(self.style.SUCCESS(f'Видалено файлів звітів: {evicted}'))
@@ -0,0 +1,47 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from reports.jobs import claim_reports, requeue_stale_reports, run_report_job
+
+
+class Command(BaseCommand):
+    help = 'Обробляє чергу звітів у пулі процесів'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Кількість процесів')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Інтервал опитування черги, с')
+        parser.add_argument('--stale-after', type=int, default=3600,
+                            help='Через скільки секунд без оновлення прогресу звіт у статусі running повертається в чергу')
+        parser.add_argument('--once', action='store_true', help='Обробити поточну чергу та завершитися')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        context = multiprocessing.get_context('fork')
+        running = set()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            try:
+                while True:
+                    # Звіти, що зависли після аварійної зупинки іншого воркера, перевіряються
+                    # на кожній ітерації, а не лише під час запуску
+                    requeued = requeue_stale_reports(options['stale_after'])
+                    if requeued:
+                        self.stdout.write(f'Повернуто в чергу звітів: {requeued}')
+                    running = {future for future in running if not future.done()}
+                    claimed = claim_reports(workers - len(running))
+                    # Процеси пулу створюються fork-ом під час submit, тож з'єднання з БД
+                    # закриваємо заздалегідь, щоб дочірні процеси не успадкували їх
+                    connections.close_all()
+                    for report_id in claimed:
+                        self.stdout.write(f'Створення звіту {report_id}')
+                        running.add(pool.submit(run_report_job, report_id))
+
+                    if options['once'] and not claimed and not running:
+                        break
+                    time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                self.stdout.write('Зупинка воркера, очікування активних звітів...')
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:10
+
+from django.db import migrations, models
+
+
+def mark_existing_reports_done(apps, schema_editor):
+    # Звіти, створені до появи черги, уже згенеровані синхронно
+    Report = apps.get_model('reports', 'Report')
+    Report.objects.update(status='done', progress=100)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='error',
+            field=models.TextField(blank=True, null=True, verbose_name='Помилка'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Завершення створення'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Прогрес, %'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Початок створення'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='status',
+            field=models.CharField(choices=[('queued', 'У черзі'), ('running', 'Створюється'), ('done', 'Готово'), ('failed', 'Помилка')], db_index=True, default='queued', max_length=10, verbose_name='Статус'),
+        ),
+        migrations.RunPython(mark_existing_reports_done, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_report_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('documents', 'Документи'), ('history', 'Історія документів')], max_length=20, unique=True, verbose_name='Область даних')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Версія')),
+            ],
+            options={
+                'verbose_name': 'Версія даних',
+                'verbose_name_plural': 'Версії даних',
+            },
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='cache_key',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Ключ кешу'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='last_used_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Останнє використання файлу'),
+        ),
+    ]
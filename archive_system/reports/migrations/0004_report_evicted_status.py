@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:26
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def mark_evicted_reports(apps, schema_editor):
+    # Звіти, файли яких уже видалено з кешу: раніше лишались «готовими» без файлу
+    Report = apps.get_model('reports', 'Report')
+    Report.objects.filter(Q(file='') | Q(file__isnull=True), status='done').exclude(
+        report_type='custom'
+    ).update(status='evicted', cache_key='', progress=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_report_cache'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='report',
+            name='status',
+            field=models.CharField(choices=[('queued', 'У черзі'), ('running', 'Створюється'), ('done', 'Готово'), ('failed', 'Помилка'), ('evicted', 'Файл видалено')], db_index=True, default='queued', max_length=10, verbose_name='Статус'),
+        ),
+        migrations.RunPython(mark_evicted_reports, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_report_evicted_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Останнє оновлення прогресу'),
+        ),
+    ]
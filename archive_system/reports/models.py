@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Report(models.Model):
     REPORT_TYPES = (
@@ -11,12 +12,30 @@ class Report(models.Model):
         ('custom', 'Користувацький звіт'),
     )
     
+    STATUS_CHOICES = (
+        ('queued', 'У черзі'),
+        ('running', 'Створюється'),
+        ('done', 'Готово'),
+        ('failed', 'Помилка'),
+        # Файл видалено з кешу звітів; створюється заново при відкритті звіту
+        ('evicted', 'Файл видалено'),
+    )
+    
     title = models.CharField(max_length=200, verbose_name="Назва звіту")
     report_type = models.CharField(max_length=20, choices=REPORT_TYPES, verbose_name="Тип звіту")
     parameters = models.JSONField(blank=True, null=True, verbose_name="Параметри")
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, verbose_name="Створено")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
     file = models.FileField(upload_to='reports/', blank=True, null=True, verbose_name="Файл звіту")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', db_index=True, verbose_name="Статус")
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="Прогрес, %")
+    error = models.TextField(blank=True, null=True, verbose_name="Помилка")
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name="Початок створення")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Завершення створення")
+    # Оновлюється разом з прогресом; за ним воркер знаходить звіти, що зависли
+    heartbeat_at = models.DateTimeField(blank=True, null=True, verbose_name="Останнє оновлення прогресу")
+    cache_key = models.CharField(max_length=64, blank=True, db_index=True, verbose_name="Ключ кешу")
+    last_used_at = models.DateTimeField(blank=True, null=True, verbose_name="Останнє використання файлу")
     
     class Meta:
         verbose_name = "Звіт"
@@ -24,4 +43,31 @@ class Report(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+    
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed', 'evicted')
+    
+    def set_progress(self, progress):
+        # Оновлюємо лише прогрес і heartbeat, щоб не перезаписати інші поля звіту
+        self.progress = min(progress, 100)
+        self.heartbeat_at = timezone.now()
+        Report.objects.filter(pk=self.pk).update(progress=self.progress, heartbeat_at=self.heartbeat_at)
+
+class DataVersion(models.Model):
+    # Лічильник змін даних, на яких будуються звіти; входить у ключ кешу звітів
+    SCOPES = (
+        ('documents', 'Документи'),
+        ('history', 'Історія документів'),
+    )
+    
+    scope = models.CharField(max_length=20, choices=SCOPES, unique=True, verbose_name="Область даних")
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Версія")
+    
+    class Meta:
+        verbose_name = "Версія даних"
+        verbose_name_plural = "Версії даних"
+    
+    def __str__(self):
+        return f"{self.get_scope_display()}: {self.version}"
@@ -0,0 +1,129 @@
+import os
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+
+FONT_NAME = 'DejaVuSans'
+FONT_PATH = os.path.join(settings.BASE_DIR, 'static', 'fonts', 'DejaVuSans.ttf')
+
+# Приблизно одна сторінка A4 рядків таблиці
+ROWS_PER_TABLE = 40
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, -1), FONT_NAME),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+class Section:
+    # Маркер у потоці рядків: починає нову таблицю з власним заголовком
+    def __init__(self, heading, note=None):
+        self.heading = heading
+        self.note = note
+
+
+def register_fonts():
+    # Викликається один раз з ReportsConfig.ready(); повторний виклик нічого не робить
+    if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(FONT_NAME, FONT_PATH))
+
+
+@lru_cache(maxsize=None)
+def get_styles():
+    # Власні копії стилів, щоб не змінювати спільний зразковий набір ReportLab
+    sample = getSampleStyleSheet()
+    return {
+        name: ParagraphStyle(f'Report{name}', parent=sample[name], fontName=FONT_NAME)
+        for name in ('Heading1', 'Heading2', 'Normal')
+    }
+
+
+class StreamingDocTemplate(SimpleDocTemplate):
+    # Документ, що дочитує flowables з ітератора у handle_flowable() по ходу верстки:
+    # у списку, який обробляє build(), лишається лише кілька таблиць, а не весь документ
+    LOOKAHEAD = 8
+
+    def build_stream(self, flowables):
+        self.stream = iter(flowables)
+        self.pending = []
+        self.fill()
+        self.build(self.pending)
+
+    def fill(self):
+        while len(self.pending) < self.LOOKAHEAD:
+            flowable = next(self.stream, None)
+            if flowable is None:
+                break
+            self.pending.append(flowable)
+
+    def handle_flowable(self, flowables):
+        super().handle_flowable(flowables)
+        # handle_flowable() викликається і для службового списку _hanging, тож
+        # дочитуємо лише основний список документа
+        if flowables is self.pending:
+            self.fill()
+
+
+def iter_flowables(rows, columns, title, notes):
+    styles = get_styles()
+
+    yield Paragraph(title, styles['Heading1'])
+    for note in notes:
+        yield Paragraph(note, styles['Normal'])
+
+    data = [columns]
+    has_rows = False
+    for row in rows:
+        if isinstance(row, Section):
+            if len(data) > 1:
+                yield make_table(data)
+            yield Paragraph(row.heading, styles['Heading2'])
+            if row.note:
+                yield Paragraph(row.note, styles['Normal'])
+            data = [columns]
+            continue
+        data.append(row)
+        has_rows = True
+        # Невеликі таблиці на сторінку замість однієї величезної: верстка лінійна,
+        # а заголовок колонок повторюється на кожній сторінці
+        if len(data) > ROWS_PER_TABLE:
+            yield make_table(data)
+            data = [columns]
+
+    if len(data) > 1:
+        yield make_table(data)
+    elif not has_rows:
+        yield Paragraph('Дані не знайдено', styles['Normal'])
+
+
+def render_table_pdf(rows, columns, title, notes=()):
+    # rows — будь-який ітератор рядків; об'єкти Section розбивають його на окремі таблиці.
+    # PDF пишеться у тимчасовий файл на диску, який видаляється після закриття
+    register_fonts()
+    pdf_file = tempfile.TemporaryFile(suffix='.pdf')
+    try:
+        StreamingDocTemplate(pdf_file, pagesize=A4).build_stream(iter_flowables(rows, columns, title, notes))
+    except Exception:
+        pdf_file.close()
+        raise
+    pdf_file.seek(0)
+    return pdf_file
+
+
+def make_table(data):
+    table = Table(data, repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+    return table
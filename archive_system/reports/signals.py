@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from documents.models import Document, DocumentCategory, StorageLocation
+from documents.signals import bulk_changed
+from .cache import bump_data_version
+
+SCOPE_BY_MODEL = {
+    Document: 'documents',
+    DocumentCategory: 'documents',
+    StorageLocation: 'documents',
+}
+
+
+# Будь-яка зміна даних робить закешовані звіти застарілими. Receiver підключається
+# лише до моделей зі SCOPE_BY_MODEL: receiver post_delete без sender вимкнув би
+# швидке каскадне видалення (одним DELETE) для всіх моделей проєкту
+def bump_report_data_version(sender, raw=False, **kwargs):
+    if raw:
+        return
+    bump_data_version(SCOPE_BY_MODEL[sender])
+
+
+for model in SCOPE_BY_MODEL:
+    post_save.connect(bump_report_data_version, sender=model)
+    post_delete.connect(bump_report_data_version, sender=model)
+    bulk_changed.connect(bump_report_data_version, sender=model)
+
+
+# Нові записи історії змінюють її версію через Max(id) (reports/cache.py), а видаляються
+# вони каскадом разом з документом — тож лічильник оновлюється один раз на документ
+@receiver(post_delete, sender=Document)
+def bump_history_version(sender, **kwargs):
+    bump_data_version('history')
@@ -0,0 +1,85 @@
+import hashlib
+import json
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.db.models.functions import ExtractYear
+
+from documents.models import Document, DocumentCategory, DocumentSummary, StorageLocation
+from .cache import get_data_versions
+
+# Відповіді кешуються за версією даних документів, тож застаріти не можуть;
+# таймаут лише прибирає невикористані ключі
+STATS_CACHE_TIMEOUT = 24 * 60 * 60
+
+# None — групування збігається з полем моделі
+GROUP_FIELDS = {
+    'type': F('document_type'),
+    'category': F('category_id'),
+    'location': F('storage_location_id'),
+    'year': ExtractYear('month'),
+    'month': None,
+}
+
+
+def archive_stats(group_by=(), filters=None):
+    # Агрегація зі зведеної таблиці DocumentSummary замість сканування документів
+    filters = {name: value for name, value in (filters or {}).items() if value not in (None, '')}
+    payload = json.dumps({
+        'group_by': list(group_by), 'filters': filters, 'versions': get_data_versions(('documents',)),
+    }, sort_keys=True, default=str)
+    key = 'archive-stats:' + hashlib.md5(payload.encode('utf-8')).hexdigest()
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_stats(group_by, filters)
+        cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def compute_stats(group_by, filters):
+    queryset = DocumentSummary.objects.all()
+    if filters.get('document_type'):
+        queryset = queryset.filter(document_type=filters['document_type'])
+    if filters.get('category') is not None:
+        queryset = queryset.filter(category_id=filters['category'])
+    if filters.get('storage_location') is not None:
+        queryset = queryset.filter(storage_location_id=filters['storage_location'])
+    if filters.get('year_from'):
+        queryset = queryset.filter(month__gte=date(filters['year_from'], 1, 1))
+    if filters.get('year_to'):
+        queryset = queryset.filter(month__lte=date(filters['year_to'], 12, 1))
+
+    rows = list(
+        queryset.order_by()
+        .values(
+            *[group for group in group_by if GROUP_FIELDS[group] is None],
+            **{group: GROUP_FIELDS[group] for group in group_by if GROUP_FIELDS[group] is not None},
+        )
+        .annotate(count=Sum('count'))
+        .filter(count__gt=0)
+        .order_by(*group_by)
+    )
+    add_labels(rows, group_by)
+    return {
+        'group_by': list(group_by),
+        'total': sum(row['count'] for row in rows),
+        'rows': rows,
+    }
+
+
+def add_labels(rows, group_by):
+    labels = {}
+    if 'type' in group_by:
+        labels['type'] = dict(Document.DOCUMENT_TYPES)
+    if 'category' in group_by:
+        ids = {row['category'] for row in rows}
+        labels['category'] = dict(DocumentCategory.objects.filter(pk__in=ids).values_list('pk', 'name'))
+    if 'location' in group_by:
+        ids = {row['location'] for row in rows}
+        labels['location'] = dict(StorageLocation.objects.filter(pk__in=ids).values_list('pk', 'name'))
+    for row in rows:
+        if 'month' in row:
+            row['month'] = row['month'].strftime('%Y-%m')
+        for group, names in labels.items():
+            row[f'{group}_label'] = names.get(row[group], 'Не вказано')
@@ -1,3 +1,555 @@
-from django.test import TestCase
+import gzip
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from pypdf import PdfReader
+
+from documents.bulk import bulk_update_documents
+from documents.counters import BULK_THRESHOLD, change_counts, count_keys, make_key
+from documents.models import (
+    Document, DocumentCategory, DocumentHistory, DocumentSummary, DocumentTypeCount, StorageLocation,
+)
+from documents.tests import call_command_output, create_documents
+from .cache import evict_report_files, report_cache_key
+from .generators import generate_document_list_report, generate_report
+from .jobs import claim_reports, enqueue_report, requeue_stale_reports, run_report_job
+from .models import Report
+from .pdf import ROWS_PER_TABLE, Section, StreamingDocTemplate, render_table_pdf
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class DocumentExportQueryCountTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.client.force_login(self.user)
+
+    def count_csv_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('export-csv'))
+            b''.join(response)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def count_pdf_queries(self):
+        report = Report.objects.create(title='Звіт', report_type='document_list', parameters={}, created_by=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            generate_document_list_report(report)
+        self.assertTrue(report.file)
+        return len(queries)
+
+    def test_csv_export_query_count_does_not_grow_with_rows(self):
+        create_documents(1, self.user)
+        baseline = self.count_csv_queries()
+
+        create_documents(9, self.user)
+        self.assertEqual(self.count_csv_queries(), baseline)
+
+    def test_document_list_report_query_count_does_not_grow_with_rows(self):
+        create_documents(1, self.user)
+        baseline = self.count_pdf_queries()
+
+        create_documents(9, self.user)
+        self.assertEqual(self.count_pdf_queries(), baseline)
+
+    def test_csv_export_applies_search_filters_and_gzip(self):
+        documents = create_documents(2, self.user)
+        documents[1].document_type = 'order'
+        documents[1].save()
+
+        response = self.client.get(reverse('export-csv'), {'document_type': 'diploma', 'gzip': '1'})
+        content = gzip.decompress(b''.join(response)).decode('utf-8')
+
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn(documents[0].document_number, content)
+        self.assertNotIn(documents[1].document_number, content)
+
+
+class ArchiveStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.client.force_login(self.user)
+        self.documents = create_documents(3, self.user)
+
+    def summary(self):
+        return {
+            (row.document_type, row.category_id, row.storage_location_id, row.month): row.count
+            for row in DocumentSummary.objects.filter(count__gt=0)
+        }
+
+    def stats(self, **params):
+        response = self.client.get(reverse('archive-stats'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_summary_follows_document_changes(self):
+        document = self.documents[0]
+        key = ('diploma', document.category_id, document.storage_location_id, date(2024, 1, 1))
+        self.assertEqual(self.summary()[key], 1)
+
+        document.issue_date = date(2023, 5, 17)
+        document.document_type = 'order'
+        document.save()
+        summary = self.summary()
+        self.assertNotIn(key, summary)
+        self.assertEqual(summary['order', document.category_id, document.storage_location_id, date(2023, 5, 1)], 1)
+
+        Document.objects.filter(pk=self.documents[1].pk).delete()
+        bulk_update_documents(Document.objects.all(), {'document_type': 'certificate'})
+        self.assertEqual(sum(self.summary().values()), 2)
+        self.assertEqual({key[0] for key in self.summary()}, {'certificate'})
+
+        # Після видалення категорії документи рахуються «без категорії»
+        self.documents[2].category.delete()
+        summary = self.summary()
+        self.assertEqual(summary['certificate', 0, self.documents[2].storage_location_id, date(2024, 1, 1)], 1)
+
+        before = self.summary()
+        self.assertIn('Рядків зведення: 2', call_command_output('rebuild_archive_summary'))
+        self.assertEqual(self.summary(), before)
+
+    def test_bulk_changes_upsert_summary_rows(self):
+        category = self.documents[0].category_id
+        keys = [make_key(category, None, 'diploma', date(2000 + i, 1, 1)) for i in range(BULK_THRESHOLD + 5)]
+        change_counts(count_keys(keys))
+        change_counts(count_keys(keys[:3], delta=-1))
+
+        summary = self.summary()
+        self.assertEqual(summary['diploma', category, 0, date(2003, 1, 1)], 1)
+        self.assertNotIn(('diploma', category, 0, date(2000, 1, 1)), summary)
+        self.assertEqual(
+            DocumentTypeCount.objects.get(category_id=category, document_type='diploma').count,
+            1 + BULK_THRESHOLD + 2,
+        )
+
+    def test_stats_api_groups_and_filters(self):
+        self.documents[0].issue_date = date(2023, 3, 1)
+        self.documents[0].save()
+
+        stats = self.stats(group_by='year')
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual([(row['year'], row['count']) for row in stats['rows']], [(2023, 1), (2024, 2)])
+
+        stats = self.stats(group_by='type,category', year_from=2024)
+        self.assertEqual(stats['total'], 2)
+        self.assertEqual(stats['rows'][0]['type_label'], 'Диплом')
+        self.assertEqual(stats['rows'][0]['category_label'], 'Категорія 1')
+
+        stats = self.stats(group_by='month', category=self.documents[0].category_id)
+        self.assertEqual(stats['rows'], [{'month': '2023-03', 'count': 1}])
+
+        response = self.client.get(reverse('archive-stats'), {'group_by': 'colour'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_stats_are_cached_until_documents_change(self):
+        self.assertEqual(self.stats(group_by='type')['total'], 3)
+        with CaptureQueriesContext(connection) as queries:
+            self.stats(group_by='type')
+        self.assertFalse([query for query in queries if 'documents_documentsummary' in query['sql']])
+
+        create_documents(1, self.user)
+        self.assertEqual(self.stats(group_by='type')['total'], 4)
+
+    def test_dashboard_page(self):
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Статистика архіву')
+
+
+@override_settings(REPORTS_BACKGROUND=False)
+class ReportCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.settings_override = override_settings(MEDIA_ROOT=self.directory)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.client.force_login(self.user)
+        self.documents = create_documents(2, self.user)
+
+    def create_report(self, report_type='document_list', parameters=None):
+        report = Report.objects.create(title='Звіт', report_type=report_type, parameters=parameters or {},
+                                       created_by=self.user)
+        enqueue_report(report)
+        self.assertEqual(report.status, 'done')
+        return report
+
+    def test_report_with_same_parameters_reuses_file(self):
+        first = self.create_report()
+        second = self.create_report()
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(second.cache_key, first.cache_key)
+
+        other = self.create_report(parameters={'category_id': self.documents[0].category_id})
+        self.assertNotEqual(other.file.name, first.file.name)
+
+        self.documents[0].title = 'Диплом з відзнакою'
+        self.documents[0].save()
+        third = self.create_report()
+        self.assertNotEqual(third.file.name, first.file.name)
+
+    def test_history_changes_only_invalidate_activity_log(self):
+        document_key = report_cache_key('document_list', {})
+        activity_key = report_cache_key('activity_log', {})
+
+        with CaptureQueriesContext(connection) as queries:
+            entry = DocumentHistory.objects.create(document=self.documents[0], user=self.user, action='view')
+        self.assertFalse([query for query in queries if 'reports_dataversion' in query['sql']])
+        self.assertEqual(report_cache_key('document_list', {}), document_key)
+        self.assertNotEqual(report_cache_key('activity_log', {}), activity_key)
+
+        # Історія видаляється разом з документом
+        activity_key = report_cache_key('activity_log', {})
+        DocumentHistory.objects.create(document=self.documents[1], user=self.user, action='view')
+        entry.document.delete()
+        self.assertNotEqual(report_cache_key('activity_log', {}), activity_key)
+
+    def test_document_history_is_deleted_in_one_query(self):
+        document = self.documents[0]
+        DocumentHistory.objects.bulk_create(
+            DocumentHistory(document=document, user=self.user, action='view') for _ in range(300)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            document.delete()
+        history_queries = [query['sql'] for query in queries if 'documents_documenthistory' in query['sql']]
+        self.assertEqual(len(history_queries), 1)
+        self.assertTrue(history_queries[0].startswith('DELETE'))
+        # Версії 'documents' і 'history' — по одному UPDATE, а не на кожен запис історії
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE "reports_dataversion"')]), 2)
+        self.assertFalse(DocumentHistory.objects.filter(document_id=document.pk).exists())
+
+    def test_eviction_removes_orphans_then_least_recently_used(self):
+        storage = Report._meta.get_field('file').storage
+        now = timezone.now()
+        reports = []
+        for i in range(3):
+            name = storage.save(f'reports/report-{i}.pdf', ContentFile(b'x' * 100))
+            reports.append(Report.objects.create(
+                title=f'Звіт {i}', report_type='document_list', parameters={}, created_by=self.user, file=name,
+                status='done',
+                cache_key=f'key-{i}', last_used_at=now - timedelta(days=3 - i),
+            ))
+        orphan = storage.save('reports/orphan.pdf', ContentFile(b'x' * 100))
+        stale = (now - timedelta(hours=1)).timestamp()
+        os.utime(storage.path(orphan), (stale, stale))
+
+        self.assertEqual(evict_report_files(max_bytes=250), 2)
+        self.assertFalse(storage.exists(orphan))
+        self.assertFalse(storage.exists(reports[0].file.name))
+        self.assertTrue(storage.exists(reports[1].file.name))
+        reports[0].refresh_from_db()
+        self.assertEqual((reports[0].status, reports[0].file.name, reports[0].cache_key), ('evicted', '', ''))
+
+        # Відкриття звіту з видаленим файлом створює його заново
+        response = self.client.get(reverse('report-detail', args=[reports[0].pk]))
+        self.assertContains(response, 'звіт створюється заново')
+        reports[0].refresh_from_db()
+        self.assertEqual(reports[0].status, 'done')
+        self.assertTrue(storage.exists(reports[0].file.name))
+
+
+def read_pdf(report):
+    with report.file.open('rb') as pdf_file:
+        reader = PdfReader(pdf_file)
+        return len(reader.pages), '\n'.join(page.extract_text() for page in reader.pages)
+
+
+class TablePdfTests(TestCase):
+    columns = ['№', 'Назва']
+
+    def render(self, rows, **kwargs):
+        with render_table_pdf(rows, self.columns, 'Звіт', **kwargs) as pdf_file:
+            reader = PdfReader(pdf_file)
+            return [page.extract_text() for page in reader.pages]
+
+    def test_long_table_is_streamed(self):
+        count = ROWS_PER_TABLE * StreamingDocTemplate.LOOKAHEAD * 2 + 5
+        consumed = []
+
+        def rows():
+            for i in range(1, count + 1):
+                consumed.append(i)
+                yield (i, f'Документ {i}')
+
+        pending = []
+        handle_flowable = StreamingDocTemplate.handle_flowable
+
+        def track(doc, flowables):
+            pending.append((len(consumed), len(flowables)))
+            return handle_flowable(doc, flowables)
+
+        with mock.patch.object(StreamingDocTemplate, 'handle_flowable', track):
+            pages = self.render(rows())
+
+        # Рядки читаються по ходу верстки, а не всі наперед
+        self.assertLess(pending[0][0], count)
+        self.assertLessEqual(max(size for _, size in pending), StreamingDocTemplate.LOOKAHEAD)
+        self.assertGreaterEqual(len(pages), count // ROWS_PER_TABLE)
+        self.assertTrue(pages[-1].rstrip().endswith(f'{count}\nДокумент {count}'))
+        text = '\n'.join(pages)
+        self.assertEqual(text.count('Документ '), count)
+        # Заголовок колонок повторюється на кожній сторінці
+        self.assertTrue(all('№\nНазва' in page for page in pages))
+
+
+    def test_sections_start_new_tables(self):
+        rows = [
+            Section('Категорія А', 'Кількість документів: 2'),
+            (1, 'Диплом'), (2, 'Атестат'),
+            Section('Категорія Б'),
+            (1, 'Довідка'),
+        ]
+        text = '\n'.join(self.render(iter(rows), notes=['Період: 2024', 'Усього: 3']))
+        self.assertTrue(text.startswith('Звіт\nПеріод: 2024\nУсього: 3\n'))
+        self.assertIn('Категорія А\nКількість документів: 2\n', text)
+        self.assertIn('Категорія Б\n', text)
+        self.assertLess(text.index('Атестат'), text.index('Категорія Б'))
+        self.assertLess(text.index('Категорія Б'), text.index('Довідка'))
+        # Кожна секція має власний заголовок колонок
+        self.assertEqual(text.count('№\nНазва'), 2)
+
+    def test_empty_rows(self):
+        text = '\n'.join(self.render(iter([]), notes=['Усього: 0']))
+        self.assertIn('Усього: 0\nДані не знайдено', text)
+        self.assertNotIn('№\nНазва', text)
+
+        # Порожня секція не створює порожньої таблиці
+        text = '\n'.join(self.render(iter([Section('Категорія А'), Section('Категорія Б'), (1, 'Довідка')])))
+        self.assertEqual(text.count('№\nНазва'), 1)
+        self.assertNotIn('Дані не знайдено', text)
+
+
+class ReportGeneratorTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.settings_override = override_settings(MEDIA_ROOT=self.directory)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        # Дві групи: два документи в «Категорії 0» / «Архіві 0» за січень і один в інших за березень
+        documents = create_documents(3, self.user)
+        documents[1].category = documents[0].category
+        documents[1].storage_location = documents[0].storage_location
+        documents[2].category = DocumentCategory.objects.get(name='Категорія 1')
+        documents[2].storage_location = StorageLocation.objects.get(name='Архів 1')
+        documents[2].issue_date = date(2024, 3, 10)
+        for document in documents:
+            document.save()
+        self.documents = documents
+
+    def generate(self, report_type):
+        report = Report.objects.create(title='Звіт', report_type=report_type, parameters={}, created_by=self.user)
+        steps = []
+        generate_report(report, progress=steps.append)
+        self.assertEqual(steps[-1], 100)
+        self.assertEqual(steps, sorted(steps))
+        return read_pdf(report)[1]
+
+    def test_progress_follows_rows(self):
+        report = Report.objects.create(title='Звіт', report_type='document_list', parameters={},
+                                       created_by=self.user)
+        steps = []
+        with mock.patch('reports.generators.PROGRESS_STEP', 1):
+            generate_report(report, progress=steps.append)
+        # Прогрес росте з кожним рядком, а 100 % — лише після збереження файлу
+        self.assertEqual(steps, [33, 66, 99, 99, 100])
+
+    def test_document_by_category_report(self):
+        text = self.generate('document_by_category')
+        self.assertIn('Категорія: Категорія 0\nКількість документів: 2', text)
+        self.assertIn('Категорія: Категорія 1\nКількість документів: 1', text)
+        self.assertLess(text.index('Категорія 0\n'), text.index('Диплом 1'))
+        self.assertLess(text.index('Диплом 1'), text.index('Категорія: Категорія 1'))
+        self.assertLess(text.index('Категорія: Категорія 1'), text.index('Диплом 2'))
+        # Нумерація рядків починається заново в кожній групі
+        self.assertIn('2\nДиплом 1', text)
+        self.assertIn('1\nДиплом 2', text)
+
+    def test_document_by_location_report(self):
+        text = self.generate('document_by_location')
+        self.assertIn('Місце зберігання: Архів 0 (Кімната: 101, Полиця: 0)\nКількість документів: 2', text)
+        self.assertIn('Місце зберігання: Архів 1 (Кімната: 101, Полиця: 1)\nКількість документів: 1', text)
+        self.assertLess(text.index('Диплом 1'), text.index('Місце зберігання: Архів 1'))
+        self.assertLess(text.index('Місце зберігання: Архів 1'), text.index('Диплом 2'))
+        self.assertIn('1\nДиплом 2', text)
+
+    def test_document_by_date_report(self):
+        text = self.generate('document_by_date')
+        self.assertIn('Січень 2024\nКількість документів: 2', text)
+        self.assertIn('Березень 2024\nКількість документів: 1', text)
+        self.assertLess(text.index('Диплом 1'), text.index('Березень 2024'))
+        self.assertLess(text.index('Березень 2024'), text.index('Диплом 2'))
+        self.assertIn('1\nДиплом 2', text)
+
+    def test_activity_log_report(self):
+        for action in ('view', 'view', 'update'):
+            DocumentHistory.objects.create(document=self.documents[0], user=self.user, action=action)
+        text = self.generate('activity_log')
+        self.assertIn('Оновлення: 1', text)
+        self.assertIn('Перегляд: 2', text)
+        self.assertIn('Усього: 3', text)
+        self.assertEqual(text.count('archivist'), 3)
+
+
+class ImmediateExecutor:
+    # Замість пулу процесів: тестова БД у пам'яті недоступна дочірнім процесам
+    def __init__(self, max_workers=None, mp_context=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class ReportQueueTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.settings_override = override_settings(MEDIA_ROOT=self.directory)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.client.force_login(self.user)
+        create_documents(2, self.user)
+
+    def create_report(self, **kwargs):
+        report = Report.objects.create(title='Звіт', report_type='document_list', parameters={},
+                                       created_by=self.user, **kwargs)
+        enqueue_report(report)
+        return report
+
+    def status(self, report):
+        report.refresh_from_db()
+        return report.status
+
+    def test_report_is_queued_until_worker_claims_it(self):
+        report = self.create_report()
+        self.assertEqual(report.status, 'queued')
+
+        self.assertEqual(claim_reports(5), [report.pk])
+        self.assertEqual(self.status(report), 'running')
+        self.assertIsNotNone(report.started_at)
+
+        run_report_job(report.pk, close_connections=False)
+        self.assertEqual(self.status(report), 'done')
+        self.assertEqual(report.progress, 100)
+        self.assertTrue(report.file)
+        self.assertIsNotNone(report.finished_at)
+
+    def test_failed_report_keeps_error(self):
+        report = self.create_report()
+        claim_reports(1)
+        with mock.patch('reports.jobs.generate_report', side_effect=ValueError('немає даних')), \
+                self.assertLogs('reports.jobs', 'ERROR'):
+            run_report_job(report.pk, close_connections=False)
+        self.assertEqual(self.status(report), 'failed')
+        self.assertEqual(report.error, 'немає даних')
+        self.assertFalse(report.file)
+
+    def test_report_is_claimed_once(self):
+        now = timezone.now()
+        reports = [self.create_report() for _ in range(3)]
+        for i, report in enumerate(reports):
+            Report.objects.filter(pk=report.pk).update(created_at=now - timedelta(minutes=3 - i))
+
+        self.assertEqual(claim_reports(0), [])
+        self.assertEqual(claim_reports(2), [reports[0].pk, reports[1].pk])
+        self.assertEqual(claim_reports(5), [reports[2].pk])
+        self.assertEqual(claim_reports(5), [])
+
+        # Інший воркер встигає взяти звіт між вибіркою черги та UPDATE
+        queued = self.create_report()
+        now = timezone.now()
+
+        def claimed_by_other_worker():
+            Report.objects.filter(pk=queued.pk).update(status='running', started_at=now)
+            return now
+
+        with mock.patch('reports.jobs.timezone.now', side_effect=claimed_by_other_worker):
+            self.assertEqual(claim_reports(5), [])
+        self.assertEqual(self.status(queued), 'running')
+
+    def test_stale_running_reports_are_requeued(self):
+        report = self.create_report()
+        claim_reports(1)
+        self.assertEqual(requeue_stale_reports(60), 0)
+
+        # Довгий звіт, який ще оновлює прогрес, лишається у воркера
+        Report.objects.filter(pk=report.pk).update(started_at=timezone.now() - timedelta(hours=2))
+        report.refresh_from_db()
+        report.set_progress(40)
+        self.assertEqual(requeue_stale_reports(60), 0)
+        self.assertEqual(self.status(report), 'running')
+
+        Report.objects.filter(pk=report.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(requeue_stale_reports(60), 1)
+        self.assertEqual(self.status(report), 'queued')
+        self.assertEqual(report.progress, 0)
+
+    def test_worker_requeues_stale_reports_while_polling(self):
+        stale = self.create_report()
+        claim_reports(1)
+        Report.objects.filter(pk=stale.pk).update(heartbeat_at=timezone.now() - timedelta(hours=2))
+        queued = self.create_report()
+
+        with mock.patch('reports.management.commands.run_report_worker.ProcessPoolExecutor', ImmediateExecutor), \
+                mock.patch('reports.management.commands.run_report_worker.requeue_stale_reports',
+                           wraps=requeue_stale_reports) as requeue:
+            output = call_command_output('run_report_worker', '--workers', '2', '--poll-interval', '0',
+                                         '--stale-after', '60', '--once')
+
+        self.assertIn('Повернуто в чергу звітів: 1', output)
+        self.assertIn(f'Створення звіту {queued.pk}', output)
+        self.assertIn(f'Створення звіту {stale.pk}', output)
+        self.assertGreater(requeue.call_count, 1)
+        self.assertEqual(self.status(stale), 'done')
+        self.assertEqual(self.status(queued), 'done')
+
+    def test_report_status_endpoint(self):
+        report = self.create_report()
+        url = reverse('report-status', args=[report.pk])
+
+        data = self.client.get(url).json()
+        self.assertEqual(data, {
+            'status': 'queued', 'status_display': report.get_status_display(), 'progress': 0,
+            'error': None, 'file_url': None,
+        })
+
+        claim_reports(1)
+        run_report_job(report.pk, close_connections=False)
+        report.refresh_from_db()
+        data = self.client.get(url).json()
+        self.assertEqual((data['status'], data['progress']), ('done', 100))
+        self.assertEqual(data['file_url'], report.file.url)
+
+        self.assertEqual(self.client.get(reverse('report-status', args=[0])).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 302)
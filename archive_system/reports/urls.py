@@ -5,6 +5,9 @@ urlpatterns = [
     path('', views.ReportListView.as_view(), name='report-list'),
     path('<int:pk>/', views.ReportDetailView.as_view(), name='report-detail'),
     path('new/', views.ReportCreateView.as_view(), name='report-create'),
+    path('<int:pk>/status/', views.report_status, name='report-status'),
     path('<int:pk>/delete/', views.ReportDeleteView.as_view(), name='report-delete'),
     path('export-csv/', views.export_documents_csv, name='export-csv'),
+    path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
+    path('stats/', views.archive_stats_api, name='archive-stats'),
 ]
\ No newline at end of file
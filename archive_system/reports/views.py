@@ -1,28 +1,28 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.decorators import login_required
-from django.views.generic import ListView, DetailView, CreateView, DeleteView
-from django.urls import reverse_lazy
+from django.views.generic import ListView, DetailView, CreateView, DeleteView, TemplateView
+from django.urls import reverse, reverse_lazy
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.db.models import Count
 import csv
 import json
+import zlib
 from datetime import datetime
 from reportlab.pdfgen import canvas
 from django.template.loader import get_template
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
 from io import BytesIO
 from .models import Report
-from .forms import ReportForm
+from .forms import ArchiveStatsForm, ReportForm
+from .jobs import enqueue_report, requeue_evicted_report
+from .stats import archive_stats
 from documents.models import Document, DocumentCategory, StorageLocation, DocumentHistory
+from documents.forms import DocumentSearchForm
 from xhtml2pdf import pisa
 
+CSV_EXPORT_CHUNK_SIZE = 2000
+
 class ReportListView(LoginRequiredMixin, ListView):
     model = Report
     template_name = 'reports/report_list.html'
@@ -32,12 +32,29 @@ class ReportListView(LoginRequiredMixin, ListView):
 class ReportDetailView(LoginRequiredMixin, DetailView):
     model = Report
     template_name = 'reports/report_detail.html'
+    
+    def get_object(self, queryset=None):
+        report = super().get_object(queryset)
+        if requeue_evicted_report(report):
+            messages.info(self.request, 'Файл звіту було видалено з кешу, звіт створюється заново.')
+        return report
+
+@login_required
+def report_status(request, pk):
+    # Опитується сторінкою звіту, доки файл не буде готовий
+    report = get_object_or_404(Report, pk=pk)
+    return JsonResponse({
+        'status': report.status,
+        'status_display': report.get_status_display(),
+        'progress': report.progress,
+        'error': report.error,
+        'file_url': report.file.url if report.file else None,
+    })
 
 class ReportCreateView(LoginRequiredMixin, CreateView):
     model = Report
     form_class = ReportForm
     template_name = 'reports/report_form.html'
-    success_url = reverse_lazy('report-list')
     
     def form_valid(self, form):
         form.instance.created_by = self.request.user
@@ -55,112 +72,19 @@ class ReportCreateView(LoginRequiredMixin, CreateView):
         
         response = super().form_valid(form)
         
-        # Генерація звіту
-        self.generate_report(self.object)
+        # Генерація звіту виконується воркером run_report_worker
+        enqueue_report(self.object)
         
-        messages.success(self.request, 'Звіт успішно створено!')
+        if self.object.status == 'done':
+            messages.success(self.request, 'Звіт успішно створено!')
+        elif self.object.status == 'failed':
+            messages.error(self.request, 'Не вдалося створити звіт.')
+        else:
+            messages.success(self.request, 'Звіт поставлено в чергу на створення.')
         return response
     
-    def generate_report(self, report):
-        report_type = report.report_type
-        parameters = report.parameters
-        
-        if report_type == 'document_list':
-            self.generate_document_list_report(report)
-        elif report_type == 'document_by_category':
-            self.generate_document_by_category_report(report)
-        elif report_type == 'document_by_location':
-            self.generate_document_by_location_report(report)
-        elif report_type == 'document_by_date':
-            self.generate_document_by_date_report(report)
-        elif report_type == 'activity_log':
-            self.generate_activity_log_report(report)
-    
-    def generate_document_list_report(self, report):
-        # Фільтрація документів за параметрами
-        queryset = Document.objects.all()
-        parameters = report.parameters
-        
-        if parameters.get('start_date'):
-            queryset = queryset.filter(issue_date__gte=parameters.get('start_date'))
-        
-        if parameters.get('end_date'):
-            queryset = queryset.filter(issue_date__lte=parameters.get('end_date'))
-        
-        if parameters.get('category_id'):
-            queryset = queryset.filter(category_id=parameters.get('category_id'))
-        
-        if parameters.get('storage_location_id'):
-            queryset = queryset.filter(storage_location_id=parameters.get('storage_location_id'))
-        
-        # Створення PDF-звіту
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        elements = []
-        
-        # Додавання шрифту з підтримкою кирилиці
-        pdfmetrics.registerFont(TTFont('DejaVuSans', 'DejaVuSans.ttf'))
-        
-        # Стилі
-        styles = getSampleStyleSheet()
-        title_style = styles['Heading1']
-        title_style.fontName = 'DejaVuSans'
-        
-        # Заголовок
-        title = Paragraph(f"Список документів", title_style)
-        elements.append(title)
-        
-        # Дані для таблиці
-        data = [['№', 'Назва', 'Тип', 'Номер', 'Дата видачі', 'Категорія', 'Місце зберігання']]
-        
-        for i, doc in enumerate(queryset, 1):
-            data.append([
-                i,
-                doc.title,
-                doc.get_document_type_display(),
-                doc.document_number,
-                doc.issue_date.strftime('%d.%m.%Y'),
-                doc.category.name if doc.category else '',
-                doc.storage_location.name if doc.storage_location else ''
-            ])
-        
-        # Створення таблиці
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'DejaVuSans'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(table)
-        
-        # Збереження PDF
-        doc.build(elements)
-        
-        # Збереження файлу звіту
-        filename = f"document_list_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        report.file.save(filename, BytesIO(buffer.getvalue()))
-    
-    def generate_document_by_category_report(self, report):
-        # Аналогічно до generate_document_list_report, але з групуванням за категоріями
-        pass
-    
-    def generate_document_by_location_report(self, report):
-        # Аналогічно до generate_document_list_report, але з групуванням за місцями зберігання
-        pass
-    
-    def generate_document_by_date_report(self, report):
-        # Аналогічно до generate_document_list_report, але з групуванням за датами
-        pass
-    
-    def generate_activity_log_report(self, report):
-        # Звіт з історії активності
-        pass
+    def get_success_url(self):
+        return reverse('report-detail', kwargs={'pk': self.object.pk})
 
 class ReportDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     model = Report
@@ -171,26 +95,83 @@ class ReportDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         report = self.get_object()
         return self.request.user == report.created_by or self.request.user.is_staff
 
-@login_required
-def export_documents_csv(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="documents_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
+class DashboardView(LoginRequiredMixin, TemplateView):
+    # Графіки будуються в браузері з /reports/stats/
+    template_name = 'reports/dashboard.html'
     
-    writer = csv.writer(response)
-    writer.writerow(['Назва', 'Тип', 'Номер', 'Дата видачі', 'Категорія', 'Місце зберігання', 'Опис'])
-    
-    documents = Document.objects.all()
-    for doc in documents:
-        writer.writerow([
-            doc.title,
-            doc.get_document_type_display(),
-            doc.document_number,
-            doc.issue_date.strftime('%d.%m.%Y'),
-            doc.category.name if doc.category else '',
-            doc.storage_location.name if doc.storage_location else '',
-            doc.description
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['by_type'] = archive_stats(('type',))
+        context['document_types'] = Document.DOCUMENT_TYPES
+        return context
+
+@login_required
+def archive_stats_api(request):
+    # Кількість документів зі зведеної таблиці, наприклад дипломи за роками і
+    # категоріями: ?group_by=year,category&document_type=diploma
+    form = ArchiveStatsForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'error': 'Неприпустимі параметри', 'errors': form.errors}, status=400)
+    filters = dict(form.cleaned_data)
+    group_by = filters.pop('group_by')
+    return JsonResponse(archive_stats(group_by, filters))
+
+class Echo:
+    # Псевдобуфер для csv.writer: повертає рядок замість запису в пам'ять
+    def write(self, value):
+        return value
+
+def iter_documents_csv(rows):
+    writer = csv.writer(Echo())
+    document_types = dict(Document.DOCUMENT_TYPES)
+    yield writer.writerow(['Назва', 'Тип', 'Номер', 'Дата видачі', 'Категорія', 'Місце зберігання', 'Опис'])
+    for title, document_type, document_number, issue_date, category, storage_location, description in rows:
+        yield writer.writerow([
+            title,
+            document_types.get(document_type, document_type),
+            document_number,
+            issue_date.strftime('%d.%m.%Y'),
+            category or '',
+            storage_location or '',
+            description
         ])
-    
+
+def gzip_stream(chunks, batch_size=64 * 1024):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        pending.append(data)
+        pending_size += len(data)
+        if pending_size >= batch_size:
+            compressed = compressor.compress(b''.join(pending))
+            pending = []
+            pending_size = 0
+            if compressed:
+                yield compressed
+    yield compressor.compress(b''.join(pending)) + compressor.flush()
+
+@login_required
+def export_documents_csv(request):
+    # Рядки читаються частинами через values_list без створення об'єктів моделі,
+    # тож пам'ять воркера не залежить від розміру архіву
+    queryset = Document.objects.all()
+    form = DocumentSearchForm(request.GET)
+    if form.is_valid():
+        queryset = queryset.apply_search_filters(form.cleaned_data)
+    rows = queryset.values_list(
+        'title', 'document_type', 'document_number', 'issue_date',
+        'category__name', 'storage_location__name', 'description'
+    ).iterator(chunk_size=CSV_EXPORT_CHUNK_SIZE)
+
+    filename = f"documents_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    if request.GET.get('gzip'):
+        response = StreamingHttpResponse(gzip_stream(iter_documents_csv(rows)), content_type='application/gzip')
+        filename += '.gz'
+    else:
+        response = StreamingHttpResponse(iter_documents_csv(rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
 # Функція для перетворення HTML в PDF
@@ -11,6 +11,8 @@ class ProfileInline(admin.StackedInline):
 class UserAdmin(BaseUserAdmin):
     inlines = (ProfileInline,)
     list_display = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'get_position', 'get_department')
+    # Посада і відділ беруться з профілю — одним JOIN замість запиту на кожен рядок
+    list_select_related = ('profile',)
     
     def get_position(self, obj):
         return obj.profile.position if hasattr(obj, 'profile') else ''
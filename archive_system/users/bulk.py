@@ -0,0 +1,39 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .models import Profile
+
+USER_FIELDS = ('username', 'first_name', 'last_name', 'email', 'is_staff', 'is_active')
+PROFILE_FIELDS = ('position', 'department', 'phone')
+
+
+def bulk_create_users(rows, password=None, batch_size=1000):
+    # Масове створення користувачів разом з профілями: rows — словники з полями
+    # USER_FIELDS і PROFILE_FIELDS. bulk_create не надсилає post_save, тож профілі
+    # вставляються окремою пачкою. Пароль хешується один раз для всіх (PBKDF2 для
+    # кожного зайняв би хвилини); None — непридатний пароль, користувачі задають
+    # свій через відновлення пароля
+    password_hash = make_password(password)
+    users, profiles = [], []
+    for row in rows:
+        users.append(User(password=password_hash, **{name: row[name] for name in USER_FIELDS if name in row}))
+        profiles.append(Profile(
+            position=row.get('position') or '',
+            department=row.get('department') or '',
+            phone=row.get('phone') or None,
+        ))
+
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+        if any(user.pk is None for user in users):
+            # СУБД без RETURNING (MySQL) не повертає id створених рядків
+            ids = dict(
+                User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'pk')
+            )
+            for user in users:
+                user.pk = ids[user.username]
+        for user, profile in zip(users, profiles):
+            profile.user = user
+        Profile.objects.bulk_create(profiles, batch_size=batch_size)
+    return users
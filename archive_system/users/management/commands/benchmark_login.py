@@ -0,0 +1,70 @@
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.bulk import bulk_create_users
+
+BENCHMARK_PASSWORD = 'benchmark-login-password'
+
+
+class Command(BaseCommand):
+    help = ('Вимірює пропускну здатність входу: тимчасові користувачі по черзі входять через '
+            'сторінку входу; виводить входів/с, p50/p95 і SQL-запити на один вхід. З --fast-hasher '
+            'PBKDF2 замінюється на MD5, щоб виміряти лише роботу з базою')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Кількість тимчасових користувачів')
+        parser.add_argument('--logins', type=int, default=200, help='Кількість входів')
+        parser.add_argument('--fast-hasher', action='store_true', help='Хешувати паролі MD5 замість PBKDF2')
+
+    def handle(self, *args, **options):
+        if options['users'] <= 0 or options['logins'] <= 0:
+            raise CommandError('--users і --logins мають бути додатними')
+
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if options['fast_hasher']:
+            overrides['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+        prefix = f'benchmark_login_{uuid.uuid4().hex[:8]}_'
+        with override_settings(**overrides):
+            users = bulk_create_users(
+                [{'username': f'{prefix}{i}'} for i in range(options['users'])], password=BENCHMARK_PASSWORD,
+            )
+            try:
+                timings, queries, profile_writes = self.run(users, options['logins'])
+            finally:
+                User.objects.filter(username__startswith=prefix).delete()
+
+        total = sum(timings) / 1000
+        self.stdout.write(f"Входів: {len(timings)}, входів/с: {len(timings) / total:.1f}")
+        self.stdout.write(f"p50: {statistics.median(timings):.2f} мс, "
+                          f"p95: {statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]:.2f} мс")
+        self.stdout.write(f"SQL-запитів на вхід: {statistics.median(queries):.0f}, "
+                          f"записів профілю: {profile_writes}")
+
+    def run(self, users, logins):
+        url = reverse('login')
+        timings, queries, profile_writes = [], [], 0
+        for i in range(logins):
+            client = Client()
+            data = {'username': users[i % len(users)].username, 'password': BENCHMARK_PASSWORD}
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.post(url, data)
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 302:
+                raise CommandError(f'Вхід не вдався, статус відповіді {response.status_code}')
+            queries.append(len(captured))
+            profile_writes += sum(
+                1 for query in captured
+                if 'users_profile' in query['sql'] and not query['sql'].lstrip().upper().startswith('SELECT')
+            )
+        return timings, queries, profile_writes
@@ -9,18 +9,53 @@ class Profile(models.Model):
     department = models.CharField(max_length=100, verbose_name="Відділ")
     phone = models.CharField(max_length=20, blank=True, null=True, verbose_name="Телефон")
     
+    # Поля, зміни яких зберігаються разом з користувачем (save_user_profile)
+    TRACKED_FIELDS = ('position', 'department', 'phone')
+    
     class Meta:
         verbose_name = "Профіль"
         verbose_name_plural = "Профілі"
     
     def __str__(self):
         return f"Профіль {self.user.username}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_state()
+        return instance
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.remember_state()
+    
+    def remember_state(self):
+        self._saved_values = {name: self.__dict__.get(name) for name in self.TRACKED_FIELDS}
+    
+    def get_changed_fields(self):
+        saved = getattr(self, '_saved_values', None)
+        if saved is None:
+            return list(self.TRACKED_FIELDS)
+        return [name for name in self.TRACKED_FIELDS if self.__dict__.get(name) != saved[name]]
 
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
         Profile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    instance.profile.save()
\ No newline at end of file
+def save_user_profile(sender, instance, created, raw=False, **kwargs):
+    # Профіль записується разом з користувачем, лише якщо його вже завантажили і
+    # змінили; звичайне збереження користувача (зокрема last_login при вході)
+    # не робить ні запиту профілю, ні UPDATE
+    if created or raw:
+        return
+    profile = User.profile.related.get_cached_value(instance, default=None)
+    if profile is None:
+        return
+    if profile.pk is None:
+        profile.save()
+        return
+    changed = profile.get_changed_fields()
+    if changed:
+        profile.save(update_fields=changed)
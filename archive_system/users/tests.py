@@ -1,3 +1,135 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from documents.tests import call_command_output, create_documents
+from reports.models import Report
+from .bulk import bulk_create_users
+from .models import Profile
+
+
+def create_reports(count, user):
+    return [
+        Report.objects.create(title=f'Звіт {i}', report_type='document_list', parameters={}, created_by=user)
+        for i in range(count)
+    ]
+
+
+class UserPagesQueryCountTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('registrar', password='secret-pass-123', is_staff=True,
+                                              is_superuser=True)
+        self.staff.profile.position = 'Архіваріус'
+        self.staff.profile.save()
+        self.client.force_login(self.staff)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_user_detail_query_count_does_not_grow_with_items(self):
+        url = reverse('user-detail', args=[self.staff.pk])
+        create_documents(1, self.staff)
+        create_reports(1, self.staff)
+        baseline, _ = self.count_queries(url)
+
+        create_documents(9, self.staff)
+        create_reports(9, self.staff)
+        queries, response = self.count_queries(url)
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(response.context['object'].recent_documents), 5)
+        self.assertEqual(len(response.context['object'].recent_reports), 5)
+        self.assertContains(response, 'Переглянути всі документи (10)')
+        self.assertContains(response, 'Переглянути всі звіти (10)')
+        self.assertContains(response, 'Архіваріус')
+
+    def test_user_list_query_count_does_not_grow_with_users(self):
+        User.objects.create_user('student-0', password='secret-pass-123')
+        baseline, _ = self.count_queries(reverse('user-list'))
+
+        for i in range(1, 9):
+            User.objects.create_user(f'student-{i}', password='secret-pass-123')
+        queries, response = self.count_queries(reverse('user-list'))
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(response.context['users']), 10)
+
+    def test_admin_user_changelist_query_count_does_not_grow_with_users(self):
+        url = reverse('admin:auth_user_changelist')
+        User.objects.create_user('student-0', password='secret-pass-123')
+        baseline, _ = self.count_queries(url)
+
+        for i in range(1, 10):
+            User.objects.create_user(f'student-{i}', password='secret-pass-123')
+        queries, response = self.count_queries(url)
+        self.assertEqual(queries, baseline)
+        self.assertContains(response, 'Архіваріус')
+
+
+class ProfileSignalTests(TestCase):
+    def profile_queries(self, captured):
+        return [query['sql'] for query in captured if 'users_profile' in query['sql']]
+
+    def test_user_save_does_not_touch_unchanged_profile(self):
+        user = User.objects.create_user('archivist', password='secret-pass-123')
+        self.assertTrue(Profile.objects.filter(user=user).exists())
+
+        user = User.objects.get(pk=user.pk)
+        with CaptureQueriesContext(connection) as captured:
+            self.assertTrue(self.client.login(username='archivist', password='secret-pass-123'))
+            user.first_name = 'Олена'
+            user.save()
+        self.assertEqual(self.profile_queries(captured), [])
+
+        user.profile.position = 'Архіваріус'
+        with CaptureQueriesContext(connection) as captured:
+            user.save()
+            user.save()
+        queries = self.profile_queries(captured)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('UPDATE', queries[0])
+        self.assertNotIn('department', queries[0])
+        self.assertEqual(Profile.objects.get(user=user).position, 'Архіваріус')
+
+    def test_bulk_create_users_with_profiles(self):
+        with CaptureQueriesContext(connection) as captured:
+            users = bulk_create_users([
+                {'username': f'staff-{i}', 'email': f'staff-{i}@example.com', 'is_staff': True,
+                 'position': 'Методист', 'department': 'Деканат'}
+                for i in range(30)
+            ], password='secret-pass-123', batch_size=10)
+        self.assertLessEqual(len(captured), 10)
+        self.assertEqual(Profile.objects.filter(user__in=users, department='Деканат').count(), 30)
+        self.assertTrue(User.objects.get(username='staff-7').check_password('secret-pass-123'))
+
+    def test_import_users_command(self):
+        User.objects.create_user('existing')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'staff.csv')
+        with open(path, 'w', encoding='utf-8') as source:
+            source.write('username,first_name,last_name,email,position,department,phone\n'
+                         'ivanenko,Іван,Іваненко,ivanenko@example.com,Архіваріус,Архів,+380441234567\n'
+                         'existing,,,,,,\n'
+                         'petrenko,Петро,Петренко,,Методист,Деканат,\n'
+                         'petrenko,Петро,Петренко,,Методист,Деканат,\n')
+
+        output = call_command_output('import_users', path, '--staff')
+        self.assertIn('Створено користувачів: 2, пропущено: 2', output)
+        user = User.objects.select_related('profile').get(username='ivanenko')
+        self.assertTrue(user.is_staff)
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(user.profile.phone, '+380441234567')
 
-# Create your tests here.
+    def test_benchmark_login_command(self):
+        output = call_command_output('benchmark_login', '--users', '2', '--logins', '4', '--fast-hasher')
+        self.assertIn('Входів: 4', output)
+        self.assertIn('записів профілю: 0', output)
+        self.assertFalse(User.objects.filter(username__startswith='benchmark_login_').exists())
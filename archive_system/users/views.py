@@ -4,10 +4,24 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.models import User
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.urls import reverse_lazy
+from documents.models import Document
+from reports.models import Report
 from .forms import UserRegisterForm, UserUpdateForm, ProfileUpdateForm
 from .models import Profile
 
+# Скільки останніх документів і звітів показувати на сторінці користувача
+RECENT_ITEMS = 5
+
+
+def count_created(queryset):
+    # Кількість записів користувача корельованим підзапитом: COUNT через JOIN обох
+    # зв'язків множив би документи на звіти
+    counts = queryset.filter(created_by=OuterRef('pk')).order_by().values('created_by').annotate(total=Count('pk'))
+    return Coalesce(Subquery(counts.values('total'), output_field=IntegerField()), Value(0))
+
 def register(request):
     if request.method == 'POST':
         form = UserRegisterForm(request.POST)
@@ -47,6 +61,9 @@ class UserListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     context_object_name = 'users'
     paginate_by = 10
     
+    def get_queryset(self):
+        return User.objects.select_related('profile').order_by('id')
+    
     def test_func(self):
         return self.request.user.is_staff
 
@@ -54,6 +71,30 @@ class UserDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
     model = User
     template_name = 'users/user_detail.html'
     
+    def get_queryset(self):
+        # Профіль, лічильники і останні документи та звіти — фіксованою кількістю
+        # запитів незалежно від кількості записів користувача
+        return User.objects.select_related('profile').annotate(
+            document_total=count_created(Document.objects.all()),
+            report_total=count_created(Report.objects.all()),
+        ).prefetch_related(
+            Prefetch(
+                'created_documents',
+                queryset=Document.objects.order_by('-created_at', '-id')[:RECENT_ITEMS],
+                to_attr='recent_documents',
+            ),
+            Prefetch(
+                'report_set',
+                queryset=Report.objects.order_by('-created_at', '-id')[:RECENT_ITEMS],
+                to_attr='recent_reports',
+            ),
+        )
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['recent_items'] = RECENT_ITEMS
+        return context
+    
     def test_func(self):
         return self.request.user.is_staff or self.request.user.id == self.kwargs.get('pk')
 